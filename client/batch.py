@@ -0,0 +1,480 @@
+import argparse
+import csv
+import json
+import os
+import queue
+import random
+import socket
+import sys
+import threading
+import time
+
+from protocol import FLAG_JSON, FRAME_BUSY, FRAME_ERROR, FRAME_RESULT, FrameConnection, ProtocolError
+from upload import DEFAULT_QUALITY, MODEL_INPUT_SIZE, UPLOAD_MODES, parse_size, prepare_upload
+
+DEFAULT_HOST = 'server'
+DEFAULT_PORT = 8080
+DEFAULT_EXTENSIONS = ".jpg,.jpeg,.png"
+
+# 결과 상태
+STATUS_OK = "ok"              # 분류 성공
+STATUS_REJECTED = "rejected"  # 서버 오류 응답 또는 읽을 수 없는 파일 (다시 보내도 결과가 같음)
+STATUS_FAILED = "failed"      # 재시도를 모두 소진한 네트워크 오류/서버 과부하
+# 이어하기(--resume) 시 건너뛰는 상태, failed 는 다시 처리한다
+DONE_STATUSES = (STATUS_OK, STATUS_REJECTED)
+
+CSV_FIELDS = ["path", "status", "en_class", "ko_class", "probability", "result", "attempts", "elapsed_ms",
+              "error"]
+
+
+def output_format(args) -> str:
+    if args.format != 'auto':
+        return args.format
+    return 'jsonl' if args.output.lower().endswith(('.jsonl', '.json', '.ndjson')) else 'csv'
+
+
+def iter_paths(args):
+    """입력 경로를 하나씩 생성 (디렉토리는 하위까지 이름순으로, 목록 파일은 한 줄에 하나)
+
+    수십만 개를 미리 목록으로 만들지 않고 처리 속도에 맞춰 꺼내 쓴다.
+    """
+    extensions = tuple(ext.strip().lower() for ext in args.extensions.split(',') if ext.strip())
+    for source in args.inputs:
+        if os.path.isdir(source):
+            for root, dirnames, filenames in os.walk(source):
+                dirnames.sort()
+                for name in sorted(filenames):
+                    if name.lower().endswith(extensions):
+                        yield os.path.join(root, name)
+        else:
+            yield source
+    if args.files_from:
+        f = sys.stdin if args.files_from == '-' else open(args.files_from, encoding='utf-8')
+        try:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    yield line
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+
+def read_done(path: str, fmt: str) -> set:
+    """이전 실행 결과 파일에서 다시 보낼 필요가 없는 경로 집합
+
+    중단 시 마지막 줄이 잘려 있을 수 있으므로 해석할 수 없는 줄은 무시한다.
+    """
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding='utf-8', newline='') as f:
+        if fmt == 'csv':
+            for row in csv.DictReader(f):
+                if row.get("status") in DONE_STATUSES and row.get("path"):
+                    done.add(row["path"])
+        else:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict) and record.get("status") in DONE_STATUSES:
+                    done.add(record.get("path"))
+    return done
+
+
+class ResultWriter:
+    """결과를 한 건씩 CSV/JSONL 로 기록 (이어하기 시 기존 파일 뒤에 추가)"""
+
+    def __init__(self, path: str, fmt: str, append: bool):
+        self.fmt = fmt
+        if path == '-':
+            self.file = sys.stdout
+        else:
+            exists = append and os.path.exists(path) and os.path.getsize(path) > 0
+            self.file = open(path, 'a' if exists else 'w', encoding='utf-8', newline='')
+            if exists:
+                # 중단으로 잘린 마지막 줄에 새 기록이 이어 붙지 않도록 줄을 바꿔 둔다
+                with open(path, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) not in (b'\n', b'\r'):
+                        self.file.write('\n')
+            append = exists
+        self._csv = None
+        if fmt == 'csv':
+            self._csv = csv.DictWriter(self.file, fieldnames=CSV_FIELDS, extrasaction='ignore')
+            if not append:
+                self._csv.writeheader()
+
+    def write(self, record: dict) -> None:
+        if self._csv is not None:
+            self._csv.writerow(record)
+        else:
+            self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def flush(self) -> None:
+        self.file.flush()
+
+    def close(self) -> None:
+        self.flush()
+        if self.file is not sys.stdout:
+            self.file.close()
+
+
+def busy_retry_after(text: str) -> float:
+    """혼잡 응답(JSON)의 재시도 권장 시간(초), 알 수 없으면 0"""
+    try:
+        return float(json.loads(text).get("retry_after_ms", 0)) / 1000.0
+    except (ValueError, AttributeError):
+        return 0.0
+
+
+def resolve_address(host: str, port: int) -> tuple:
+    """서버 주소 확인, Docker 환경이 아니어서 기본 호스트 이름을 찾지 못하면 localhost 사용"""
+    try:
+        socket.getaddrinfo(host, port)
+    except socket.gaierror:
+        if host != DEFAULT_HOST:
+            raise
+        print(f"'{host}' 를 찾을 수 없어 localhost 로 연결합니다.", file=sys.stderr)
+        host = '127.0.0.1'
+    return host, port
+
+
+class BatchRunner:
+    """concurrency 개의 워커가 각자 지속 연결 하나로 파일을 보내고, 메인 스레드가 결과를 기록한다
+
+    입력 경로는 크기가 제한된 큐로 전달되어 목록 전체를 메모리에 올리지 않는다.
+    """
+
+    def __init__(self, args, address: tuple, done: set, writer: ResultWriter):
+        self.args = args
+        self.address = address
+        self.done = done
+        self.writer = writer
+        self.flags = 0 if args.text else FLAG_JSON
+        self.upload_size = parse_size(args.upload_size)
+        # 아카이브 모드에서는 워커가 한 번에 archive 개씩 꺼내므로 그만큼 넉넉히 쌓아 둔다
+        self.tasks = queue.Queue(maxsize=args.concurrency * 4 * max(1, args.archive))
+        self.results = queue.Queue()
+        self.stop_event = threading.Event()
+        self.counts = {STATUS_OK: 0, STATUS_REJECTED: 0, STATUS_FAILED: 0}
+        self.skipped = 0
+
+    # ------------------------------------------------------------------
+    # 입력
+    # ------------------------------------------------------------------
+    def _feed(self) -> None:
+        try:
+            for path in iter_paths(self.args):
+                if path in self.done:
+                    self.skipped += 1
+                    continue
+                while not self.stop_event.is_set():
+                    try:
+                        self.tasks.put(path, timeout=0.2)
+                        break
+                    except queue.Full:
+                        pass
+                if self.stop_event.is_set():
+                    break
+        except OSError as e:
+            print(f"입력 목록을 읽지 못했습니다: {e}", file=sys.stderr)
+        finally:
+            for _ in range(self.args.concurrency):
+                self.tasks.put(None)
+
+    # ------------------------------------------------------------------
+    # 전송
+    # ------------------------------------------------------------------
+    def _backoff(self, attempt: int, retry_after: float = 0.0) -> None:
+        """지수 백오프 + 지터 (서버가 retry_after 를 알려 주면 그보다 짧게 기다리지 않음), 중단 요청이 오면 바로 깨어난다"""
+        delay = min(self.args.max_backoff, self.args.backoff * (2 ** attempt))
+        delay = max(delay * random.uniform(0.5, 1.0), min(self.args.max_backoff, retry_after))
+        self.stop_event.wait(delay)
+
+    def _parse(self, record: dict, text: str) -> None:
+        if self.args.text:
+            record["result"] = text
+            return
+        data = json.loads(text)
+        top = data["top_k"][0]
+        record["en_class"] = top["en_class"]
+        record["ko_class"] = top["ko_class"]
+        record["probability"] = top["probability"]
+        if self.writer.fmt == 'jsonl':
+            record["top_k"] = data["top_k"]
+
+    def _settle(self, record: dict, frame_type: int, text: str) -> None:
+        """재시도하지 않는 응답(결과/오류)을 record 에 반영"""
+        if frame_type == FRAME_RESULT:
+            try:
+                self._parse(record, text)
+            except (ValueError, KeyError, IndexError) as e:
+                record.update(status=STATUS_REJECTED, error=f"응답을 해석할 수 없습니다: {e}")
+                return
+            record["status"] = STATUS_OK
+            record.pop("error", None)
+            return
+        record.update(status=STATUS_REJECTED,
+                      error=text if frame_type == FRAME_ERROR else f"frame_0x{frame_type:02x}: {text}")
+
+    def _prepare(self, record: dict, path: str) -> tuple:
+        """전송할 (데이터, flags) 반환, 읽을 수 없는 파일이면 record 를 rejected 로 두고 (None, None)
+
+        original 은 전송 시 디스크에서 바로 보내고, 그 외에는 줄인 결과를 한 번만 만들어 재시도에 재사용한다.
+        original 의 데이터는 파일 경로이다.
+        """
+        try:
+            if os.path.getsize(path) == 0:
+                raise OSError("빈 파일입니다.")
+            data, flags = path, self.flags
+            if self.args.upload != 'original':
+                data, upload_flags = prepare_upload(path, self.args.upload, self.upload_size,
+                                                    self.args.upload_quality)
+                flags |= upload_flags
+        except OSError as e:
+            record.update(status=STATUS_REJECTED, error=f"파일을 읽을 수 없습니다: {e}")
+            return None, None
+        return data, flags
+
+    def classify(self, connection: FrameConnection, path: str) -> dict:
+        """파일 하나 분류, 네트워크 오류/과부하 응답은 재시도"""
+        record = {"path": path, "status": STATUS_FAILED, "attempts": 0}
+        started = time.perf_counter()
+        data, flags = self._prepare(record, path)
+        if data is None:
+            return record
+
+        retry_after = 0.0
+        for attempt in range(self.args.retries + 1):
+            if attempt:
+                self._backoff(attempt - 1, retry_after)
+                if self.stop_event.is_set():
+                    break
+            record["attempts"] = attempt + 1
+            try:
+                if isinstance(data, str):
+                    frame_type, text = connection.request_file(path, flags=flags)
+                else:
+                    frame_type, text = connection.request(data, flags=flags)
+            except (ConnectionError, ProtocolError, OSError) as e:
+                # 끊긴 연결은 버리고 다음 시도에서 새로 연결
+                connection.close()
+                record["error"] = f"{type(e).__name__}: {e}"
+                continue
+            if frame_type == FRAME_BUSY:
+                record["error"] = text
+                retry_after = busy_retry_after(text)
+                continue
+            self._settle(record, frame_type, text)
+            break
+        record["elapsed_ms"] = round((time.perf_counter() - started) * 1000.0, 1)
+        return record
+
+    def classify_archive(self, connection: FrameConnection, paths: list) -> None:
+        """파일 여러 개를 FRAME_ARCHIVE 하나로 분류, 결과는 받는 대로 results 에 넣는다
+
+        네트워크 오류/과부하 응답이면 아직 결과를 받지 못한 파일만 다시 묶어 보낸다.
+        """
+        started = time.perf_counter()
+        pending = []    # (record, 데이터)
+        flags = self.flags
+        for path in paths:
+            record = {"path": path, "status": STATUS_FAILED, "attempts": 0}
+            data, data_flags = self._prepare(record, path)
+            if data is None:
+                self.results.put(record)
+            else:
+                # 전송 방식이 모두 같으므로 flags 도 묶음 전체에서 같다
+                flags = data_flags
+                pending.append((record, data))
+
+        def _finish(record):
+            record["elapsed_ms"] = round((time.perf_counter() - started) * 1000.0, 1)
+            self.results.put(record)
+
+        retry_after = 0.0
+        for attempt in range(self.args.retries + 1):
+            if not pending:
+                break
+            if attempt:
+                self._backoff(attempt - 1, retry_after)
+                if self.stop_event.is_set():
+                    break
+            for record, _ in pending:
+                record["attempts"] = attempt + 1
+
+            answered = 0
+            error = "응답을 받지 못한 항목이 있습니다."
+            try:
+                for frame_type, text in connection.classify_archive([data for _, data in pending], flags):
+                    if frame_type == FRAME_BUSY:
+                        error = text
+                        retry_after = busy_retry_after(text)
+                        break
+                    record = pending[answered][0]
+                    answered += 1
+                    self._settle(record, frame_type, text)
+                    _finish(record)
+            except (ConnectionError, ProtocolError, OSError) as e:
+                connection.close()
+                error = f"{type(e).__name__}: {e}"
+            pending = pending[answered:]
+            for record, _ in pending:
+                record["error"] = error
+
+        for record, _ in pending:
+            _finish(record)
+
+    def _next_chunk(self) -> tuple:
+        """작업 큐에서 최대 archive 개를 꺼냄, (경로 목록, 입력이 끝났는지 여부)"""
+        paths = []
+        while len(paths) < self.args.archive:
+            try:
+                # 첫 경로는 기다리고, 나머지는 이미 쌓여 있는 만큼만 묶는다
+                path = self.tasks.get() if not paths else self.tasks.get_nowait()
+            except queue.Empty:
+                break
+            if path is None:
+                return paths, True
+            paths.append(path)
+        return paths, False
+
+    def _work(self) -> None:
+        connection = FrameConnection(self.address, self.args.timeout)
+        try:
+            if self.args.archive > 0:
+                finished = False
+                while not finished:
+                    paths, finished = self._next_chunk()
+                    if paths and not self.stop_event.is_set():
+                        self.classify_archive(connection, paths)
+                return
+            while True:
+                path = self.tasks.get()
+                if path is None:
+                    break
+                if self.stop_event.is_set():
+                    continue
+                self.results.put(self.classify(connection, path))
+        finally:
+            connection.close()
+            self.results.put(None)
+
+    # ------------------------------------------------------------------
+    # 실행
+    # ------------------------------------------------------------------
+    def _report(self, started: float) -> None:
+        elapsed = time.perf_counter() - started
+        processed = sum(self.counts.values())
+        rate = processed / elapsed if elapsed > 0 else 0.0
+        print(f"처리 {processed}건 ({rate:.1f}장/s) - 성공 {self.counts[STATUS_OK]}, "
+              f"거부 {self.counts[STATUS_REJECTED]}, 실패 {self.counts[STATUS_FAILED]}, "
+              f"건너뜀 {self.skipped}", file=sys.stderr)
+
+    def run(self) -> dict:
+        threads = [threading.Thread(target=self._feed, name="batch-feeder", daemon=True)]
+        threads += [threading.Thread(target=self._work, name=f"batch-worker-{i}", daemon=True)
+                    for i in range(self.args.concurrency)]
+        for thread in threads:
+            thread.start()
+
+        started = time.perf_counter()
+        last_flush = last_report = started
+        running = self.args.concurrency
+        while running:
+            try:
+                record = self.results.get(timeout=0.5)
+            except queue.Empty:
+                record = False
+            except KeyboardInterrupt:
+                print("중단 요청: 진행 중인 요청을 마무리합니다. (--resume 으로 이어서 처리)", file=sys.stderr)
+                self.stop_event.set()
+                continue
+            if record is None:
+                running -= 1
+            elif record:
+                self.counts[record["status"]] += 1
+                self.writer.write(record)
+
+            now = time.perf_counter()
+            if now - last_flush >= 0.5:
+                self.writer.flush()
+                last_flush = now
+            if self.args.progress > 0 and now - last_report >= self.args.progress:
+                self._report(started)
+                last_report = now
+
+        self.writer.flush()
+        self._report(started)
+        return dict(self.counts, skipped=self.skipped, interrupted=self.stop_event.is_set())
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="디렉토리/파일 목록의 이미지를 서버로 일괄 분류")
+    parser.add_argument('inputs', nargs='*', help="이미지 파일 또는 디렉토리 (디렉토리는 하위까지 탐색)")
+    parser.add_argument('--files-from', help="한 줄에 하나씩 이미지 경로가 적힌 목록 파일 ('-' 이면 표준 입력)")
+    parser.add_argument('-o', '--output', required=True, help="결과 파일 경로 (.csv 또는 .jsonl, '-' 이면 표준 출력)")
+    parser.add_argument('--format', choices=('auto', 'csv', 'jsonl'), default='auto',
+                        help="결과 형식 (기본값: 출력 파일 확장자로 결정)")
+    parser.add_argument('--resume', action='store_true',
+                        help="기존 결과 파일에 이어서 기록하고 이미 처리한 이미지는 건너뜀")
+    parser.add_argument('--overwrite', action='store_true', help="기존 결과 파일을 덮어씀")
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f"서버 주소 (기본값: {DEFAULT_HOST})")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"서버 포트 (기본값: {DEFAULT_PORT})")
+    parser.add_argument('--concurrency', type=int, default=8, help="동시 연결 수 (기본값: 8)")
+    parser.add_argument('--retries', type=int, default=5, help="네트워크 오류/과부하 시 재시도 횟수 (기본값: 5)")
+    parser.add_argument('--backoff', type=float, default=0.5, help="첫 재시도 대기 시간(초), 매번 2배 (기본값: 0.5)")
+    parser.add_argument('--max-backoff', type=float, default=30.0, help="재시도 대기 시간 상한(초) (기본값: 30)")
+    parser.add_argument('--timeout', type=float, default=60.0, help="요청 제한 시간(초) (기본값: 60)")
+    parser.add_argument('--extensions', default=DEFAULT_EXTENSIONS,
+                        help=f"디렉토리에서 찾을 확장자 (기본값: {DEFAULT_EXTENSIONS})")
+    parser.add_argument('--upload', choices=UPLOAD_MODES, default='original',
+                        help="전송 방식 - original: 파일 그대로, jpeg: 줄여서 다시 인코딩, "
+                             "raw: 299x299 RGB 배열 (기본값: original)")
+    parser.add_argument('--upload-size', default='%dx%d' % MODEL_INPUT_SIZE,
+                        help="jpeg 전송 시 줄일 크기 WxH (기본값: %(default)s)")
+    parser.add_argument('--upload-quality', type=int, default=DEFAULT_QUALITY,
+                        help=f"jpeg 전송 시 JPEG 품질 (기본값: {DEFAULT_QUALITY})")
+    parser.add_argument('--archive', type=int, default=0,
+                        help="이미지 N장을 요청 하나로 묶어 전송 (서버가 배치 단위로 처리하고 순서대로 응답, "
+                             "thread 모드 서버 필요), 0이면 한 장씩 (기본값: 0)")
+    parser.add_argument('--text', action='store_true', help="JSON 대신 텍스트 응답 문장을 그대로 기록")
+    parser.add_argument('--progress', type=float, default=10.0, help="진행 상황 출력 간격(초), 0이면 끔 (기본값: 10)")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if not args.inputs and not args.files_from:
+        raise SystemExit("이미지 파일/디렉토리 또는 --files-from 을 지정해야 합니다.")
+    if args.concurrency < 1:
+        raise SystemExit("--concurrency 는 1 이상이어야 합니다.")
+    if args.archive < 0:
+        raise SystemExit("--archive 는 0 이상이어야 합니다.")
+    fmt = output_format(args)
+    if args.output == '-':
+        if args.resume:
+            raise SystemExit("표준 출력에는 --resume 을 사용할 수 없습니다.")
+    elif os.path.exists(args.output) and os.path.getsize(args.output) > 0 and not (args.resume or args.overwrite):
+        raise SystemExit(f"결과 파일이 이미 있습니다: {args.output} (--resume 또는 --overwrite 를 지정하세요)")
+
+    done = read_done(args.output, fmt) if args.resume else set()
+    if done:
+        print(f"이전 결과 {len(done)}건은 건너뜁니다.", file=sys.stderr)
+    address = resolve_address(args.host, args.port)
+
+    writer = ResultWriter(args.output, fmt, append=args.resume)
+    try:
+        summary = BatchRunner(args, address, done, writer).run()
+    finally:
+        writer.close()
+    if summary["interrupted"]:
+        return 130
+    return 0 if summary[STATUS_FAILED] == 0 and summary[STATUS_REJECTED] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,346 @@
+import argparse
+import io
+import json
+import math
+import os
+import platform
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from protocol import FRAME_RESULT, FrameConnection, classify_once
+
+# 합성 이미지 기본 크기 분포 (WxH:비율)
+DEFAULT_SIZES = "640x480:0.5,1920x1080:0.3,4032x3024:0.2"
+
+# 크기별로 미리 만들어 둘 합성 이미지 수
+SYNTHETIC_PER_SIZE = 8
+
+# legacy 응답에는 상태 정보가 없으므로 성공 응답 형식(텍스트 문장 / JSON)으로 판별
+LEGACY_OK_PREFIXES = ("이 꽃은", "{")
+
+
+def parse_sizes(spec: str) -> list:
+    """'640x480:0.5,1920x1080:0.5' -> [((640, 480), 0.5), ((1920, 1080), 0.5)]"""
+    sizes = []
+    for item in spec.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        dims, _, weight = item.partition(':')
+        width, height = (int(v) for v in dims.lower().split('x'))
+        sizes.append(((width, height), float(weight or 1.0)))
+    return sizes
+
+
+def synthetic_jpeg(size: tuple, rng: random.Random, quality: int) -> bytes:
+    """사진과 비슷한 압축률이 나오도록 그라디언트 위에 잡음을 얹은 JPEG 생성"""
+    base = Image.linear_gradient('L').resize(size).convert('RGB')
+    noise = Image.effect_noise(size, rng.uniform(10, 40)).convert('RGB')
+    tint = Image.new('RGB', size, tuple(rng.randrange(256) for _ in range(3)))
+    image = Image.blend(Image.blend(base, noise, 0.5), tint, 0.3)
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=quality)
+    return buffer.getvalue()
+
+
+def load_images(args, rng: random.Random) -> tuple:
+    """(이미지 바이트 목록, 선택 가중치) 반환, 디스크 I/O 가 측정에 섞이지 않도록 미리 읽어 둔다"""
+    if args.images:
+        paths = sorted(
+            os.path.join(args.images, name) for name in os.listdir(args.images)
+            if name.lower().endswith(('.jpg', '.jpeg'))
+        )
+        if not paths:
+            raise SystemExit(f"JPEG 파일이 없습니다: {args.images}")
+        if args.max_images:
+            paths = paths[:args.max_images]
+        images = []
+        for path in paths:
+            with open(path, 'rb') as f:
+                images.append(f.read())
+        return images, None
+
+    images, weights = [], []
+    for size, weight in parse_sizes(args.sizes):
+        for _ in range(SYNTHETIC_PER_SIZE):
+            images.append(synthetic_jpeg(size, rng, args.quality))
+            weights.append(weight / SYNTHETIC_PER_SIZE)
+    return images, weights
+
+
+class Recorder:
+    """요청별 (지연 시간, 성공 여부, 오류 종류) 수집"""
+
+    def __init__(self):
+        self.latencies = []
+        self.errors = {}
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+
+    def add(self, latency: float, size: int, error: str = None) -> None:
+        with self._lock:
+            self.bytes_sent += size
+            if error is None:
+                self.latencies.append(latency)
+            else:
+                self.errors[error] = self.errors.get(error, 0) + 1
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    """nearest-rank 분위수"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(q * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(recorder: Recorder, elapsed: float) -> dict:
+    latencies = sorted(recorder.latencies)
+    ok = len(latencies)
+    failed = sum(recorder.errors.values())
+    total = ok + failed
+    ms = lambda seconds: round(seconds * 1000.0, 3)
+    return {
+        "requests": total,
+        "ok": ok,
+        "errors": failed,
+        "error_rate": round(failed / total, 6) if total else 0.0,
+        "error_kinds": recorder.errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(ok / elapsed, 3) if elapsed > 0 else 0.0,
+        "sent_mb_per_s": round(recorder.bytes_sent / elapsed / 1e6, 3) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "mean": ms(sum(latencies) / ok) if ok else 0.0,
+            "p50": ms(percentile(latencies, 0.50)),
+            "p95": ms(percentile(latencies, 0.95)),
+            "p99": ms(percentile(latencies, 0.99)),
+            "max": ms(latencies[-1]) if latencies else 0.0,
+        },
+    }
+
+
+class Sender:
+    """스레드마다 하나의 연결로 요청을 보내는 송신기 (frame 은 지속 연결, legacy 는 요청마다 새 연결)"""
+
+    def __init__(self, args):
+        self.address = (args.host, args.port)
+        self.protocol = args.protocol
+        self.timeout = args.timeout
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def send(self, data: bytes) -> str:
+        """요청 하나 전송, 성공이면 None, 실패면 오류 종류 반환"""
+        try:
+            if self.protocol == 'legacy':
+                text = classify_once(self.address, data, self.timeout)
+                return None if text.startswith(LEGACY_OK_PREFIXES) else "server_error"
+
+            connection = getattr(self._local, 'connection', None)
+            if connection is None:
+                connection = FrameConnection(self.address, self.timeout)
+                self._local.connection = connection
+                with self._lock:
+                    self._connections.append(connection)
+            try:
+                frame_type, _ = connection.request(data)
+            except (ConnectionError, OSError):
+                connection.close()
+                raise
+            return None if frame_type == FRAME_RESULT else f"frame_0x{frame_type:02x}"
+        except TimeoutError:
+            return "timeout"
+        except (ConnectionError, OSError) as e:
+            return type(e).__name__
+
+    def close(self) -> None:
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+
+
+class ImagePicker:
+    """가중치에 따라 이미지를 고르고, 캐시 적중을 막기 위해 JPEG 끝에 무작위 바이트를 붙인다"""
+
+    def __init__(self, images: list, weights, seed: int, cache_bust: bool):
+        self.images = images
+        self.weights = weights
+        self.cache_bust = cache_bust
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def pick(self) -> bytes:
+        with self._lock:
+            data = self._rng.choices(self.images, self.weights)[0]
+            suffix = self._rng.getrandbits(64).to_bytes(8, 'big') if self.cache_bust else b''
+        # JPEG 디코더는 EOI 뒤의 데이터를 무시하므로 내용 해시만 달라진다
+        return data + suffix
+
+
+def run_closed(args, picker: ImagePicker, sender: Sender, recorder: Recorder, deadline: float,
+               remaining: list) -> None:
+    """closed-loop: concurrency 개의 클라이언트가 응답을 받자마자 다음 요청을 보낸다"""
+    lock = threading.Lock()
+
+    def take() -> bool:
+        if time.perf_counter() >= deadline:
+            return False
+        with lock:
+            if remaining[0] is not None:
+                if remaining[0] <= 0:
+                    return False
+                remaining[0] -= 1
+        return True
+
+    def client_loop():
+        while take():
+            data = picker.pick()
+            started = time.perf_counter()
+            error = sender.send(data)
+            recorder.add(time.perf_counter() - started, len(data), error)
+
+    threads = [threading.Thread(target=client_loop, daemon=True) for _ in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def run_open(args, picker: ImagePicker, sender: Sender, recorder: Recorder, deadline: float,
+             remaining: list) -> None:
+    """open-loop: 응답과 무관하게 rate 로 요청을 발생시킨다
+
+    지연 시간은 실제 전송 시각이 아니라 예정된 발생 시각부터 재므로, 서버가 밀려
+    송신 스레드가 모자랄 때의 대기 시간도 결과에 포함된다(coordinated omission 방지).
+    """
+    rng = random.Random(args.seed + 1)
+    executor = ThreadPoolExecutor(max_workers=args.concurrency)
+
+    def fire(scheduled: float, data: bytes):
+        error = sender.send(data)
+        recorder.add(time.perf_counter() - scheduled, len(data), error)
+
+    scheduled = time.perf_counter()
+    while scheduled < deadline and (remaining[0] is None or remaining[0] > 0):
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        executor.submit(fire, scheduled, picker.pick())
+        if remaining[0] is not None:
+            remaining[0] -= 1
+        gap = rng.expovariate(args.rate) if args.arrival == 'poisson' else 1.0 / args.rate
+        scheduled += gap
+    executor.shutdown(wait=True)
+
+
+def run_phase(args, picker, sender, duration: float, requests) -> dict:
+    recorder = Recorder()
+    started = time.perf_counter()
+    deadline = started + duration if duration > 0 else float('inf')
+    remaining = [requests]
+    if args.mode == 'open':
+        run_open(args, picker, sender, recorder, deadline, remaining)
+    else:
+        run_closed(args, picker, sender, recorder, deadline, remaining)
+    return summarize(recorder, time.perf_counter() - started)
+
+
+def compare(result: dict, baseline_path: str) -> list:
+    """기준 결과 대비 주요 지표 변화율 목록"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)["result"]
+    lines = []
+    pairs = [("throughput_rps", result["throughput_rps"], baseline["throughput_rps"]),
+             ("error_rate", result["error_rate"], baseline["error_rate"])]
+    pairs += [(f"latency_ms.{key}", result["latency_ms"][key], baseline["latency_ms"][key])
+              for key in ("p50", "p95", "p99", "max")]
+    for name, value, base in pairs:
+        change = (value - base) / base * 100.0 if base else 0.0
+        lines.append(f"{name:18s} {base:>12g} -> {value:>12g} ({change:+.1f}%)")
+    return lines
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="꽃 분류 서버 부하 생성/벤치마크")
+    parser.add_argument('--host', default='127.0.0.1', help="서버 주소")
+    parser.add_argument('--port', type=int, default=8080, help="서버 포트")
+    parser.add_argument('--protocol', choices=('frame', 'legacy'), default='frame',
+                        help="frame: 지속 연결, legacy: 8byte 길이 + 데이터 후 연결 종료 (기본값: frame)")
+    parser.add_argument('--mode', choices=('closed', 'open'), default='closed',
+                        help="closed: 동시 클라이언트 수 고정, open: 요청 발생률 고정 (기본값: closed)")
+    parser.add_argument('--concurrency', type=int, default=8, help="동시 클라이언트(송신 스레드) 수 (기본값: 8)")
+    parser.add_argument('--rate', type=float, default=50.0, help="open 모드 초당 요청 수 (기본값: 50)")
+    parser.add_argument('--arrival', choices=('poisson', 'uniform'), default='poisson',
+                        help="open 모드 요청 간격 분포 (기본값: poisson)")
+    parser.add_argument('--duration', type=float, default=30.0, help="측정 시간(초), 0이면 --requests 로만 제한")
+    parser.add_argument('--requests', type=int, default=None, help="측정 요청 수 상한")
+    parser.add_argument('--warmup', type=float, default=3.0, help="측정 전 워밍업 시간(초) (기본값: 3)")
+    parser.add_argument('--images', help="JPEG 디렉토리 (없으면 합성 이미지 사용)")
+    parser.add_argument('--max-images', type=int, default=0, help="디렉토리에서 읽을 최대 이미지 수, 0이면 전부")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help=f"합성 이미지 크기 분포 (기본값: {DEFAULT_SIZES})")
+    parser.add_argument('--quality', type=int, default=90, help="합성 이미지 JPEG 품질 (기본값: 90)")
+    parser.add_argument('--no-cache-bust', dest='cache_bust', action='store_false',
+                        help="요청마다 내용을 바꾸지 않음 (서버 캐시 적중 허용)")
+    parser.add_argument('--timeout', type=float, default=30.0, help="요청 제한 시간(초) (기본값: 30)")
+    parser.add_argument('--seed', type=int, default=0, help="난수 시드 (기본값: 0)")
+    parser.add_argument('--label', default='', help="결과에 함께 기록할 이름 (예: 릴리스 버전)")
+    parser.add_argument('--output', help="결과 JSON 파일 경로 ('-' 이면 표준 출력)")
+    parser.add_argument('--compare', help="비교할 기준 결과 JSON 파일")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.duration <= 0 and not args.requests:
+        raise SystemExit("--duration 또는 --requests 중 하나는 지정해야 합니다.")
+
+    rng = random.Random(args.seed)
+    images, weights = load_images(args, rng)
+    picker = ImagePicker(images, weights, args.seed, args.cache_bust)
+    sender = Sender(args)
+    print(f"이미지 {len(images)}개 준비 완료 ({args.mode}-loop, {args.protocol}, "
+          f"concurrency={args.concurrency}" + (f", rate={args.rate:g}/s" if args.mode == 'open' else "") + ")",
+          file=sys.stderr)
+
+    try:
+        if args.warmup > 0:
+            run_phase(args, picker, sender, args.warmup, None)
+        result = run_phase(args, picker, sender, args.duration, args.requests)
+    finally:
+        sender.close()
+
+    report = {
+        "label": args.label,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "config": {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+        "images": {"count": len(images), "mean_bytes": int(sum(map(len, images)) / len(images))},
+        "result": result,
+    }
+
+    latency = result["latency_ms"]
+    print(f"요청 {result['requests']}건, 오류율 {result['error_rate'] * 100:.2f}%, "
+          f"처리량 {result['throughput_rps']:.1f} req/s, "
+          f"지연(ms) p50={latency['p50']} p95={latency['p95']} p99={latency['p99']} max={latency['max']}",
+          file=sys.stderr)
+    if args.compare:
+        for line in compare(result, args.compare):
+            print(line, file=sys.stderr)
+
+    if args.output == '-':
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    elif args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 1 if result["ok"] == 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
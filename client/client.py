@@ -2,12 +2,14 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from PIL import Image, ImageTk
 import socket
+import sys
 import threading
-from io import BytesIO
+
+from protocol import FRAME_RESULT, FrameConnection
+from upload import UPLOAD_MODES, prepare_upload
 
 SERVER_IP = 'server'
 SERVER_PORT = 8080
-CHUNK_SIZE = 1024
 
 class FlowerClientUI:
     def __init__(self, root):
@@ -23,9 +25,15 @@ class FlowerClientUI:
         # 파일 경로 저장을 위한 변수
         self.file_path = tk.StringVar(value="")
 
+        # 전송 방식 (original: 원본, jpeg: 줄여서 재인코딩, raw: 299x299 RGB 배열)
+        self.upload_mode = tk.StringVar(value="original")
+
         # 통신 상태 변수
         self.is_sending = False
 
+        # 서버와의 지속 연결 (프레임 프로토콜), 여러 이미지 전송 시 재사용
+        self.connection = None
+
         self.create_widgets()
 
     def create_widgets(self):
@@ -51,6 +59,11 @@ class FlowerClientUI:
 
         self.send_button = ttk.Button(control_frame, text="서버로 전송", command=self.send_data, state=tk.DISABLED)
         self.send_button.grid(row=0, column=2, padx=(5, 0))
+
+        ttk.Label(control_frame, text="전송 방식").grid(row=1, column=0, padx=(0, 5), pady=(5, 0))
+        self.upload_combo = ttk.Combobox(control_frame, textvariable=self.upload_mode, values=UPLOAD_MODES,
+                                         state="readonly", width=10)
+        self.upload_combo.grid(row=1, column=1, sticky="w", padx=5, pady=(5, 0))
         
         # 종료 버튼
         bottom_frame = ttk.Frame(main_frame, padding=(10, 20, 10, 10))
@@ -120,48 +133,54 @@ class FlowerClientUI:
 
     def _network_send_thread(self):
         """실제 서버와의 통신을 처리하는 스레드 함수"""
+        self.is_sending = True
         try:
             file_path = self.file_path.get()
 
-            with open(file_path, 'rb') as file:
-                data = file.read()
-                total_size = len(data)
-
-                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                    try :
-                        sock.connect((SERVER_IP, SERVER_PORT))
-                    except socket.gaierror:
-                        # Docker환경이 아닌경우에는 localhost로 시도
-                        self.update_ui_after_send(
-                            "Docker환경이 아니므로 localhost로 재시도 합니다.", "orange")
-                        sock.connect(('127.0.0.1', SERVER_PORT))
-                    except ConnectionRefusedError:
-                        self.update_ui_after_send(
-                            f"서버({SERVER_IP}:{SERVER_PORT}) 연결 실패. 서버가 실행 중인지 확인하세요.", "red")
-                        return
-                    
-                    # 데이터 크기 전송(8byte)
-                    sock.sendall(total_size.to_bytes(8, "big"))
-
-                    # 이미지 데이터 전송
-                    for i in range(0, total_size, CHUNK_SIZE):
-                        sock.sendall(data[i:i+CHUNK_SIZE])
-
-                    # 서버 응답 수신
-                    sock.settimeout(10)
-                    response = sock.recv(1024)
-
-                    if response:
-                        result_msg = response.decode('utf-8')
-                        self.update_ui_after_send(f"분석 결과: {result_msg}", "green")
-                    else:
-                        self.update_ui_after_send('서버로부터 응답이 없습니다.', "red")
-
+            # 원본 대신 줄인 이미지를 보내면 업로드 크기와 서버 디코드 비용이 줄어든다
+            data, flags = prepare_upload(file_path, self.upload_mode.get())
+
+            try:
+                frame_type, result_msg = self._request(data, flags)
+            except ConnectionError:
+                # 서버가 유휴 연결을 닫았을 수 있으므로 새 연결로 한 번 재시도
+                self._close_connection()
+                frame_type, result_msg = self._request(data, flags)
+
+            if frame_type == FRAME_RESULT:
+                self.update_ui_after_send(f"분석 결과: {result_msg}", "green")
+            else:
+                self.update_ui_after_send(result_msg, "red")
+
+        except ConnectionRefusedError:
+            self._close_connection()
+            self.update_ui_after_send(
+                f"서버({SERVER_IP}:{SERVER_PORT}) 연결 실패. 서버가 실행 중인지 확인하세요.", "red")
         except Exception as e:
+            self._close_connection()
             self.update_ui_after_send(f'데이터 전송/수신 오류 발생: {e}', "red")
         finally:
             self.is_sending = False
 
+    def _request(self, data, flags=0):
+        """지속 연결로 이미지 한 장을 분류 요청"""
+        if self.connection is None:
+            self.connection = FrameConnection((SERVER_IP, SERVER_PORT))
+            try:
+                self.connection.connect()
+            except socket.gaierror:
+                # Docker환경이 아닌경우에는 localhost로 시도
+                self.update_ui_after_send(
+                    "Docker환경이 아니므로 localhost로 재시도 합니다.", "orange")
+                self.connection = FrameConnection(('127.0.0.1', SERVER_PORT))
+                self.connection.connect()
+        return self.connection.request(data, flags)
+
+    def _close_connection(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
     def update_ui_after_send(self, message, color):
         """스레드에서 GUI 요소를 안전하게 업데이트하는 함수"""
         self.root.after(0, self._actual_ui_update, message, color)
@@ -179,11 +198,17 @@ class FlowerClientUI:
             return
         
         if messagebox.askokcancel("종료 확인", "프로그램을 종료하시겠습니까?"):
+            self._close_connection()
             self.root.quit()
             self.root.destroy()
 
 
 if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        # 인자가 있으면 GUI 없이 일괄 분류 (예: python client.py photos/ -o results.csv, 옵션은 --help)
+        from batch import main
+        sys.exit(main())
+
     root = tk.Tk()
     app = FlowerClientUI(root)
     root.update_idletasks()
@@ -0,0 +1,296 @@
+import json
+import os
+import socket
+import struct
+import threading
+
+# 서버 server/protocol.py 와 동일한 프레임 형식 (버전 1)
+#   magic(2s) version(B) type(B) flags(H) reserved(H) request_id(I) length(I)  = 16 bytes
+FRAME_MAGIC = b'FL'
+PROTOCOL_VERSION = 1
+FRAME_HEADER = struct.Struct('>2sBBHHII')
+FRAME_HEADER_SIZE = FRAME_HEADER.size
+
+# 프레임 종류
+FRAME_CLASSIFY = 0x01
+FRAME_HEALTH = 0x02
+FRAME_ARCHIVE = 0x03        # 여러 이미지 묶음, 본문은 (항목 길이(4byte) + 이미지 데이터) 의 반복
+FRAME_RESULT = 0x81
+FRAME_ERROR = 0x82
+FRAME_BUSY = 0x83
+FRAME_STATUS = 0x84
+FRAME_ARCHIVE_END = 0x85    # FRAME_ARCHIVE 의 마지막 응답, 본문은 {"count", "errors", "busy"} JSON
+
+ARCHIVE_ENTRY_HEADER = struct.Struct('>I')
+MAX_FRAME_LENGTH = 0xFFFFFFFF
+
+# 요청 플래그
+FLAG_JSON = 0x0001  # 응답을 JSON(상위 k개, 확률, 단계별 시간)으로 요청
+FLAG_RAW_RGB = 0x0002  # 본문이 299x299 RGB uint8 배열 (서버가 디코드/리사이즈를 생략)
+
+
+class ProtocolError(Exception):
+    """서버 응답 프레임이 잘못된 경우"""
+
+
+def recv_exact(sock: socket.socket, size: int) -> bytes:
+    """정확히 size 바이트 수신, 연결이 끊기면 ConnectionError"""
+    buf = bytearray(size)
+    view = memoryview(buf)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:])
+        if n == 0:
+            raise ConnectionError("서버가 연결을 닫았습니다.")
+        received += n
+    return bytes(buf)
+
+
+def classify_once(address: tuple, data: bytes, timeout: float = 10) -> str:
+    """단발성(legacy) 요청: 8byte 크기 + 데이터 전송 후 연결이 닫힐 때까지 응답 수신"""
+    with socket.create_connection(address, timeout=timeout) as sock:
+        sock.sendall(len(data).to_bytes(8, "big"))
+        sock.sendall(data)
+        chunks = []
+        while True:
+            chunk = sock.recv(4096)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    return b''.join(chunks).decode('utf-8')
+
+
+class FrameConnection:
+    """프레임 프로토콜로 여러 요청을 주고받는 지속 연결
+
+    send_request / recv_response 를 나눠 쓰면 응답을 기다리지 않고
+    여러 요청을 먼저 보낼 수 있다(파이프라이닝). 응답은 순서가 바뀔 수 있으므로
+    request_id 로 요청과 짝을 맞춘다.
+    """
+
+    def __init__(self, address: tuple, timeout: float = 10):
+        self.address = address
+        self.timeout = timeout
+        self.sock = None
+        self._next_id = 1
+        self._send_lock = threading.Lock()
+        self.archive_summary = None     # 마지막 classify_archive 의 FRAME_ARCHIVE_END 내용
+
+    def connect(self) -> None:
+        if self.sock is None:
+            self.sock = socket.create_connection(self.address, timeout=self.timeout)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def close(self) -> None:
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            finally:
+                self.sock = None
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def send_request(self, data: bytes, frame_type: int = FRAME_CLASSIFY, flags: int = 0) -> int:
+        """요청 프레임 전송 후 request_id 반환"""
+        self.connect()
+        with self._send_lock:
+            request_id = self._next_id
+            self._next_id = (self._next_id % 0xFFFFFFFF) + 1
+            self.sock.sendall(FRAME_HEADER.pack(FRAME_MAGIC, PROTOCOL_VERSION, frame_type, flags, 0,
+                                                request_id, len(data)))
+            self.sock.sendall(data)
+        return request_id
+
+    def send_file(self, path: str, frame_type: int = FRAME_CLASSIFY, flags: int = 0) -> int:
+        """파일 내용을 요청 프레임으로 전송 후 request_id 반환
+
+        파일 전체를 메모리에 올리지 않고 socket.sendfile 로 디스크에서 바로 보낸다.
+        """
+        self.connect()
+        with open(path, 'rb') as f, self._send_lock:
+            size = os.fstat(f.fileno()).st_size
+            request_id = self._next_id
+            self._next_id = (self._next_id % 0xFFFFFFFF) + 1
+            self.sock.sendall(FRAME_HEADER.pack(FRAME_MAGIC, PROTOCOL_VERSION, frame_type, flags, 0,
+                                                request_id, size))
+            sent = self.sock.sendfile(f, 0, size)
+            if sent != size:
+                # 전송 중 파일이 잘리면 프레임 길이를 맞출 수 없으므로 연결을 버린다
+                self.close()
+                raise ConnectionError(f"파일 전송이 중간에 끝났습니다: {path}")
+        return request_id
+
+    def _reserve_id(self) -> int:
+        with self._send_lock:
+            request_id = self._next_id
+            self._next_id = (self._next_id % 0xFFFFFFFF) + 1
+        return request_id
+
+    @staticmethod
+    def archive_sizes(items: list) -> list:
+        """FRAME_ARCHIVE 항목별 크기, 프레임 최대 크기를 넘으면 ValueError"""
+        sizes = [os.path.getsize(item) if isinstance(item, str) else len(item) for item in items]
+        length = sum(sizes) + ARCHIVE_ENTRY_HEADER.size * len(sizes)
+        if length > MAX_FRAME_LENGTH:
+            raise ValueError(f"아카이브 크기 {length} bytes 가 프레임 최대 크기를 넘습니다.")
+        return sizes
+
+    def send_archive(self, items: list, flags: int = 0, request_id: int = None, sizes: list = None) -> int:
+        """여러 이미지를 FRAME_ARCHIVE 하나로 전송 후 request_id 반환
+
+        items 는 파일 경로(str) 또는 bytes 이며, 파일은 메모리에 올리지 않고 sendfile 로 보낸다.
+        프레임 길이를 먼저 보내야 하므로 파일 크기는 전송 전에 한 번에 확인한다.
+        """
+        if sizes is None:
+            sizes = self.archive_sizes(items)
+        length = sum(sizes) + ARCHIVE_ENTRY_HEADER.size * len(sizes)
+        if request_id is None:
+            request_id = self._reserve_id()
+        self.connect()
+        with self._send_lock:
+            self.sock.sendall(FRAME_HEADER.pack(FRAME_MAGIC, PROTOCOL_VERSION, FRAME_ARCHIVE, flags, 0,
+                                                request_id, length))
+            for item, size in zip(items, sizes):
+                self.sock.sendall(ARCHIVE_ENTRY_HEADER.pack(size))
+                if not isinstance(item, str):
+                    self.sock.sendall(item)
+                    continue
+                try:
+                    with open(item, 'rb') as f:
+                        sent = self.sock.sendfile(f, 0, size)
+                except OSError:
+                    sent = -1
+                if sent != size:
+                    # 이미 보낸 프레임 길이를 맞출 수 없으므로 연결을 버린다
+                    self.close()
+                    raise ConnectionError(f"파일 전송이 중간에 끝났습니다: {item}")
+        return request_id
+
+    def classify_archive(self, items: list, flags: int = 0):
+        """items 를 FRAME_ARCHIVE 하나로 보내고 항목 순서대로 (frame_type, 응답 문자열) 생성
+
+        전송은 별도 스레드에서 하므로 서버가 보내는 결과를 전송이 끝나기 전부터 받는다.
+        서버가 항목을 거절하면 이후 항목은 모두 거절되므로 남은 응답을 FRAME_ARCHIVE_END 까지
+        받아 버린 뒤 (FRAME_BUSY, 응답) 하나만 생성하고 끝나며, 연결 오류 응답
+        (request_id 0)이나 서버가 중간에 중단한 경우는 ProtocolError 로 올린다.
+        마지막 요약(FRAME_ARCHIVE_END)은 archive_summary 에 저장한다.
+        """
+        sizes = self.archive_sizes(items)
+        self.connect()
+        self.archive_summary = None
+        request_id = self._reserve_id()
+        error = []
+
+        def _send():
+            try:
+                self.send_archive(items, flags, request_id, sizes)
+            except Exception as e:
+                # 받는 쪽에서 연결을 먼저 닫은 경우도 포함
+                error.append(e)
+
+        sender = threading.Thread(target=_send, name="archive-sender", daemon=True)
+        sender.start()
+        finished = False
+        try:
+            while True:
+                try:
+                    rid, frame_type, payload = self.recv_response()
+                except (OSError, ProtocolError):
+                    sender.join()
+                    if error and isinstance(error[0], OSError):
+                        # 파일 전송 실패 등 보내는 쪽의 원인을 알린다
+                        raise error[0]
+                    raise
+                if rid != request_id and rid != 0:
+                    continue
+                text = payload.decode('utf-8')
+                if frame_type == FRAME_ARCHIVE_END:
+                    self.archive_summary = json.loads(text)
+                    if "error" in self.archive_summary:
+                        # 서버가 중간에 중단한 경우, 이어서 연결 오류 응답을 보내고 연결을 닫는다
+                        raise ProtocolError(self.archive_summary["error"])
+                    finished = True
+                    break
+                if rid == 0:
+                    raise ProtocolError(text)
+                if frame_type == FRAME_BUSY:
+                    self._skip_archive(request_id)
+                    finished = True
+                    yield frame_type, text
+                    break
+                yield frame_type, text
+        finally:
+            if not finished:
+                # 중간에 그만두면 남은 응답과 짝을 맞출 수 없으므로 연결을 버린다
+                self.close()
+            sender.join()
+
+    def _skip_archive(self, request_id: int) -> None:
+        """FRAME_ARCHIVE_END 까지 남은 항목 응답을 받아 버림 (요약은 archive_summary 에 저장)"""
+        while True:
+            rid, frame_type, payload = self.recv_response()
+            if rid == 0:
+                raise ProtocolError(payload.decode('utf-8'))
+            if rid == request_id and frame_type == FRAME_ARCHIVE_END:
+                self.archive_summary = json.loads(payload.decode('utf-8'))
+                return
+
+    def recv_response(self) -> tuple:
+        """응답 프레임 하나 수신, (request_id, frame_type, payload) 반환"""
+        header = recv_exact(self.sock, FRAME_HEADER_SIZE)
+        magic, version, frame_type, flags, _, request_id, length = FRAME_HEADER.unpack(header)
+        if magic != FRAME_MAGIC or version != PROTOCOL_VERSION:
+            raise ProtocolError("서버 응답 프레임 형식이 올바르지 않습니다.")
+        payload = recv_exact(self.sock, length) if length else b''
+        return request_id, frame_type, payload
+
+    def request(self, data: bytes, flags: int = 0, frame_type: int = FRAME_CLASSIFY) -> tuple:
+        """요청 하나를 보내고 그 응답을 기다림, (frame_type, 응답 문자열) 반환"""
+        request_id = self.send_request(data, frame_type, flags)
+        while True:
+            rid, frame_type, payload = self.recv_response()
+            if rid == request_id or rid == 0:
+                return frame_type, payload.decode('utf-8')
+
+    def request_file(self, path: str, flags: int = 0) -> tuple:
+        """파일 하나를 분류 요청하고 응답을 기다림, (frame_type, 응답 문자열) 반환"""
+        request_id = self.send_file(path, flags=flags)
+        while True:
+            rid, frame_type, payload = self.recv_response()
+            if rid == request_id or rid == 0:
+                return frame_type, payload.decode('utf-8')
+
+    def health(self) -> dict:
+        """서버 상태 확인, {"status", "ready", ...} 반환"""
+        frame_type, text = self.request(b'', frame_type=FRAME_HEALTH)
+        if frame_type != FRAME_STATUS:
+            raise ProtocolError(text)
+        return json.loads(text)
+
+    def classify_many(self, items, window: int = 16, flags: int = 0) -> dict:
+        """여러 데이터를 파이프라이닝으로 전송, {인덱스: (frame_type, 응답 문자열)} 반환
+
+        응답을 읽지 않고 무한정 보내면 양쪽 소켓 버퍼가 차서 멈출 수 있으므로
+        응답 대기 중인 요청 수를 window 개로 제한한다.
+        """
+        pending = {}
+        results = {}
+        for i, data in enumerate(items):
+            while len(pending) >= window:
+                self._collect(pending, results)
+            pending[self.send_request(data, flags=flags)] = i
+        while pending:
+            self._collect(pending, results)
+        return results
+
+    def _collect(self, pending: dict, results: dict) -> None:
+        rid, frame_type, payload = self.recv_response()
+        if rid == 0:
+            raise ProtocolError(payload.decode('utf-8'))
+        if rid in pending:
+            results[pending.pop(rid)] = (frame_type, payload.decode('utf-8'))
@@ -0,0 +1,72 @@
+import io
+
+from PIL import Image
+
+from protocol import FLAG_RAW_RGB
+
+# 서버 모델 입력 크기 (server/preprocess.py 의 MODEL_INPUT_SIZE 와 같아야 한다)
+MODEL_INPUT_SIZE = (299, 299)
+
+# 전송 방식
+#   original: 파일 그대로 전송
+#   jpeg: 목표 크기로 줄여 JPEG 로 다시 인코딩
+#   raw: 서버 전처리와 같은 방식으로 299x299 RGB 배열을 만들어 전송 (서버 디코드 생략)
+UPLOAD_MODES = ("original", "jpeg", "raw")
+DEFAULT_QUALITY = 90
+
+
+def parse_size(text: str) -> tuple:
+    """'299x299' -> (299, 299)"""
+    width, height = (int(v) for v in text.lower().split('x'))
+    return width, height
+
+
+def load_resized(path: str, size: tuple) -> Image.Image:
+    """이미지를 size 크기의 RGB 로 읽는다
+
+    서버 to_model_input 과 같은 순서(draft 축소 디코드 -> RGB 변환 -> reducing_gap 리사이즈)로
+    처리하므로, 모델 입력 크기로 만든 결과는 서버가 원본으로 만든 입력과 같다.
+    모델이 종횡비를 무시하고 정사각형으로 늘려 받으므로 여기서도 종횡비는 유지하지 않는다.
+    """
+    with Image.open(path) as source:
+        if source.format == 'JPEG':
+            source.draft('RGB', size)
+        image = source
+        if image.mode != 'RGB':
+            if image.mode == 'P' and 'transparency' in image.info:
+                image = image.convert('RGBA')
+            image = image.convert('RGB')
+        if image.size != size:
+            image = image.resize(size, reducing_gap=3.0)
+        # 변환/리사이즈가 없었으면 파일을 닫기 전에 픽셀을 읽어 둔다
+        if image is source:
+            image = source.copy()
+    return image
+
+
+def shrink_jpeg(path: str, size: tuple = MODEL_INPUT_SIZE, quality: int = DEFAULT_QUALITY) -> bytes:
+    """size 로 줄인 JPEG 바이트, 원본이 이미 그보다 작은 JPEG 이면 원본 그대로"""
+    with Image.open(path) as image:
+        small_enough = image.format == 'JPEG' and image.width <= size[0] and image.height <= size[1]
+    if small_enough:
+        with open(path, 'rb') as f:
+            return f.read()
+    buffer = io.BytesIO()
+    load_resized(path, size).save(buffer, 'JPEG', quality=quality)
+    return buffer.getvalue()
+
+
+def raw_rgb(path: str) -> bytes:
+    """FLAG_RAW_RGB 요청 본문 (299x299 RGB uint8, 행 우선)"""
+    return load_resized(path, MODEL_INPUT_SIZE).tobytes()
+
+
+def prepare_upload(path: str, mode: str, size: tuple = MODEL_INPUT_SIZE,
+                   quality: int = DEFAULT_QUALITY) -> tuple:
+    """전송 방식에 맞춰 (본문 바이트, 요청 flags) 반환"""
+    if mode == 'raw':
+        return raw_rgb(path), FLAG_RAW_RGB
+    if mode == 'jpeg':
+        return shrink_jpeg(path, size, quality), 0
+    with open(path, 'rb') as f:
+        return f.read(), 0
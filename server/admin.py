@@ -0,0 +1,402 @@
+import argparse
+import collections
+import io
+import marshal
+import os
+import pstats
+import re
+import socket
+import sys
+import tempfile
+import threading
+import time
+import traceback
+import tracemalloc
+
+# 운영 중인 서버를 재시작하지 않고 들여다보는 로컬 관리 채널
+#
+# 127.0.0.1 에만 바인드하며, 명령 한 줄을 받아 텍스트로 응답한 뒤 연결을 닫는다.
+#   python admin.py --port 8091 threads
+#   python admin.py --port 8091 profile 10 pstats
+#   python admin.py --port 8091 mem start 5 / mem snapshot / mem diff
+# 명령을 받기 전에는 대기 스레드 하나만 있고 어떤 추적 훅도 설치하지 않는다.
+
+ADMIN_HOST = '127.0.0.1'
+
+HELP = """명령:
+  threads                                        스레드별 스택 덤프
+  profile start [간격ms] [cpu|wall]               샘플링 프로파일 시작
+  profile stop [collapsed|pstats]                프로파일 종료 후 파일로 저장
+  profile <초> [collapsed|pstats] [간격ms] [cpu|wall]  N초 동안 프로파일
+  mem start [프레임 수]                            tracemalloc 추적 시작
+  mem snapshot [개수]                             스냅샷 저장 (다음 diff 의 기준)
+  mem diff [개수]                                 직전 스냅샷 대비 증가량
+  mem stop                                       추적 종료
+"""
+
+# 명령 한 줄 최대 길이
+MAX_COMMAND_BYTES = 4096
+
+
+def thread_dump() -> str:
+    """모든 스레드의 현재 스택 (이름별 스레드 수 요약 포함)"""
+    frames = sys._current_frames()
+    threads = threading.enumerate()
+    # Thread-12 (handle_client) 처럼 번호만 다른 스레드는 묶어서 센다
+    groups = collections.Counter(re.sub(r'\d+', 'N', t.name) for t in threads)
+    lines = [f"스레드 {len(threads)}개: " + ", ".join(f"{name} x{n}" for name, n in groups.most_common())]
+    for thread in threads:
+        lines.append(f'\n"{thread.name}" ident={thread.ident} native_id={thread.native_id} daemon={thread.daemon}')
+        frame = frames.get(thread.ident)
+        if frame is not None:
+            lines.append("".join(traceback.format_stack(frame)).rstrip())
+    return "\n".join(lines) + "\n"
+
+
+def _cpu_ticks(native_id: int):
+    """스레드의 누적 CPU 시간 (utime + stime, clock tick), 읽을 수 없으면 None"""
+    try:
+        with open(f"/proc/self/task/{native_id}/stat", 'rb') as f:
+            fields = f.read().rsplit(b')', 1)[1].split()
+        return int(fields[11]) + int(fields[12])
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def _label(func: tuple) -> str:
+    filename, line, name = func
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+class SamplingProfiler:
+    """sys._current_frames() 를 주기적으로 읽는 샘플링 프로파일러
+
+    프로파일 중에만 샘플링 스레드가 돌며 인터프리터 훅은 쓰지 않는다.
+    cpu 모드는 직전 샘플 이후 CPU 시간이 늘어난 스레드만 세어 대기 중인 스레드를 뺀다
+    (/proc 이 없는 환경에서는 wall 모드로 동작).
+    """
+
+    def __init__(self, interval: float = 0.005, mode: str = 'cpu'):
+        self.interval = interval
+        self.mode = mode if mode == 'wall' or os.path.exists("/proc/self/task") else 'wall'
+        self.samples = collections.Counter()    # (스레드 이름, 스택) -> 샘플 수, 스택은 바깥 -> 안쪽 함수
+        self.rounds = 0
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="admin-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        last_ticks = {}
+        started = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            self.rounds += 1
+            threads = {t.ident: t for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                thread = threads.get(ident)
+                if ident == own or thread is None:
+                    continue
+                if self.mode == 'cpu':
+                    ticks = _cpu_ticks(thread.native_id)
+                    previous = last_ticks.get(ident)
+                    last_ticks[ident] = ticks
+                    if ticks is None or previous is None or ticks == previous:
+                        continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                    frame = frame.f_back
+                stack.reverse()
+                self.samples[(thread.name, tuple(stack))] += 1
+        self.elapsed = time.perf_counter() - started
+
+    def sample_seconds(self) -> float:
+        """샘플 하나가 나타내는 시간(초)"""
+        return self.elapsed / self.rounds if self.rounds else self.interval
+
+    def collapsed(self) -> str:
+        """flamegraph.pl / speedscope 용 collapsed stack (스레드;바깥;...;안쪽 샘플수)"""
+        lines = []
+        for (name, stack), count in self.samples.most_common():
+            lines.append(";".join([name] + [_label(func) for func in stack]) + f" {count}")
+        return "\n".join(lines) + "\n"
+
+    def pstats_data(self) -> dict:
+        """pstats.Stats 로 읽을 수 있는 형식 {함수: (cc, nc, tt, ct, {호출자: (cc, nc, tt, ct)})}
+
+        호출 횟수 자리에는 샘플 수가, 시간 자리에는 샘플 수 x 샘플 간격이 들어간다.
+        """
+        unit = self.sample_seconds()
+        stats = {}
+        for (_, stack), count in self.samples.items():
+            seconds = count * unit
+            seen = set()
+            for i, func in enumerate(stack):
+                entry = stats.setdefault(func, [0, 0, 0.0, 0.0, {}])
+                leaf = i == len(stack) - 1
+                entry[0] += count
+                entry[1] += count
+                if leaf:
+                    entry[2] += seconds
+                # 재귀 호출은 누적 시간에 한 번만 더한다
+                if func not in seen:
+                    entry[3] += seconds
+                    seen.add(func)
+                if i > 0:
+                    caller = entry[4].setdefault(stack[i - 1], [0, 0, 0.0, 0.0])
+                    caller[0] += count
+                    caller[1] += count
+                    caller[2] += seconds if leaf else 0.0
+                    caller[3] += seconds
+        return {func: (cc, nc, tt, ct, {caller: tuple(v) for caller, v in callers.items()})
+                for func, (cc, nc, tt, ct, callers) in stats.items()}
+
+    def summary(self) -> str:
+        total = sum(self.samples.values())
+        return (f"{self.elapsed:.1f}초, 샘플 {total}개 ({self.rounds}회 x {self.sample_seconds() * 1000.0:.1f}ms, "
+                f"{self.mode})")
+
+
+class MemoryTracker:
+    """tracemalloc 스냅샷과 직전 스냅샷 대비 증가량 (start 전에는 추적하지 않는다)"""
+
+    FILTERS = (
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    )
+
+    def __init__(self, dump_dir: str):
+        self.dump_dir = dump_dir
+        self.baseline = None
+
+    def start(self, frames: int = 1) -> str:
+        if tracemalloc.is_tracing():
+            return "이미 추적 중입니다.\n"
+        tracemalloc.start(max(1, frames))
+        self.baseline = None
+        return f"tracemalloc 시작 (프레임 {max(1, frames)}개)\n"
+
+    def stop(self) -> str:
+        tracemalloc.stop()
+        self.baseline = None
+        return "tracemalloc 종료\n"
+
+    def _take(self):
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("먼저 'mem start' 로 추적을 시작해야 합니다.")
+        return tracemalloc.take_snapshot().filter_traces(self.FILTERS)
+
+    @staticmethod
+    def _usage() -> str:
+        current, peak = tracemalloc.get_traced_memory()
+        return f"추적 중 메모리 {current / 1024 / 1024:.1f}MB (최대 {peak / 1024 / 1024:.1f}MB)"
+
+    def snapshot(self, limit: int = 20) -> str:
+        snapshot = self._take()
+        self.baseline = snapshot
+        path = os.path.join(self.dump_dir, time.strftime("snapshot-%Y%m%d-%H%M%S.tracemalloc"))
+        snapshot.dump(path)
+        lines = [self._usage(), f"스냅샷: {path}"]
+        lines.extend(str(stat) for stat in snapshot.statistics('lineno')[:limit])
+        return "\n".join(lines) + "\n"
+
+    def diff(self, limit: int = 20) -> str:
+        if self.baseline is None:
+            raise RuntimeError("기준 스냅샷이 없습니다. 먼저 'mem snapshot' 을 실행하세요.")
+        snapshot = self._take()
+        stats = snapshot.compare_to(self.baseline, 'lineno')
+        self.baseline = snapshot
+        growth = sum(stat.size_diff for stat in stats)
+        lines = [self._usage(), f"직전 스냅샷 대비 {growth / 1024:+.1f}KiB"]
+        lines.extend(str(stat) for stat in stats[:limit])
+        return "\n".join(lines) + "\n"
+
+
+class AdminServer:
+    """로컬 관리 채널 (스레드 덤프, 샘플링 프로파일, tracemalloc)"""
+
+    def __init__(self, port: int, dump_dir: str = '', log=None):
+        self.port = port
+        self.dump_dir = dump_dir or os.path.join(tempfile.gettempdir(), "flower-admin")
+        self.log = log or (lambda message, msg_type="INFO": None)
+        self.memory = MemoryTracker(self.dump_dir)
+        self.profiler = None
+        self._lock = threading.Lock()
+        self._socket = None
+        self._thread = None
+
+    def start(self) -> None:
+        os.makedirs(self.dump_dir, exist_ok=True)
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((ADMIN_HOST, self.port))
+        sock.listen(8)
+        self.port = sock.getsockname()[1]   # 0 을 지정한 경우 실제 포트
+        self._socket = sock
+        self._thread = threading.Thread(target=self._accept_loop, args=(sock,), name="admin", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        sock, self._socket = self._socket, None
+        if sock is None:
+            return
+        # close 만으로는 다른 스레드의 accept() 가 깨어나지 않는 플랫폼이 있다
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        sock.close()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        with self._lock:
+            if self.profiler is not None and self.profiler.running:
+                self.profiler.stop()
+            self.profiler = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def _accept_loop(self, sock: socket.socket) -> None:
+        while True:
+            try:
+                conn, _ = sock.accept()
+            except OSError:
+                break
+            threading.Thread(target=self._handle, args=(conn,), name="admin-command", daemon=True).start()
+
+    def _handle(self, conn: socket.socket) -> None:
+        with conn:
+            try:
+                conn.settimeout(10)
+                data = b''
+                while b'\n' not in data and len(data) < MAX_COMMAND_BYTES:
+                    chunk = conn.recv(1024)
+                    if not chunk:
+                        break
+                    data += chunk
+                conn.settimeout(None)
+                command = data.decode('utf-8', 'replace').strip()
+                try:
+                    reply = self.execute(command.split())
+                except Exception as e:
+                    reply = f"오류: {str(e)}\n"
+                conn.sendall(reply.encode('utf-8'))
+            except OSError:
+                pass
+
+    def execute(self, args: list) -> str:
+        """명령 실행 후 응답 텍스트 반환"""
+        if not args or args[0] == 'help':
+            return HELP
+        self.log(f"관리 명령: {' '.join(args)}")
+        if args[0] == 'threads':
+            return thread_dump()
+        if args[0] == 'profile':
+            return self._profile(args[1:])
+        if args[0] == 'mem':
+            return self._mem(args[1:])
+        return f"알 수 없는 명령: {args[0]}\n" + HELP
+
+    def _profile(self, args: list) -> str:
+        if not args:
+            return HELP
+        if args[0] == 'stop':
+            return self._stop_profile(args[1] if len(args) > 1 else 'collapsed')
+        if args[0] == 'start':
+            self._start_profile(*args[1:3])
+            return f"프로파일 시작 ({self.profiler.mode}, {self.profiler.interval * 1000.0:g}ms 간격)\n"
+
+        seconds = float(args[0])
+        output = args[1] if len(args) > 1 else 'collapsed'
+        self._start_profile(*args[2:4])
+        time.sleep(seconds)
+        return self._stop_profile(output)
+
+    def _start_profile(self, interval_ms: str = '5', mode: str = 'cpu') -> None:
+        with self._lock:
+            if self.profiler is not None and self.profiler.running:
+                raise RuntimeError("이미 프로파일 중입니다.")
+            self.profiler = SamplingProfiler(max(0.001, float(interval_ms) / 1000.0), mode)
+            self.profiler.start()
+
+    def _stop_profile(self, output: str) -> str:
+        if output not in ('collapsed', 'pstats'):
+            raise ValueError(f"알 수 없는 출력 형식: {output}")
+        with self._lock:
+            profiler = self.profiler
+            if profiler is None or not profiler.running:
+                raise RuntimeError("프로파일 중이 아닙니다.")
+            profiler.stop()
+            self.profiler = None
+
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        if output == 'collapsed':
+            path = os.path.join(self.dump_dir, f"profile-{stamp}.collapsed")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(profiler.collapsed())
+            # 가장 많이 잡힌 (안쪽) 함수
+            leaves = collections.Counter()
+            for (_, stack), count in profiler.samples.items():
+                if stack:
+                    leaves[_label(stack[-1])] += count
+            lines = [f"프로파일 {profiler.summary()}", f"collapsed stack: {path}"]
+            lines.extend(f"{count:8d}  {label}" for label, count in leaves.most_common(20))
+            return "\n".join(lines) + "\n"
+
+        path = os.path.join(self.dump_dir, f"profile-{stamp}.pstats")
+        with open(path, 'wb') as f:
+            marshal.dump(profiler.pstats_data(), f)
+        buffer = io.StringIO()
+        if profiler.samples:
+            pstats.Stats(path, stream=buffer).sort_stats('cumulative').print_stats(25)
+        return f"프로파일 {profiler.summary()}\npstats: {path}\n" + buffer.getvalue()
+
+    def _mem(self, args: list) -> str:
+        action = args[0] if args else 'snapshot'
+        if action == 'start':
+            return self.memory.start(int(args[1]) if len(args) > 1 else 1)
+        if action == 'stop':
+            return self.memory.stop()
+        limit = int(args[1]) if len(args) > 1 else 20
+        if action == 'snapshot':
+            return self.memory.snapshot(limit)
+        if action == 'diff':
+            return self.memory.diff(limit)
+        return f"알 수 없는 mem 명령: {action}\n" + HELP
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="꽃 분류 서버 관리 채널 클라이언트")
+    parser.add_argument('--port', type=int, required=True, help="서버의 --admin-port")
+    parser.add_argument('command', nargs='*', help="관리 명령 (help 로 목록 확인)")
+    args = parser.parse_args(argv)
+
+    reply = bytearray()
+    with socket.create_connection((ADMIN_HOST, args.port)) as conn:
+        conn.sendall((" ".join(args.command or ['help']) + "\n").encode('utf-8'))
+        while True:
+            chunk = conn.recv(65536)
+            if not chunk:
+                break
+            reply += chunk
+    sys.stdout.write(reply.decode('utf-8', 'replace'))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
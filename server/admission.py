@@ -0,0 +1,148 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+# 거절 사유
+#   connections: 동시 연결 수 초과, inflight: 동시 처리 요청 수 초과 (asyncio),
+#   queue_full: 처리 대기 요청 수 초과, wait_time: 예상 대기 시간 초과, rate_limited: IP 별 요청률 초과
+REASONS = ("connections", "inflight", "queue_full", "wait_time", "rate_limited")
+
+# 처리 속도(초당 완료 수)를 다시 계산하는 데 필요한 최소 busy 시간(초)
+RATE_WINDOW = 1.0
+
+# 요청률 제한을 위해 기억하는 최대 클라이언트 IP 수 (오래 안 보인 IP 부터 버림)
+MAX_TRACKED_CLIENTS = 10000
+
+
+class Overloaded(Exception):
+    """과부하 또는 요청률 제한으로 요청을 거절하는 경우"""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"요청 거절 ({reason}), {retry_after:.1f}초 후 재시도")
+        self.reason = reason
+        self.retry_after = retry_after
+
+    def reply(self, as_json: bool = False) -> str:
+        """클라이언트에 보낼 혼잡 응답"""
+        if as_json:
+            return json.dumps({"error": "overloaded", "reason": self.reason,
+                               "retry_after_ms": int(self.retry_after * 1000)})
+        return f"서버가 혼잡합니다. {self.retry_after:.1f}초 후 다시 시도해 주세요."
+
+
+class RateLimiter:
+    """클라이언트 IP 별 토큰 버킷 (초당 rate 개 충전, 최대 burst 개)"""
+
+    def __init__(self, rate: float, burst: int, max_clients: int = MAX_TRACKED_CLIENTS):
+        self.rate = rate
+        self.burst = max(1.0, float(burst))
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()   # ip -> [남은 토큰, 마지막 갱신 시각]
+        self._lock = threading.Lock()
+
+    def acquire(self, key) -> float:
+        """토큰 하나 사용, 허용이면 0, 아니면 다음 토큰까지 남은 시간(초) 반환"""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [self.burst, now]
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            if bucket[0] >= 1.0:
+                bucket[0] -= 1.0
+                return 0.0
+            return (1.0 - bucket[0]) / self.rate
+
+
+class AdmissionController:
+    """분류 요청 수락 여부 판단
+
+    처리 대기 중인 요청 수(pending)가 max_queue 를 넘거나, 최근 처리 속도로 추정한
+    대기 시간이 max_queue_wait_ms 를 넘으면 큐에 넣지 않고 바로 거절한다.
+    과부하 시 모든 요청이 느려지는 대신 일부 요청을 빠르게 실패시키기 위함이다.
+    admit() 가 성공한 요청은 끝날 때 반드시 release() 를 호출해야 한다.
+    """
+
+    def __init__(self, config, registry):
+        self.max_queue = config.max_queue
+        self.max_wait = config.max_queue_wait_ms / 1000.0
+        self.rate_limiter = RateLimiter(config.rate_limit, config.rate_burst) if config.rate_limit > 0 else None
+
+        self.pending = 0
+        self.service_rate = 0.0     # pending 이 있는 동안의 초당 완료 수 (지수 이동 평균)
+        self._lock = threading.Lock()
+        self._completed = 0
+        self._busy = 0.0
+        self._last_change = time.monotonic()
+
+        self.rejections = {
+            reason: registry.counter("flower_rejected_total", "과부하/요청률 제한으로 거절한 요청 수", reason=reason)
+            for reason in REASONS
+        }
+        self.timeouts = {
+            kind: registry.counter("flower_timeouts_total", "수신/유휴 시간 초과로 닫은 연결 수", kind=kind)
+            for kind in ("read", "idle")
+        }
+        registry.register_callback("flower_pending_requests", "처리 대기/진행 중인 요청 수", lambda: self.pending)
+        registry.register_callback("flower_estimated_wait_ms", "새 요청의 예상 대기 시간(ms)",
+                                   lambda: self.estimated_wait() * 1000.0)
+
+    def _account(self, now: float) -> None:
+        # pending 이 있던 구간만 busy 시간으로 더해, 한가할 때의 요청률이 아닌 처리 능력을 잰다
+        if self.pending > 0:
+            self._busy += now - self._last_change
+        self._last_change = now
+
+    def estimated_wait(self) -> float:
+        """지금 들어온 요청이 기다릴 것으로 예상되는 시간(초)"""
+        if self.service_rate <= 0:
+            return 0.0
+        return self.pending / self.service_rate
+
+    def overloaded(self, reason: str, retry_after: float = 1.0) -> Overloaded:
+        """거절 횟수를 세고 클라이언트에 돌려줄 Overloaded 반환"""
+        self.rejections[reason].inc()
+        return Overloaded(reason, max(0.1, retry_after))
+
+    def admit(self, client_ip) -> None:
+        """요청 수락, 거절이면 Overloaded 발생"""
+        if self.rate_limiter is not None:
+            wait = self.rate_limiter.acquire(client_ip)
+            if wait > 0:
+                raise self.overloaded("rate_limited", wait)
+        with self._lock:
+            if self.max_queue > 0 and self.pending >= self.max_queue:
+                reason = "queue_full"
+            elif self.max_wait > 0 and self.estimated_wait() > self.max_wait:
+                reason = "wait_time"
+            else:
+                self._account(time.monotonic())
+                self.pending += 1
+                return
+            retry_after = self.estimated_wait() or 1.0
+        raise self.overloaded(reason, retry_after)
+
+    def release(self, _future=None) -> None:
+        """수락한 요청 완료 (Future.add_done_callback 에 그대로 넘길 수 있다)"""
+        with self._lock:
+            self._account(time.monotonic())
+            self.pending -= 1
+            self._completed += 1
+            if self._busy >= RATE_WINDOW:
+                rate = self._completed / self._busy
+                self.service_rate = rate if self.service_rate <= 0 else 0.7 * self.service_rate + 0.3 * rate
+                self._completed = 0
+                self._busy = 0.0
+
+    def summary(self) -> str:
+        rejected = " ".join(f"{reason}={counter.value()}" for reason, counter in self.rejections.items())
+        timeouts = " ".join(f"{kind}={counter.value()}" for kind, counter in self.timeouts.items())
+        return (f"pending={self.pending} service_rate={self.service_rate:.1f}/s "
+                f"est_wait={self.estimated_wait() * 1000.0:.0f}ms rejected[{rejected}] timeouts[{timeouts}]")
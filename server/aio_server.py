@@ -0,0 +1,312 @@
+import asyncio
+import datetime
+import json
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from admission import Overloaded
+from protocol import (
+    FLAG_JSON, FLAG_RAW_RGB, FRAME_ARCHIVE, FRAME_BUSY, FRAME_CLASSIFY, FRAME_ERROR, FRAME_HEADER_SIZE, FRAME_HEALTH,
+    FRAME_RESULT, FRAME_STATUS, HEADER_SIZE,
+    PayloadTooLarge, ProtocolError, is_frame_header, pack_frame, parse_frame_header,
+)
+
+
+class AsyncServerRunner:
+    """asyncio 스트림 기반 연결 처리 (별도 스레드의 이벤트 루프에서 실행)
+
+    연결마다 OS 스레드를 만들지 않고, 디코드/전처리만 크기가 고정된
+    executor 에서 수행한 뒤 추론은 엔진의 배칭 스케줄러 Future 를 기다린다.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.config = engine.config
+
+        self.loop = None
+        self.executor = None
+        self._thread = None
+        self._server = None
+        self._stopping = None
+        self._started = threading.Event()
+        self._start_error = None
+
+        # 이벤트 루프 스레드에서만 접근하므로 잠금이 필요 없다
+        self.active_connections = 0
+        self.inflight = 0
+
+    def start(self) -> None:
+        """이벤트 루프 스레드 시작, 바인드 실패 시 예외 발생"""
+        self.executor = ThreadPoolExecutor(
+            max_workers=max(1, self.config.executor_workers),
+            thread_name_prefix="decode",
+        )
+        self._started.clear()
+        self._start_error = None
+        self._thread = threading.Thread(target=self._run, name="asyncio-server", daemon=True)
+        self._thread.start()
+        self._started.wait()
+        if self._start_error is not None:
+            self._thread.join()
+            self.executor.shutdown(wait=False)
+            raise self._start_error
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """서버 종료 및 열린 연결 정리"""
+        if self.loop is not None and self._stopping is not None:
+            self.loop.call_soon_threadsafe(self._stopping.set)
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def _run(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        try:
+            self.loop.run_until_complete(self._main())
+        except Exception as e:
+            if not self._started.is_set():
+                self._start_error = e
+                self._started.set()
+            else:
+                self.engine.log(f"asyncio 서버 오류: {str(e)}", "ERROR")
+        finally:
+            self.loop.close()
+            self.loop = None
+
+    async def _main(self) -> None:
+        self._stopping = asyncio.Event()
+        self._server = await asyncio.start_server(
+            self._handle_connection,
+            self.config.host,
+            self.config.port,
+            backlog=socket.SOMAXCONN,
+            reuse_address=True,
+        )
+        self._started.set()
+
+        await self._stopping.wait()
+
+        self._server.close()
+
+        # 처리 중인 연결 태스크 정리 (Python 3.12 부터 wait_closed 는 열린 연결이 모두 닫힐 때까지 기다린다)
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """단일 클라이언트 요청 처리 (8byte 크기 + 이미지 데이터 -> UTF-8 결과)"""
+        client_addr = writer.get_extra_info('peername')[:2]
+        client_ip, client_port = client_addr
+
+        if self.active_connections >= self.config.max_connections:
+            await self._reply(writer, self.engine.admission.overloaded("connections").reply())
+            writer.close()
+            return
+
+        self.active_connections += 1
+        metrics = self.engine.metrics
+        metrics.connections.inc()
+        metrics.active_connections.inc()
+        now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.engine.emit("client_connected", ip=client_ip, port=client_port, time=now)
+        self.engine.log(f"클라이언트 연결: {client_addr}")
+
+        waiting = "idle"
+        try:
+            # 8byte로 데이터 크기 수신
+            header = await self._read(reader, HEADER_SIZE, self.config.idle_timeout)
+
+            # 프레임 프로토콜이면 연결을 유지하며 여러 요청 처리
+            if is_frame_header(header):
+                await self._serve_frames(reader, writer, header, client_addr)
+                return
+
+            expected_size = int.from_bytes(header, 'big')
+            self.engine.log(f"{client_addr} - 예상 데이터 크기: {expected_size} bytes")
+
+            # 한도를 넘는 요청은 본문을 읽기 전에 거절
+            self.engine.check_payload_size(expected_size)
+            waiting = "read"
+            started = time.perf_counter()
+            received_data = await self._read(reader, expected_size, self.config.read_timeout)
+            metrics.observe_stage("receive", started)
+            metrics.bytes_received.inc(HEADER_SIZE + expected_size)
+            received_at = time.perf_counter()
+
+            try:
+                self._admit(client_ip)
+            except Overloaded as e:
+                self.engine.log(f"{client_addr} - {str(e)}", "WARNING")
+                result = e.reply()
+            else:
+                try:
+                    result = await self._classify(received_data, client_addr,
+                                                 self.config.response_format == 'json')
+                except Exception as e:
+                    metrics.errors.inc()
+                    result = f"이미지 분류에 실패했습니다: {str(e)}"
+                finally:
+                    self._release()
+
+            await self._reply(writer, result, received_at)
+
+        except PayloadTooLarge as e:
+            self.engine.log(f"{client_addr} - {str(e)}", "ERROR")
+            metrics.errors.inc()
+            await self._reply(writer, f"이미지가 너무 큽니다: {str(e)}")
+        except asyncio.IncompleteReadError as e:
+            self.engine.log(f"{client_addr} - 수신 데이터 크기가 예상과 다릅니다. ({len(e.partial)} bytes)", "ERROR")
+            metrics.errors.inc()
+            await self._reply(writer, "데이터 수신 중 오류가 발생했습니다.")
+        except asyncio.TimeoutError:
+            self.engine.admission.timeouts[waiting].inc()
+            self.engine.log(f"{client_addr} - {'수신' if waiting == 'read' else '유휴'} 시간 초과로 연결을 닫습니다.",
+                            "WARNING")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.engine.log(f"{client_addr} - 처리 중 오류 발생: {str(e)}", "ERROR")
+        finally:
+            self.active_connections -= 1
+            metrics.active_connections.dec()
+            writer.close()
+            self.engine.emit("client_disconnected", ip=client_ip, port=client_port)
+            self.engine.log(f"클라이언트 연결 종료됨: {client_addr}")
+
+    async def _serve_frames(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                            prefix: bytes, client_addr: tuple) -> None:
+        """프레임 프로토콜 연결 처리, 요청마다 태스크를 만들어 끝나는 순서대로 응답"""
+        self.engine.log(f"{client_addr} - 프레임 프로토콜 연결")
+        metrics = self.engine.metrics
+        write_lock = asyncio.Lock()
+        tasks = set()
+
+        async def send(frame_type, request_id, message, received_at=None):
+            if frame_type == FRAME_ERROR:
+                metrics.errors.inc()
+            frame = pack_frame(frame_type, request_id, message.encode('utf-8'))
+            async with write_lock:
+                started = time.perf_counter()
+                writer.write(frame)
+                await writer.drain()
+            metrics.observe_stage("send", started)
+            metrics.bytes_sent.inc(len(frame))
+            if received_at is not None:
+                metrics.request_latency.observe((time.perf_counter() - received_at) * 1000.0)
+
+        async def serve_one(request_id, payload, as_json, raw, received_at):
+            try:
+                result = await self._classify(payload, client_addr, as_json, raw)
+            except Exception as e:
+                await send(FRAME_ERROR, request_id, f"이미지 분류에 실패했습니다: {str(e)}", received_at)
+            else:
+                await send(FRAME_RESULT, request_id, result, received_at)
+
+        waiting = "read"
+        try:
+            header = prefix + await self._read(reader, FRAME_HEADER_SIZE - len(prefix), self.config.read_timeout)
+            while True:
+                frame_type, flags, request_id, length = parse_frame_header(header)
+                if frame_type == FRAME_ARCHIVE:
+                    raise ProtocolError("아카이브 요청은 thread 모드에서만 지원합니다.")
+                self.engine.check_payload_size(length)
+                waiting = "read"
+                started = time.perf_counter()
+                payload = await self._read(reader, length, self.config.read_timeout)
+                metrics.observe_stage("receive", started)
+                metrics.bytes_received.inc(FRAME_HEADER_SIZE + length)
+                received_at = time.perf_counter()
+
+                if frame_type == FRAME_HEALTH:
+                    await send(FRAME_STATUS, request_id, json.dumps(self.engine.health_status()))
+                elif frame_type != FRAME_CLASSIFY:
+                    await send(FRAME_ERROR, request_id, f"알 수 없는 프레임 종류: {frame_type}")
+                else:
+                    as_json = bool(flags & FLAG_JSON) or self.config.response_format == 'json'
+                    try:
+                        self._admit(client_addr[0])
+                    except Overloaded as e:
+                        self.engine.log(f"{client_addr} - {str(e)}", "WARNING")
+                        await send(FRAME_BUSY, request_id, e.reply(as_json))
+                    else:
+                        raw = bool(flags & FLAG_RAW_RGB)
+                        task = asyncio.create_task(serve_one(request_id, payload, as_json, raw, received_at))
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+                        # 첫 실행 전에 취소된 태스크는 코루틴 본문에 들어가지 않으므로 해제는 태스크 완료에 묶는다
+                        task.add_done_callback(lambda _: self._release())
+
+                try:
+                    waiting = "idle"
+                    header = await self._read(reader, FRAME_HEADER_SIZE, self.config.idle_timeout)
+                except asyncio.IncompleteReadError as e:
+                    # 프레임 경계에서 끊긴 경우는 정상 종료
+                    if e.partial:
+                        raise
+                    break
+        except (PayloadTooLarge, ProtocolError) as e:
+            self.engine.log(f"{client_addr} - {str(e)}", "ERROR")
+            await send(FRAME_ERROR, 0, str(e))
+        except asyncio.IncompleteReadError as e:
+            # 프레임 중간에 끊긴 경우 thread 모드처럼 응답 없이 닫는다 (legacy 텍스트 응답은 프레임 연결에서 해석할 수 없다)
+            self.engine.log(f"{client_addr} - 프레임 수신 중 연결이 끊겼습니다. ({len(e.partial)} bytes)", "ERROR")
+            metrics.errors.inc()
+        except asyncio.TimeoutError:
+            self.engine.admission.timeouts[waiting].inc()
+            self.engine.log(f"{client_addr} - {'수신' if waiting == 'read' else '유휴'} 시간 초과로 연결을 닫습니다.",
+                            "WARNING")
+        finally:
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _admit(self, client_ip) -> None:
+        """동시 처리 요청 수와 엔진 수락 제어 확인, 거절이면 Overloaded 발생"""
+        if self.inflight >= self.config.max_inflight:
+            raise self.engine.admission.overloaded("inflight", self.engine.admission.estimated_wait() or 1.0)
+        self.engine.admission.admit(client_ip)
+        self.engine.metrics.requests.inc()
+        self.inflight += 1
+
+    def _release(self) -> None:
+        self.inflight -= 1
+        self.engine.admission.release()
+
+    @staticmethod
+    async def _read(reader: asyncio.StreamReader, size: int, timeout: float) -> bytes:
+        """size 바이트 수신, timeout 초(0 이하면 무제한) 안에 다 받지 못하면 asyncio.TimeoutError"""
+        if timeout <= 0:
+            return await reader.readexactly(size)
+        return await asyncio.wait_for(reader.readexactly(size), timeout)
+
+    async def _classify(self, data: bytes, client_addr: tuple, as_json: bool = False, raw: bool = False) -> str:
+        """디코드/전처리는 executor 에서, 추론은 배칭 스케줄러에서 수행"""
+        try:
+            future = await self.loop.run_in_executor(self.executor, self.engine.submit_payload, data, raw)
+            prediction = await asyncio.wrap_future(future)
+        except Exception as e:
+            self.engine.log(f"{client_addr}- 이미지 처리/분류 실패: {str(e)}", "ERROR")
+            raise
+        result = self.engine.format_result(prediction, as_json)
+        self.engine.log(f"{client_addr} - 분류 결과: {result}", "SUCCESS")
+        return result
+
+    async def _reply(self, writer: asyncio.StreamWriter, message: str, received_at: float = None) -> None:
+        metrics = self.engine.metrics
+        payload = message.encode('utf-8')
+        try:
+            started = time.perf_counter()
+            writer.write(payload)
+            await writer.drain()
+        except (ConnectionError, OSError):
+            return
+        metrics.observe_stage("send", started)
+        metrics.bytes_sent.inc(len(payload))
+        if received_at is not None:
+            metrics.request_latency.observe((time.perf_counter() - received_at) * 1000.0)
@@ -0,0 +1,301 @@
+import collections
+import json
+import select
+import threading
+import time
+from concurrent.futures import Future
+
+from admission import Overloaded
+from protocol import (
+    ARCHIVE_ENTRY_HEADER, FRAME_ARCHIVE_END, FRAME_BUSY, FRAME_ERROR, FRAME_HEADER_SIZE, FRAME_RESULT,
+    PayloadTooLarge, ProtocolError, discard_exact, pack_frame, recv_exact, recv_into_exact,
+)
+
+
+def _chain(target: Future, source: Future) -> None:
+    error = source.exception()
+    if error is not None:
+        target.set_exception(error)
+    else:
+        target.set_result(source.result())
+
+
+class _DecodedGroup:
+    """디코드가 모두 끝나면 한 묶음으로 배칭 스케줄러에 넘기는 항목 묶음"""
+
+    def __init__(self, batcher):
+        self.batcher = batcher
+        self._slots = []        # [Future, 배열, timings]
+        self._pending = 0       # 디코드가 끝나지 않은 항목 수
+        self._closed = False
+        self._dispatched = False
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def add(self, future: Future) -> int:
+        with self._lock:
+            self._slots.append([future, None, None])
+            self._pending += 1
+            return len(self._slots) - 1
+
+    def decoded(self, index: int, array, timings: dict) -> None:
+        with self._lock:
+            self._slots[index][1:] = [array, timings]
+            self._pending -= 1
+            ready = self._ready()
+        if ready:
+            self._dispatch()
+
+    def failed(self, index: int, error: BaseException) -> None:
+        self._slots[index][0].set_exception(error)
+        with self._lock:
+            self._pending -= 1
+            ready = self._ready()
+        if ready:
+            self._dispatch()
+
+    def close(self) -> None:
+        """더 이상 항목을 추가하지 않음, 디코드가 끝나 있으면 바로 넘긴다"""
+        with self._lock:
+            self._closed = True
+            ready = self._ready()
+        if ready:
+            self._dispatch()
+
+    def _ready(self) -> bool:
+        if self._closed and self._pending == 0 and not self._dispatched:
+            self._dispatched = True
+            return True
+        return False
+
+    def _dispatch(self) -> None:
+        slots = [slot for slot in self._slots if slot[1] is not None]
+        if not slots:
+            return
+        try:
+            futures = self.batcher.submit_many([slot[1] for slot in slots], [slot[2] for slot in slots])
+        except Exception as e:
+            for slot in slots:
+                slot[0].set_exception(e)
+            return
+        for slot, future in zip(slots, futures):
+            future.add_done_callback(lambda f, target=slot[0]: _chain(target, f))
+
+
+class ArchiveRequest:
+    """FRAME_ARCHIVE 한 건 처리
+
+    본문을 소켓에서 항목 단위로 읽으면서 바로 디코드를 맡기고, 디코드가 끝난 이미지를
+    max_batch_size 장씩 묶어 배칭 스케줄러에 한 번에 넘긴다 (워커 프로세스 모드에서는
+    항목을 연달아 워커에 넘긴다). 결과는 항목 순서대로 send 로 내보내고 마지막에
+    FRAME_ARCHIVE_END 를 보낸 뒤 on_end 를 호출한다. 응답을 기다리는 항목 수는
+    archive_window 개로 제한하므로 묶음 전체를 메모리에 올리지 않는다.
+
+    수락 제어(대기열, 예상 대기 시간, IP 별 요청률)는 항목마다 거치며, 한 항목이 거절되면
+    그 항목부터는 본문을 받아서 버리고 FRAME_BUSY 로 응답한다. 항목은 수신 버퍼 풀의
+    버퍼로 받고, 디코드가 끝나면 반납한다.
+    """
+
+    def __init__(self, engine, request_id: int, client_ip, raw: bool, as_json: bool, send, on_end):
+        self.engine = engine
+        self.request_id = request_id
+        self.client_ip = client_ip
+        self.raw = raw
+        self.as_json = as_json
+        self.send = send            # send(프레임, 항목 수신 완료 시각)
+        self.on_end = on_end
+
+        self.group_size = max(1, engine.config.max_batch_size)
+        self._window = threading.Semaphore(max(self.group_size, engine.config.archive_window))
+        self._order = collections.deque()   # (Future, 수신 완료 시각), 항목 순서
+        self._lock = threading.RLock()
+        self._group = None
+        self._closed = False
+        self._ended = False
+        self._deferred = False  # 마지막 _add 의 버퍼를 디코드 스레드가 이어서 쓰는지
+
+        self.ended = threading.Event()     # FRAME_ARCHIVE_END 를 보낸 뒤 설정
+        self.received = 0
+        self.count = 0
+        self.errors = 0
+        self.busy = 0
+        self.rejected = None    # 수락 제어가 거절한 경우 그 Overloaded (이후 항목도 거절)
+        self.error = None   # 중간에 중단된 경우 사유
+
+    def read(self, sock, length: int) -> bool:
+        """소켓에서 본문 length 바이트를 항목 단위로 읽어 처리, 끝까지 받았으면 True"""
+        metrics = self.engine.metrics
+        buffer_pool = self.engine.buffer_pool
+        remaining = length
+        while remaining > 0:
+            if remaining < ARCHIVE_ENTRY_HEADER.size:
+                raise ProtocolError("아카이브 항목 헤더가 잘렸습니다.")
+            if not self._readable(sock):
+                # 다음 항목이 아직 도착하지 않았으면 모인 만큼 먼저 추론한다
+                self._flush()
+
+            header = recv_exact(sock, ARCHIVE_ENTRY_HEADER.size)
+            if len(header) != ARCHIVE_ENTRY_HEADER.size:
+                return False
+            (size,) = ARCHIVE_ENTRY_HEADER.unpack(header)
+            remaining -= ARCHIVE_ENTRY_HEADER.size
+            if size > remaining:
+                raise ProtocolError("아카이브 항목 크기가 본문 크기를 넘습니다.")
+
+            if not self._window.acquire(blocking=False):
+                # 앞 항목이 덜 모인 묶음에 있으면 응답이 나가지 않으므로 먼저 넘기고 기다린다
+                self._flush()
+                self._window.acquire()
+            started = time.perf_counter()
+            buffer = None
+            try:
+                self.engine.check_payload_size(size)
+            except PayloadTooLarge as e:
+                # 큰 항목 하나만 오류로 응답하고 나머지는 계속 처리한다
+                error = e
+            else:
+                error = self.rejected
+            if error is not None:
+                complete = discard_exact(sock, size)
+            else:
+                buffer = buffer_pool.acquire(size)
+                complete = recv_into_exact(sock, buffer) == size
+            if not complete:
+                if buffer is not None:
+                    buffer_pool.release(buffer)
+                self._window.release()
+                return False
+            remaining -= size
+            metrics.observe_stage("receive", started)
+            metrics.bytes_received.inc(ARCHIVE_ENTRY_HEADER.size + size)
+            if buffer is None:
+                self._add_failed(error)
+            elif not self._add(buffer):
+                buffer_pool.release(buffer)
+
+        metrics.bytes_received.inc(FRAME_HEADER_SIZE)
+        return True
+
+    @staticmethod
+    def _readable(sock) -> bool:
+        try:
+            readable, _, _ = select.select([sock], [], [], 0)
+        except (OSError, ValueError):
+            return True
+        return bool(readable)
+
+    def _add(self, data) -> bool:
+        """항목 하나를 수락 제어를 거쳐 넘김, 디코드 스레드가 data 를 이어서 쓰면 True"""
+        engine = self.engine
+        self._deferred = False
+        try:
+            engine.admission.admit(self.client_ip)
+        except Overloaded as e:
+            self.rejected = e
+            self._add_failed(e)
+            return False
+        engine.metrics.requests.inc()
+        try:
+            if engine.worker_pool is not None:
+                future = engine.submit_payload(data, self.raw)
+            else:
+                future = engine.submit_payload(data, self.raw, submit=self._submit_grouped)
+        except Exception as e:
+            engine.admission.release()
+            if isinstance(e, Overloaded):
+                self.rejected = e
+            self._add_failed(e)
+        else:
+            future.add_done_callback(engine.admission.release)
+            self._append(future)
+        return self._deferred
+
+    def _add_failed(self, error: BaseException) -> None:
+        future = Future()
+        future.set_exception(error)
+        self._append(future)
+
+    def _append(self, future: Future) -> None:
+        self.received += 1
+        with self._lock:
+            self._order.append((future, time.perf_counter()))
+        future.add_done_callback(self._drain)
+
+    def _submit_grouped(self, data, raw: bool) -> Future:
+        engine = self.engine
+        future = Future()
+        with self._lock:
+            if self._group is None:
+                self._group = _DecodedGroup(engine.batcher)
+            group = self._group
+            index = group.add(future)
+            full = len(group) >= self.group_size
+            if full:
+                self._group = None
+
+        try:
+            engine.decode_pool.submit(self._decode, group, index, data, raw)
+        except Exception as e:
+            group.failed(index, e)
+        else:
+            self._deferred = True
+        if full:
+            group.close()
+        future.add_done_callback(engine._observe_prediction)
+        return future
+
+    def _decode(self, group: _DecodedGroup, index: int, data, raw: bool) -> None:
+        timings = {}
+        try:
+            array = self.engine.decode_payload(data, timings, raw)
+        except Exception as e:
+            group.failed(index, e)
+        else:
+            group.decoded(index, array, timings)
+        finally:
+            self.engine.buffer_pool.release(data)
+
+    def _flush(self) -> None:
+        with self._lock:
+            group, self._group = self._group, None
+        if group is not None:
+            group.close()
+
+    def close(self, error: str = None) -> None:
+        """항목 추가 종료, 남은 항목의 응답이 모두 나가면 FRAME_ARCHIVE_END 를 보낸다"""
+        self._flush()
+        with self._lock:
+            self._closed = True
+            self.error = error
+        self._drain()
+
+    def _drain(self, _future: Future = None) -> None:
+        with self._lock:
+            while self._order and self._order[0][0].done():
+                future, received_at = self._order.popleft()
+                self._reply(future, received_at)
+                self._window.release()
+            if not self._closed or self._order or self._ended:
+                return
+            self._ended = True
+            summary = {"count": self.count, "errors": self.errors, "busy": self.busy}
+            if self.error is not None:
+                summary["error"] = self.error
+            self.send(pack_frame(FRAME_ARCHIVE_END, self.request_id, json.dumps(summary).encode('utf-8')), None)
+        self.ended.set()
+        self.on_end()
+
+    def _reply(self, future: Future, received_at: float) -> None:
+        self.count += 1
+        try:
+            frame = pack_frame(FRAME_RESULT, self.request_id, self.engine.encode_result(future.result(), self.as_json))
+        except Overloaded as e:
+            self.busy += 1
+            frame = pack_frame(FRAME_BUSY, self.request_id, e.reply(self.as_json).encode('utf-8'))
+        except Exception as e:
+            self.errors += 1
+            self.engine.metrics.errors.inc()
+            frame = pack_frame(FRAME_ERROR, self.request_id, f"이미지 분류에 실패했습니다: {str(e)}".encode('utf-8'))
+        self.send(frame, received_at)
@@ -0,0 +1,322 @@
+import abc
+import os
+import time
+
+import numpy as np
+
+from preprocess import MODEL_INPUT_SHAPE
+
+# 추론 백엔드
+#   savedmodel: SavedModel 의 serving_default 를 그대로 실행 (기본값)
+#   tflite: export_model.py 로 변환한 TFLite 모델 (dynamic-range / int8 양자화)
+#   xla: serving_default 를 고정 배치 크기별로 jit_compile 한 함수
+#   onnx: ONNX Runtime 으로 .onnx 모델 실행
+#   stub: 모델 없이 입력으로부터 결정적인 확률을 만드는 NumPy 백엔드 (네트워크/배칭 부하 테스트용)
+BACKENDS = ('savedmodel', 'tflite', 'xla', 'onnx', 'stub')
+
+# 모델 파일이 없는 stub 백엔드의 기본 클래스 수
+STUB_DEFAULT_CLASSES = 104
+
+
+def bucket_sizes(sizes, max_batch_size: int) -> list:
+    """고정 배치 크기 목록 (오름차순, 최대 배치 크기는 항상 포함)"""
+    return sorted({max(1, min(int(s), max_batch_size)) for s in sizes} | {max(1, max_batch_size)})
+
+
+class InferenceBackend(abc.ABC):
+    """추론 백엔드 인터페이스
+
+    infer_batch 는 [0, 1] 로 정규화된 (N, 299, 299, 3) float32 배치를 받아 (N, C) 확률 배열을
+    반환한다. 입력 배열은 호출 후 재사용되므로 참조를 유지하면 안 되며, 한 스레드에서만 호출된다.
+    load() 는 무거운 런타임 import 와 모델 로드를 수행하고, 단계별 소요 시간(초)을
+    load_timings 에 남긴다.
+    """
+
+    name = ''
+
+    def __init__(self):
+        self.load_timings = {}
+
+    @abc.abstractmethod
+    def load(self) -> None:
+        """런타임 import 및 모델 로드"""
+
+    @abc.abstractmethod
+    def output_dim(self):
+        """출력 벡터 길이 (클래스 수), 알 수 없으면 None"""
+
+    @abc.abstractmethod
+    def infer_batch(self, batch: np.ndarray) -> np.ndarray:
+        """(N, 299, 299, 3) 배치 추론, (N, C) 확률 배열 반환"""
+
+    def _timed(self, name: str, started: float) -> float:
+        now = time.perf_counter()
+        self.load_timings[name] = now - started
+        return now
+
+
+class _PaddedBatches:
+    """가변 크기 배치를 미리 정한 고정 크기로 0 패딩 (고정 shape 로만 실행하는 백엔드용)"""
+
+    def __init__(self, sizes, input_shape: tuple = MODEL_INPUT_SHAPE):
+        self.sizes = sorted(sizes)
+        self._buffers = {size: np.zeros((size,) + tuple(input_shape), dtype=np.float32) for size in self.sizes}
+
+    def split(self, batch: np.ndarray):
+        """(고정 크기 입력, 실제 개수) 를 차례로 생성, 최대 크기보다 큰 배치는 나눈다"""
+        largest = self.sizes[-1]
+        for start in range(0, len(batch), largest):
+            chunk = batch[start:start + largest]
+            n = len(chunk)
+            size = next(s for s in self.sizes if s >= n)
+            if size == n:
+                yield chunk, n
+                continue
+            buffer = self._buffers[size]
+            buffer[:n] = chunk
+            buffer[n:] = 0.0
+            yield buffer, n
+
+
+class SavedModelBackend(InferenceBackend):
+    """tf.saved_model.load 한 serving_default 실행 (출력 키는 로드 시 한 번만 확인)"""
+
+    name = 'savedmodel'
+
+    def __init__(self, model_dir: str):
+        super().__init__()
+        self.model_dir = model_dir
+        self.model = None
+        self.infer = None
+        self.output_key = None
+        self._to_tensor = None
+
+    def load(self) -> None:
+        started = time.perf_counter()
+        import tensorflow as tf
+        self._tf = tf
+        self._to_tensor = tf.convert_to_tensor
+        started = self._timed("import_tensorflow", started)
+
+        self.model = tf.saved_model.load(self.model_dir)
+        self.infer = self.model.signatures['serving_default']
+        self.output_key = list(self.infer.structured_outputs.keys())[0]
+        self._timed("load_model", started)
+
+    def output_dim(self):
+        shape = getattr(self.infer.structured_outputs[self.output_key], 'shape', None)
+        if shape is None or len(shape) == 0:
+            return None
+        return shape[-1]
+
+    def infer_batch(self, batch: np.ndarray) -> np.ndarray:
+        return self.infer(self._to_tensor(batch))[self.output_key].numpy()
+
+
+class XLABackend(SavedModelBackend):
+    """serving_default 를 XLA 로 컴파일해 실행
+
+    XLA 는 입력 shape 마다 따로 컴파일하므로 배치를 고정 크기(sizes)로 0 패딩해
+    컴파일 횟수를 제한한다. 크기별 컴파일은 워밍업에서 끝내 둔다.
+    """
+
+    name = 'xla'
+
+    def __init__(self, model_dir: str, sizes):
+        super().__init__(model_dir)
+        self.padded = _PaddedBatches(sizes)
+        self._compiled = None
+
+    def load(self) -> None:
+        super().load()
+        infer, output_key = self.infer, self.output_key
+        _, input_specs = infer.structured_input_signature
+        input_name = next(iter(input_specs))
+        self._compiled = self._tf.function(lambda x: infer(**{input_name: x})[output_key], jit_compile=True)
+
+    def infer_batch(self, batch: np.ndarray) -> np.ndarray:
+        outputs = [self._compiled(self._to_tensor(chunk)).numpy()[:n] for chunk, n in self.padded.split(batch)]
+        return outputs[0] if len(outputs) == 1 else np.concatenate(outputs)
+
+
+class TFLiteBackend(InferenceBackend):
+    """TFLite 모델 실행
+
+    입력 텐서 크기를 바꾸면 allocate_tensors 를 다시 해야 하므로, 고정 배치 크기마다
+    인터프리터를 하나씩 만들어 두고 배치를 가장 가까운 크기로 0 패딩해 실행한다.
+    int8 입출력 모델은 양자화 파라미터로 변환한다.
+    """
+
+    name = 'tflite'
+
+    def __init__(self, path: str, sizes, num_threads: int = 0):
+        super().__init__()
+        self.path = path
+        self.padded = _PaddedBatches(sizes)
+        self.num_threads = num_threads if num_threads > 0 else None
+        self._interpreters = {}
+
+    @staticmethod
+    def _interpreter_class():
+        # 가벼운 tflite_runtime 이 있으면 TensorFlow 없이 실행
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+        return Interpreter
+
+    def load(self) -> None:
+        started = time.perf_counter()
+        Interpreter = self._interpreter_class()
+        started = self._timed("import_tflite", started)
+        for size in self.padded.sizes:
+            interpreter = Interpreter(model_path=self.path, num_threads=self.num_threads)
+            input_detail = interpreter.get_input_details()[0]
+            interpreter.resize_tensor_input(input_detail['index'], [size] + list(MODEL_INPUT_SHAPE))
+            interpreter.allocate_tensors()
+            self._interpreters[size] = (interpreter, interpreter.get_input_details()[0],
+                                        interpreter.get_output_details()[0])
+        self._timed("load_model", started)
+
+    def output_dim(self):
+        _, _, output_detail = self._interpreters[self.padded.sizes[0]]
+        return int(output_detail['shape'][-1])
+
+    def _run(self, chunk: np.ndarray) -> np.ndarray:
+        interpreter, input_detail, output_detail = self._interpreters[len(chunk)]
+        dtype = input_detail['dtype']
+        if dtype != np.float32:
+            scale, zero_point = input_detail['quantization']
+            info = np.iinfo(dtype)
+            chunk = np.clip(np.round(chunk / scale + zero_point), info.min, info.max).astype(dtype)
+        interpreter.set_tensor(input_detail['index'], chunk)
+        interpreter.invoke()
+        output = interpreter.get_tensor(output_detail['index'])
+        if output.dtype != np.float32:
+            scale, zero_point = output_detail['quantization']
+            output = (output.astype(np.float32) - zero_point) * scale
+        return output
+
+    def infer_batch(self, batch: np.ndarray) -> np.ndarray:
+        outputs = [self._run(chunk)[:n] for chunk, n in self.padded.split(batch)]
+        return outputs[0] if len(outputs) == 1 else np.concatenate(outputs)
+
+
+class ONNXBackend(InferenceBackend):
+    """ONNX Runtime (CPU) 으로 .onnx 모델 실행, 입력/출력 이름은 로드 시 한 번만 확인"""
+
+    name = 'onnx'
+
+    def __init__(self, path: str, num_threads: int = 0):
+        super().__init__()
+        self.path = path
+        self.num_threads = num_threads
+        self.session = None
+        self.input_name = None
+        self.output_name = None
+
+    def load(self) -> None:
+        started = time.perf_counter()
+        import onnxruntime as ort
+        started = self._timed("import_onnxruntime", started)
+
+        options = ort.SessionOptions()
+        if self.num_threads > 0:
+            options.intra_op_num_threads = self.num_threads
+        self.session = ort.InferenceSession(self.path, sess_options=options, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+        self.output_name = self.session.get_outputs()[0].name
+        self._timed("load_model", started)
+
+    def output_dim(self):
+        dim = self.session.get_outputs()[0].shape[-1]
+        return dim if isinstance(dim, int) else None
+
+    def infer_batch(self, batch: np.ndarray) -> np.ndarray:
+        return self.session.run([self.output_name], {self.input_name: batch})[0]
+
+
+class StubBackend(InferenceBackend):
+    """모델 파일과 TensorFlow 없이 동작하는 결정적 NumPy 백엔드
+
+    입력을 성기게 샘플링한 값에 고정 시드의 무작위 투영을 곱해 softmax 한 값을 돌려주므로
+    같은 이미지는 항상 같은 결과가 나온다. 배치마다 latency_ms + 이미지당 per_image_ms 만큼
+    sleep 하여 실제 모델의 추론 시간을 흉내 낸다 (sleep 중에는 GIL 을 놓는다).
+    """
+
+    name = 'stub'
+
+    # 투영에 사용할 입력 샘플 간격 (299 / 23 = 13 -> 13x13x3 특징)
+    STRIDE = 23
+
+    def __init__(self, num_classes: int = STUB_DEFAULT_CLASSES, latency_ms: float = 0.0,
+                 per_image_ms: float = 0.0, seed: int = 0):
+        super().__init__()
+        self.num_classes = num_classes
+        self.latency = max(0.0, latency_ms) / 1000.0
+        self.per_image = max(0.0, per_image_ms) / 1000.0
+        self.seed = seed
+        self._projection = None
+
+    def load(self) -> None:
+        started = time.perf_counter()
+        features = len(range(0, MODEL_INPUT_SHAPE[0], self.STRIDE)) * len(range(0, MODEL_INPUT_SHAPE[1], self.STRIDE)) * 3
+        rng = np.random.default_rng(self.seed)
+        self._projection = rng.standard_normal((features, self.num_classes)).astype(np.float32)
+        self._timed("load_model", started)
+
+    def output_dim(self):
+        return self.num_classes
+
+    def infer_batch(self, batch: np.ndarray) -> np.ndarray:
+        started = time.perf_counter()
+        features = batch[:, ::self.STRIDE, ::self.STRIDE, :].reshape(len(batch), -1)
+        logits = (features - 0.5) @ self._projection
+        logits -= logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=1, keepdims=True)
+
+        remaining = self.latency + self.per_image * len(batch) - (time.perf_counter() - started)
+        if remaining > 0:
+            time.sleep(remaining)
+        return probs
+
+
+def backend_options(config, num_classes: int = None) -> dict:
+    """설정에서 백엔드 생성에 필요한 값만 뽑은 dict (워커 프로세스에 그대로 넘길 수 있다)
+
+    num_classes 는 stub 백엔드의 클래스 수로, stub_classes 가 0이면 라벨 개수를 넘겨 맞춘다.
+    """
+    return {
+        "name": config.backend,
+        "model_dir": os.path.abspath(config.model_dir),
+        "tflite_path": os.path.abspath(config.tflite_path) if config.tflite_path else '',
+        "onnx_path": os.path.abspath(config.onnx_path) if config.onnx_path else '',
+        "sizes": config.backend_batch_sizes(),
+        "threads": config.backend_threads,
+        "num_classes": config.stub_classes or num_classes or STUB_DEFAULT_CLASSES,
+        "latency_ms": config.stub_latency_ms,
+        "per_image_ms": config.stub_latency_per_image_ms,
+    }
+
+
+def create_backend(options: dict) -> InferenceBackend:
+    """backend_options 형식의 dict 로 백엔드 생성 (load() 는 호출하는 쪽에서)"""
+    name = options["name"]
+    if name == 'savedmodel':
+        return SavedModelBackend(options["model_dir"])
+    if name == 'xla':
+        return XLABackend(options["model_dir"], options.get("sizes", (1,)))
+    if name == 'tflite':
+        if not options.get("tflite_path"):
+            raise ValueError("tflite 백엔드는 --tflite-path 를 지정해야 합니다.")
+        return TFLiteBackend(options["tflite_path"], options.get("sizes", (1,)), options.get("threads", 0))
+    if name == 'onnx':
+        if not options.get("onnx_path"):
+            raise ValueError("onnx 백엔드는 --onnx-path 를 지정해야 합니다.")
+        return ONNXBackend(options["onnx_path"], options.get("threads", 0))
+    if name == 'stub':
+        return StubBackend(options.get("num_classes") or STUB_DEFAULT_CLASSES, options.get("latency_ms", 0.0),
+                           options.get("per_image_ms", 0.0))
+    raise ValueError(f"알 수 없는 추론 백엔드: {name}")
@@ -0,0 +1,206 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from metrics import Histogram
+from preprocess import MODEL_INPUT_SHAPE, normalize_into
+from results import predictions_from_batch
+
+# 배치 크기 / 대기 시간 히스토그램 버킷
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64]
+QUEUE_WAIT_BUCKETS_MS = [0.5, 1, 2, 5, 10, 20, 50, 100, 250, 500, 1000]
+
+_STOP = object()
+
+
+class _Pending:
+    """큐에 쌓인 단일 추론 요청"""
+    __slots__ = ("array", "future", "enqueued_at", "timings")
+
+    def __init__(self, array: np.ndarray, timings: dict):
+        self.array = array
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+        self.timings = timings
+
+
+class InferenceBatcher:
+    """여러 연결의 요청을 모아 한 번에 추론하는 마이크로 배칭 스케줄러
+
+    submit 에는 (299, 299, 3) uint8 배열을 넣고, 워커가 미리 할당해 둔 float32 배치
+    버퍼에 정규화하여 채운다. infer_fn 은 그 버퍼의 (N, 299, 299, 3) 구간을 받아
+    (N, C) 배열을 반환해야 하며, 버퍼는 다음 배치에서 재사용되므로 반환 후에는
+    참조를 유지하면 안 된다. 각 Future 는 배치 전체에서 한 번에 계산한 상위 top_k 와
+    큐 대기/추론 시간을 담은 results.Prediction 으로 완료된다.
+    다음 요청을 max_wait_ms 까지 기다리는 것은 직전 배치가 2장 이상이었을 때(부하가 있을 때)뿐이며,
+    한가할 때 혼자 들어온 요청은 바로 추론한다.
+    """
+
+    def __init__(self, infer_fn, max_batch_size: int = 16, max_wait_ms: float = 5.0,
+                 input_shape: tuple = MODEL_INPUT_SHAPE, top_k: int = 5):
+        self.infer_fn = infer_fn
+        self.top_k = top_k
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+
+        # 워커 스레드 하나만 사용하는 배치 입력 버퍼
+        self._batch_buffer = np.empty((self.max_batch_size,) + tuple(input_shape), dtype=np.float32)
+
+        self.batch_size_hist = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_wait_hist = Histogram(QUEUE_WAIT_BUCKETS_MS)
+
+        self._queue = queue.Queue()
+        self._worker = None
+        self._stopped = False
+        self._submit_lock = threading.Lock()    # 종료 후 큐에 넣는 요청이 남지 않도록 보호
+        # 직전 배치가 2장 이상이었는지 (부하가 있을 때만 max_wait 동안 다음 요청을 기다린다)
+        self._busy = False
+
+    def start(self) -> None:
+        """추론 워커 스레드 시작"""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        self._stopped = False
+        self._worker = threading.Thread(target=self._run, name="inference-batcher", daemon=True)
+        self._worker.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """워커 종료 (이미 큐에 들어온 요청은 처리 후 종료)
+
+        timeout 안에 끝나지 않으면 아직 큐에 남은 요청을 실패 처리해 기다리는 쪽이 멈추지 않게 한다.
+        """
+        with self._submit_lock:
+            self._stopped = True
+        if self._worker is None:
+            return
+        self._queue.put(_STOP)
+        self._worker.join(timeout=timeout)
+        if self._worker.is_alive():
+            self._fail(self._drain_queue())
+            # 처리 중인 배치를 마친 워커가 종료되도록 다시 넣어 둔다
+            self._queue.put(_STOP)
+        self._worker = None
+
+    def submit(self, array: np.ndarray, timings: dict = None) -> Future:
+        """(299, 299, 3) uint8 이미지 한 장을 큐에 넣고 Prediction Future 반환
+
+        timings 에 이미 기록된 단계별 시간(디코드 등)은 결과에 그대로 이어진다.
+        """
+        pending = _Pending(array, timings if timings is not None else {})
+        with self._submit_lock:
+            if not self._stopped:
+                self._queue.put(pending)
+                return pending.future
+        pending.future.set_exception(RuntimeError("추론 스케줄러가 종료되었습니다."))
+        return pending.future
+
+    def submit_many(self, arrays: list, timings_list: list = None) -> list:
+        """여러 장을 한 묶음으로 큐에 넣고 Future 목록 반환
+
+        묶음은 max_batch_size 단위로 나뉘며, 각 묶음은 대기 시간과 관계없이 같은 배치에 들어간다.
+        """
+        if timings_list is None:
+            timings_list = [{} for _ in arrays]
+        items = [_Pending(array, timings) for array, timings in zip(arrays, timings_list)]
+        with self._submit_lock:
+            if not self._stopped:
+                for start in range(0, len(items), self.max_batch_size):
+                    self._queue.put(items[start:start + self.max_batch_size])
+                return [item.future for item in items]
+        self._fail(items)
+        return [item.future for item in items]
+
+    def summary(self) -> str:
+        """배치 크기 / 큐 대기 시간 히스토그램 요약"""
+        return (f"batch_size[{self.batch_size_hist.format()}] "
+                f"queue_wait[{self.queue_wait_hist.format('ms')}]")
+
+    def _run(self) -> None:
+        stopping = False
+        carry = None    # 현재 배치에 다 들어가지 않아 다음 배치로 넘긴 묶음
+        while not stopping:
+            if carry is not None:
+                item, carry = carry, None
+            else:
+                item = self._queue.get()
+            if item is _STOP:
+                break
+
+            batch = list(item) if isinstance(item, list) else [item]
+            deadline = batch[0].enqueued_at + self.max_wait
+            while len(batch) < self.max_batch_size:
+                # 이미 쌓여 있는 요청은 기다리지 않고 바로 가져온다
+                try:
+                    nxt = self._queue.get_nowait()
+                except queue.Empty:
+                    # 한가할 때 혼자 들어온 요청은 기다리지 않고 바로 추론한다
+                    if not self._busy and len(batch) == 1:
+                        break
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    try:
+                        nxt = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                if nxt is _STOP:
+                    stopping = True
+                    break
+                if isinstance(nxt, list):
+                    # 묶음은 나누지 않는다
+                    if len(batch) + len(nxt) > self.max_batch_size:
+                        carry = nxt
+                        break
+                    batch.extend(nxt)
+                else:
+                    batch.append(nxt)
+
+            self._busy = len(batch) > 1
+            self._process(batch)
+
+        # 종료 후 남은 요청은 실패 처리
+        leftover = [carry] if carry is not None else []
+        self._fail(leftover + self._drain_queue())
+
+    def _drain_queue(self) -> list:
+        items = []
+        while True:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                return items
+
+    @staticmethod
+    def _fail(items: list) -> None:
+        for item in items:
+            if item is _STOP:
+                continue
+            for pending in (item if isinstance(item, list) else [item]):
+                if not pending.future.done():
+                    pending.future.set_exception(RuntimeError("추론 스케줄러가 종료되었습니다."))
+
+    def _process(self, batch: list) -> None:
+        started = time.perf_counter()
+        for item in batch:
+            queue_ms = (started - item.enqueued_at) * 1000.0
+            item.timings["queue"] = queue_ms
+            self.queue_wait_hist.observe(queue_ms)
+        self.batch_size_hist.observe(len(batch))
+
+        try:
+            inputs = normalize_into(self._batch_buffer, [item.array for item in batch])
+            outputs = self.infer_fn(inputs)
+            inference_ms = (time.perf_counter() - started) * 1000.0
+            for item in batch:
+                item.timings["inference"] = inference_ms
+            predictions = predictions_from_batch(outputs, self.top_k, [item.timings for item in batch])
+        except Exception as e:
+            for item in batch:
+                item.future.set_exception(e)
+            return
+
+        for item, prediction in zip(batch, predictions):
+            item.future.set_result(prediction)
@@ -0,0 +1,238 @@
+import hashlib
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+
+from results import Prediction, prediction_from_vector
+
+# 항목당 키/딕셔너리/배열 객체 오버헤드 추정치 (bytes)
+_ENTRY_OVERHEAD = 256
+
+
+def content_key(data) -> bytes:
+    """수신 바이트의 내용 해시 (캐시 키)"""
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+class SqliteStore:
+    """예측 결과를 재시작 후에도 유지하기 위한 로컬 SQLite 저장소
+
+    쓰기는 배치 스레드를 막지 않도록 백그라운드 스레드에서 모아서 커밋한다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS predictions ("
+            " key BLOB PRIMARY KEY, created REAL NOT NULL, value BLOB NOT NULL)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._pending = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="cache-store", daemon=True)
+        self._writer.start()
+
+    def get(self, key: bytes):
+        """(생성 시각, 예측 벡터) 반환, 없으면 None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created, value FROM predictions WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], np.frombuffer(row[1], dtype=np.float32)
+
+    def put(self, key: bytes, created: float, value: np.ndarray) -> None:
+        self._pending.put((key, created, value.tobytes()))
+
+    def delete(self, key: bytes) -> None:
+        self._pending.put((key, None, None))
+
+    def close(self) -> None:
+        self._pending.put(None)
+        self._writer.join(timeout=5)
+        with self._lock:
+            self._conn.close()
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self._pending.get()
+            items = [item]
+            # 쌓여 있는 쓰기는 한 트랜잭션으로 묶는다
+            while item is not None:
+                try:
+                    item = self._pending.get_nowait()
+                except queue.Empty:
+                    break
+                items.append(item)
+
+            stop = items[-1] is None
+            rows = [i for i in items if i is not None]
+            if rows:
+                with self._lock:
+                    for key, created, value in rows:
+                        if value is None:
+                            self._conn.execute("DELETE FROM predictions WHERE key = ?", (key,))
+                        else:
+                            self._conn.execute(
+                                "INSERT OR REPLACE INTO predictions (key, created, value) VALUES (?, ?, ?)",
+                                (key, created, value),
+                            )
+                    self._conn.commit()
+            if stop:
+                break
+
+
+class PredictionCache:
+    """내용 해시 기반 예측 결과 캐시
+
+    - 메모리 사용량 한도(max_bytes) 안에서 LRU 로 제거
+    - ttl(초)이 지난 항목은 조회 시 만료
+    - 같은 내용의 요청이 동시에 들어오면 첫 요청만 추론하고 나머지는 그 결과를 공유(single-flight)
+    - store 를 지정하면 메모리에 없을 때 디스크에서 조회하고, 새 결과를 디스크에도 기록
+    """
+
+    def __init__(self, max_bytes: int, ttl: float = 0, store: SqliteStore = None, top_k: int = 5):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.store = store
+        self.top_k = top_k
+
+        self._entries = OrderedDict()   # key -> (created, value)
+        self._inflight = {}             # key -> Future
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.store_errors = 0
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl > 0 and now - created > self.ttl
+
+    def begin(self, key: bytes) -> tuple:
+        """(Future, leader 여부) 반환
+
+        leader 가 True 이면 호출자가 직접 추론을 수행하고 complete()/fail() 로 결과를 알려야 한다.
+        False 이면 Future 는 캐시 값이나 진행 중인 다른 요청의 결과로 완료된다.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._expired(entry[0], now):
+                    self._remove(key)
+                    self.expirations += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._done(entry[1]), False
+
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+
+            future = Future()
+            self._inflight[key] = future
+
+        if self.store is not None:
+            try:
+                row = self.store.get(key)
+                if row is not None and self._expired(row[0], now):
+                    self.store.delete(key)
+                    row = None
+                prediction = None if row is None else prediction_from_vector(row[1], self.top_k, {}, cached=True)
+            except Exception:
+                # 디스크 조회 실패는 캐시에 없는 것으로 보고 호출자가 추론한다
+                # (future 는 _inflight 에 남아 있으므로 complete()/fail() 로 반드시 완료된다)
+                with self._lock:
+                    self.store_errors += 1
+                prediction = None
+            if prediction is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._insert(key, row[0], row[1])
+                    del self._inflight[key]
+                future.set_result(prediction)
+                return future, False
+
+        with self._lock:
+            self.misses += 1
+        return future, True
+
+    def complete(self, key: bytes, prediction: Prediction) -> None:
+        """leader 의 추론 결과 등록 (출력 벡터만 보관)"""
+        value = np.array(prediction.probs, dtype=np.float32)
+        created = time.time()
+        with self._lock:
+            self._insert(key, created, value)
+            future = self._inflight.pop(key, None)
+        if self.store is not None:
+            self.store.put(key, created, value)
+        if future is not None:
+            future.set_result(prediction)
+
+    def fail(self, key: bytes, error: BaseException) -> None:
+        """leader 의 추론 실패 전달 (실패는 캐시하지 않는다)"""
+        with self._lock:
+            future = self._inflight.pop(key, None)
+        if future is not None:
+            future.set_exception(error)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "store_errors": self.store_errors,
+            }
+
+    def summary(self) -> str:
+        return " ".join(f"{k}={v}" for k, v in self.stats().items())
+
+    def close(self) -> None:
+        if self.store is not None:
+            self.store.close()
+
+    def _done(self, value: np.ndarray) -> Future:
+        future = Future()
+        future.set_result(prediction_from_vector(value, self.top_k, {}, cached=True))
+        return future
+
+    def _insert(self, key: bytes, created: float, value: np.ndarray) -> None:
+        # 잠금을 잡은 상태에서 호출
+        if key in self._entries:
+            self._remove(key)
+        cost = value.nbytes + _ENTRY_OVERHEAD
+        if cost > self.max_bytes:
+            return
+        self._entries[key] = (created, value)
+        self._bytes += cost
+        while self._bytes > self.max_bytes:
+            old_key = next(iter(self._entries))
+            self._remove(old_key)
+            self.evictions += 1
+
+    def _remove(self, key: bytes) -> None:
+        # 잠금을 잡은 상태에서 호출
+        _, value = self._entries.pop(key)
+        self._bytes -= value.nbytes + _ENTRY_OVERHEAD
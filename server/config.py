@@ -0,0 +1,149 @@
+import argparse
+import dataclasses
+from dataclasses import dataclass, field
+
+from protocol import DEFAULT_MAX_PAYLOAD_BYTES
+
+# 서버 기본 설정
+SERVER_IP = '0.0.0.0'
+SERVER_PORT = 8080
+
+# 모델/라벨 경로 (Docker 환경이라면 ./server/model, ./server/label.xlsx 로 지정)
+MODEL_DIR = './model'
+LABEL_PATH = './label.xlsx'
+
+
+@dataclass
+class ServerConfig:
+    """서버 엔진 설정, 각 필드는 --필드-이름 형태의 CLI 옵션으로도 노출된다"""
+    host: str = field(default=SERVER_IP, metadata={"help": "바인드 주소"})
+    port: int = field(default=SERVER_PORT, metadata={"help": "바인드 포트"})
+    model_dir: str = field(default=MODEL_DIR, metadata={"help": "SavedModel 디렉토리"})
+    label_path: str = field(default=LABEL_PATH, metadata={"help": "라벨 파일 경로"})
+
+    # 추론 백엔드 (tflite 모델은 export_model.py 로 생성, stub 은 모델 없이 부하 테스트용)
+    backend: str = field(default='savedmodel', metadata={
+        "help": "추론 백엔드", "choices": ('savedmodel', 'tflite', 'xla', 'onnx', 'stub')})
+    tflite_path: str = field(default='', metadata={"help": "tflite 백엔드 모델 파일 경로"})
+    onnx_path: str = field(default='', metadata={"help": "onnx 백엔드 모델 파일 경로"})
+    backend_threads: int = field(default=0, metadata={"help": "tflite/onnx 백엔드 추론 스레드 수, 0이면 기본값"})
+    stub_classes: int = field(default=0, metadata={"help": "stub 백엔드 클래스 수, 0이면 라벨 개수"})
+    stub_latency_ms: float = field(default=0.0, metadata={"help": "stub 백엔드 배치당 추론 지연(ms)"})
+    stub_latency_per_image_ms: float = field(default=0.0, metadata={"help": "stub 백엔드 이미지당 추가 지연(ms)"})
+
+    # 마이크로 배칭
+    max_batch_size: int = field(default=16, metadata={"help": "최대 배치 크기"})
+    max_batch_wait_ms: float = field(default=5.0, metadata={"help": "배치 최대 대기 시간(ms)"})
+    stats_interval: float = field(default=30.0, metadata={"help": "통계 로그 주기(초), 0이면 끔"})
+
+    # 응답 형식
+    response_format: str = field(default='text', metadata={"help": "기본 응답 형식", "choices": ('text', 'json')})
+    top_k: int = field(default=5, metadata={"help": "JSON 응답의 상위 후보 수"})
+
+    # 연결 처리 방식
+    mode: str = field(default='thread', metadata={"help": "연결 처리 방식", "choices": ('thread', 'asyncio')})
+    max_connections: int = field(default=1024, metadata={"help": "동시 연결 수 제한"})
+    max_inflight: int = field(default=64, metadata={"help": "동시 처리 요청 수 제한 (asyncio)"})
+    executor_workers: int = field(default=4, metadata={"help": "디코드/전처리 스레드 수 (asyncio)"})
+
+    # 수신
+    max_payload_bytes: int = field(default=DEFAULT_MAX_PAYLOAD_BYTES, metadata={"help": "요청 1건의 최대 크기(bytes)"})
+    buffer_pool_bytes: int = field(default=64 * 1024 * 1024, metadata={"help": "수신 버퍼 풀 최대 보관량(bytes)"})
+    max_pipeline: int = field(default=32, metadata={"help": "프레임 연결당 동시 처리 요청 수 (thread)"})
+    archive_window: int = field(default=256, metadata={
+        "help": "아카이브 요청당 응답을 기다리는 최대 항목 수, 최대 배치 크기보다 작으면 배치 크기 (thread)"})
+    archive_decode_threads: int = field(default=0, metadata={"help": "아카이브 항목 디코드 스레드 수, 0이면 코어 수 (thread)"})
+
+    # 수락 제어 / 과부하 보호
+    max_queue: int = field(default=256, metadata={"help": "처리 대기 요청 수 상한, 넘으면 바로 혼잡 응답 (0이면 무제한)"})
+    max_queue_wait_ms: float = field(default=2000.0, metadata={
+        "help": "예상 대기 시간 상한(ms), 넘으면 바로 혼잡 응답 (0이면 끔)"})
+    rate_limit: float = field(default=0.0, metadata={"help": "클라이언트 IP 별 초당 요청 수 제한, 0이면 끔"})
+    rate_burst: int = field(default=20, metadata={"help": "클라이언트 IP 별 순간 허용 요청 수"})
+    read_timeout: float = field(default=30.0, metadata={"help": "요청 수신 제한 시간(초), 넘으면 연결을 닫음 (0이면 무제한)"})
+    idle_timeout: float = field(default=300.0, metadata={"help": "다음 요청을 기다리는 최대 시간(초), 0이면 무제한"})
+
+    # 예측 결과 캐시
+    cache_bytes: int = field(default=64 * 1024 * 1024, metadata={"help": "예측 캐시 메모리 한도(bytes), 0이면 끔"})
+    cache_ttl: float = field(default=0.0, metadata={"help": "예측 캐시 유효 시간(초), 0이면 무제한"})
+    cache_db: str = field(default='', metadata={"help": "예측 캐시 SQLite 파일 경로 (재시작 후에도 유지)"})
+
+    # 멀티 프로세스 추론
+    workers: int = field(default=0, metadata={"help": "추론 워커 프로세스 수, 0이면 프로세스 내에서 추론"})
+    worker_slots: int = field(default=4, metadata={"help": "워커당 공유 메모리 슬롯 수"})
+    shm_slot_bytes: int = field(default=8 * 1024 * 1024, metadata={"help": "공유 메모리 슬롯 크기(bytes)"})
+    worker_slot_timeout: float = field(default=2.0, metadata={
+        "help": "빈 공유 메모리 슬롯을 기다리는 최대 시간(초), 넘으면 혼잡 응답"})
+    worker_intra_threads: int = field(default=0, metadata={"help": "워커당 TF intra-op 스레드 수, 0이면 코어 수/워커 수"})
+    worker_inter_threads: int = field(default=1, metadata={"help": "워커당 TF inter-op 스레드 수"})
+
+    # 시작 / 상태 확인
+    warmup_batch_sizes: str = field(default='auto', metadata={
+        "help": "워밍업할 배치 크기 (쉼표 구분, auto: 1,2,4,...,최대 배치 크기, all: 1~최대 배치 크기, none: 끔)"})
+    health_port: int = field(default=0, metadata={"help": "상태 확인/메트릭 HTTP 포트 (/healthz, /readyz, /metrics), 0이면 끔"})
+    admin_port: int = field(default=0, metadata={
+        "help": "관리 채널 포트 (127.0.0.1 전용, 스레드 덤프/프로파일/tracemalloc), 0이면 끔"})
+    admin_dump_dir: str = field(default='', metadata={"help": "프로파일/스냅샷 저장 디렉토리, 비우면 임시 디렉토리"})
+
+    # 계측
+    metrics_interval: float = field(default=10.0, metadata={"help": "처리량 계산/메트릭 기록 주기(초), 0이면 끔"})
+    metrics_log: str = field(default='', metadata={"help": "메트릭 JSON lines 기록 파일 ('-' 이면 표준 로그)"})
+
+    # 로그
+    log_file: str = field(default='', metadata={"help": "로그 파일 경로 (크기 기준 회전), 비우면 표준 로그만"})
+    log_max_bytes: int = field(default=10 * 1024 * 1024, metadata={"help": "로그 파일 회전 크기(bytes)"})
+    log_backup_count: int = field(default=5, metadata={"help": "보관할 이전 로그 파일 수"})
+    log_queue_size: int = field(default=10000, metadata={"help": "기록 대기 로그 수 상한, 넘으면 버림"})
+    log_ring_size: int = field(default=1000, metadata={"help": "UI 로그 창에 유지하는 최근 로그 수"})
+    log_sample_threshold: int = field(default=200, metadata={"help": "초당 로그 수가 이 값을 넘으면 샘플링 (0이면 끔)"})
+    log_sampling: str = field(default='INFO=20,SUCCESS=20,WARNING=4', metadata={
+        "help": "샘플링 중 레벨별로 남길 비율 (LEVEL=N: N 건 중 1건, 지정하지 않은 레벨은 모두 기록)"})
+
+    def warmup_sizes(self) -> list:
+        """warmup_batch_sizes 를 해석한 배치 크기 목록 (오름차순)"""
+        spec = self.warmup_batch_sizes.strip().lower()
+        max_size = max(1, self.max_batch_size)
+        if spec in ('', 'none', '0'):
+            return []
+        if spec == 'all':
+            return list(range(1, max_size + 1))
+        if spec == 'auto':
+            sizes, n = [], 1
+            while n < max_size:
+                sizes.append(n)
+                n *= 2
+            return sizes + [max_size]
+        return sorted({min(max(1, int(s)), max_size) for s in spec.split(',') if s.strip()})
+
+    def backend_batch_sizes(self) -> list:
+        """고정 shape 백엔드(tflite, xla)가 준비할 배치 크기, 배치는 이 중 가장 가까운 크기로 패딩된다"""
+        return sorted(set(self.warmup_sizes()) | {max(1, self.max_batch_size)})
+
+    def log_sample_every(self) -> dict:
+        """log_sampling 을 해석한 {레벨: N} (N 건 중 1건만 기록)"""
+        every = {}
+        for item in self.log_sampling.split(','):
+            level, _, n = item.partition('=')
+            if level.strip() and n.strip():
+                every[level.strip().upper()] = max(1, int(n))
+        return every
+
+    @classmethod
+    def add_arguments(cls, parser: argparse.ArgumentParser) -> None:
+        """모든 필드를 argparse 옵션으로 등록"""
+        for f in dataclasses.fields(cls):
+            option = '--' + f.name.replace('_', '-')
+            help_text = f.metadata.get("help", "")
+            if f.type in (bool, 'bool'):
+                parser.add_argument(option, dest=f.name, action=argparse.BooleanOptionalAction,
+                                    default=f.default, help=help_text)
+            else:
+                ftype = {'int': int, 'float': float, 'str': str}.get(f.type, f.type)
+                parser.add_argument(option, dest=f.name, type=ftype, default=f.default,
+                                    choices=f.metadata.get("choices"),
+                                    help=f"{help_text} (기본값: {f.default})")
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace) -> 'ServerConfig':
+        """argparse 결과로부터 설정 생성"""
+        return cls(**{f.name: getattr(args, f.name) for f in dataclasses.fields(cls)})
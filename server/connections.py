@@ -0,0 +1,48 @@
+import threading
+
+
+class ConnectionRegistry:
+    """(ip, port) 를 키로 연결별 값을 보관하는 스레드 안전 dict
+
+    연결마다 등록/제거가 O(1) 이므로 연결 수가 많아도 수락/종료 비용이 늘지 않는다.
+    엔진은 (소켓, 처리 스레드) 를, UI 는 Treeview 항목 ID 를 보관한다.
+    """
+
+    def __init__(self):
+        self._items = {}
+        self._lock = threading.Lock()
+
+    def add(self, key, value, limit: int = 0) -> bool:
+        """등록, limit(>0) 개 이상 등록되어 있으면 등록하지 않고 False 반환"""
+        with self._lock:
+            if 0 < limit <= len(self._items):
+                return False
+            self._items[key] = value
+            return True
+
+    def pop(self, key, default=None):
+        """제거 후 값 반환, 없으면 default"""
+        with self._lock:
+            return self._items.pop(key, default)
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._items.get(key, default)
+
+    def values(self) -> list:
+        """현재 값 목록 (복사본)"""
+        with self._lock:
+            return list(self._items.values())
+
+    def clear(self) -> list:
+        """모두 제거 후 제거된 값 목록 반환"""
+        with self._lock:
+            values = list(self._items.values())
+            self._items.clear()
+            return values
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key) -> bool:
+        return key in self._items
@@ -0,0 +1,868 @@
+import datetime
+import json
+import logging
+import os
+import queue
+import signal
+import socket
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from admin import AdminServer
+from admission import AdmissionController, Overloaded
+from aio_server import AsyncServerRunner
+from archive import ArchiveRequest
+from backends import backend_options, create_backend
+from batching import InferenceBatcher
+from cache import PredictionCache, SqliteStore, content_key
+from config import ServerConfig
+from connections import ConnectionRegistry
+from labels import load_labels
+from logpipe import LogPipeline
+from metrics import ServerMetrics
+from preprocess import MODEL_INPUT_SHAPE, decode_image, to_model_input, warmup_decoder
+from results import Prediction, to_json
+from protocol import (
+    FLAG_JSON, FLAG_RAW_RGB, FRAME_ARCHIVE, FRAME_BUSY, FRAME_CLASSIFY, FRAME_ERROR, FRAME_HEADER_SIZE, FRAME_HEALTH,
+    FRAME_RESULT, FRAME_STATUS, HEADER_SIZE,
+    BufferPool, PayloadTooLarge, ProtocolError,
+    is_frame_header, pack_frame, parse_frame_header, recv_exact, recv_into_exact,
+)
+from status_http import StatusHTTPServer, json_response
+from workers import ProcessWorkerPool
+
+logger = logging.getLogger("flower.server")
+metrics_logger = logging.getLogger("flower.metrics")
+
+# 엔진에서 옵저버(UI 등)로 전달되는 이벤트 (로그는 이벤트 대신 self.logs 링 버퍼에서 읽는다)
+# kind: "state" | "client_connected" | "client_disconnected"
+ServerEvent = namedtuple("ServerEvent", ["kind", "timestamp", "data"])
+
+# 연결 종료 시 처리 중인 요청의 응답을 기다리는 최대 시간(초)
+RESPONSE_DRAIN_TIMEOUT = 30.0
+
+
+class FlowerServer:
+    """UI와 무관하게 동작하는 꽃 분류 서버 엔진"""
+
+    def __init__(self, config: ServerConfig = None):
+        self.config = config or ServerConfig()
+
+        # 모델
+        self.labels = None
+        self.backend = None     # 프로세스 안에서 추론하는 백엔드 (workers > 0 이면 None)
+        self.batcher = None
+        self.decode_pool = None     # 아카이브 항목 디코드 스레드 (batcher 와 함께 생성)
+        self.cache = None
+        self.worker_pool = None
+        self.async_runner = None
+        self.buffer_pool = BufferPool(max_pooled_bytes=self.config.buffer_pool_bytes)
+
+        # 서버 및 스레드 관련 변수 초기화
+        self.server_socket = None
+        self.clients = ConnectionRegistry()     # (ip, port) -> (소켓, 처리 스레드)
+        self.running = False # 서버 실행 상태
+
+        # 시작 단계 (idle → loading → warming → loaded → starting → ready → stopping → stopped, 실패 시 failed)
+        self.phase = "idle"
+        self.startup_timings = {}   # 단계 이름 -> 소요 시간(초)
+        self.status_server = None
+        self.admin_server = None
+
+        # 계측
+        self.metrics = ServerMetrics()
+        self._register_cache_metrics()
+
+        # 로그 (호출 스레드는 큐에 넣기만 하고 기록은 writer 스레드가 한다)
+        self.logs = LogPipeline(self.config, self.metrics.registry)
+
+        # 수락 제어 (대기 요청 수/예상 대기 시간 상한, IP 별 요청률 제한)
+        self.admission = AdmissionController(self.config, self.metrics.registry)
+
+        self._observers = []
+        self._stop_event = threading.Event()
+
+    # ------------------------------------------------------------------
+    # 이벤트
+    # ------------------------------------------------------------------
+    def add_observer(self, callback) -> None:
+        """이벤트 수신자 등록, callback(ServerEvent)는 여러 스레드에서 호출되므로 가벼워야 한다"""
+        self._observers.append(callback)
+
+    def remove_observer(self, callback) -> None:
+        if callback in self._observers:
+            self._observers.remove(callback)
+
+    def emit(self, kind: str, **data) -> None:
+        event = ServerEvent(kind, time.time(), data)
+        for callback in list(self._observers):
+            try:
+                callback(event)
+            except Exception:
+                logger.exception("이벤트 전달 실패")
+
+    def log(self, message: str, msg_type: str = "INFO") -> None:
+        """로그 기록, 큐에 넣기만 하므로 요청 처리 중에도 블록하지 않는다"""
+        self.logs.submit(message, msg_type.upper())
+
+    # ------------------------------------------------------------------
+    # 모델
+    # ------------------------------------------------------------------
+    def load_model_and_labels(self) -> bool:
+        """모델 및 라벨 파일 로드 후 워밍업"""
+        self.phase = "loading"
+        try:
+            # 라벨은 xlsx 대신 JSON 캐시에서 읽는다 (stub 백엔드의 클래스 수로도 쓰인다)
+            started = time.perf_counter()
+            self.labels = load_labels(self.config.label_path, self.log)
+            self._record_startup("load_labels", started)
+
+            # 워커 프로세스 모드에서는 각 워커가 모델을 로드하므로 여기서는 불러오지 않는다
+            if self.config.workers <= 0:
+                backend = create_backend(backend_options(self.config, len(self.labels)))
+                backend.load()
+                self.startup_timings.update(backend.load_timings)
+                self.backend = backend
+                self.log(f"추론 백엔드: {backend.name}")
+                # 모델 출력 차원과 라벨 수가 맞는지 확인
+                self.labels.validate(self.output_dim())
+
+            if self.model_loaded:
+                self.phase = "warming"
+                started = time.perf_counter()
+                self.warmup()
+                self._record_startup("warmup", started)
+
+            self.phase = "loaded"
+            self.log("모델/라벨 로드 완료", "SUCCESS")
+            return True
+        except Exception as e:
+            self.phase = "failed"
+            self.log(f"모델 또는 라벨 파일 로드 실패: {str(e)}", "ERROR")
+            self.labels = None
+            self.backend = None
+            return False
+
+    @property
+    def model_loaded(self) -> bool:
+        """프로세스 안에서 추론할 모델이 준비되었는지 여부"""
+        return self.backend is not None
+
+    def warmup(self) -> None:
+        """설정된 배치 크기마다 더미 배치로 serving_default 를 미리 실행
+
+        첫 요청이 그래프 추적/커널 초기화 비용을 치르지 않도록 연결을 받기 전에 수행한다.
+        """
+        warmup_decoder()
+        sizes = self.config.warmup_sizes()
+        if not sizes:
+            return
+        batch = np.zeros((sizes[-1],) + MODEL_INPUT_SHAPE, dtype=np.float32)
+        for size in sizes:
+            self.infer_batch(batch[:size])
+        self.log(f"워밍업 완료: 배치 크기 {sizes}")
+
+    def _record_startup(self, name: str, started: float) -> None:
+        self.startup_timings[name] = time.perf_counter() - started
+
+    # ------------------------------------------------------------------
+    # 서버 수명 주기
+    # ------------------------------------------------------------------
+    def start(self) -> bool:
+        """서버 시작, 성공 여부 반환"""
+        # stop() 으로 닫은 로그 파이프라인 다시 시작 (UI 에서 재시작하는 경우)
+        self.logs.start()
+        if self.running:
+            self.log("서버가 이미 실행 중입니다.", "WARNING")
+            return False
+
+        if self.phase in ("loading", "warming"):
+            self.log("모델을 불러오는 중입니다. 잠시 후 다시 시도해 주세요.", "WARNING")
+            return False
+
+        if (not self.model_loaded and self.config.workers <= 0) or self.labels is None:
+            self.log("모델 또는 라벨 파일이 로드되지 않아 서버를 시작할 수 없습니다.", "ERROR")
+            return False
+
+        host, port = self.config.host, self.config.port
+        self.phase = "starting"
+        try:
+            # 추론 워커 시작 (각 워커가 모델 로드와 워밍업을 마쳐야 준비 완료)
+            if self.config.workers > 0:
+                self.log(f"추론 워커 프로세스 {self.config.workers}개 시작 중...")
+                started = time.perf_counter()
+                self.worker_pool = ProcessWorkerPool(self.config, log=self.log, num_classes=len(self.labels))
+                self.worker_pool.start()
+                self.labels.validate(self.worker_pool.num_classes)
+                self._record_startup("start_workers", started)
+            else:
+                self.batcher = InferenceBatcher(
+                    self.infer_batch,
+                    max_batch_size=self.config.max_batch_size,
+                    max_wait_ms=self.config.max_batch_wait_ms,
+                    top_k=self.config.top_k,
+                )
+                self.batcher.start()
+                self.decode_pool = ThreadPoolExecutor(
+                    max_workers=self.config.archive_decode_threads or os.cpu_count() or 1,
+                    thread_name_prefix="archive-decode")
+
+            # 예측 결과 캐시
+            if self.config.cache_bytes > 0:
+                store = SqliteStore(self.config.cache_db) if self.config.cache_db else None
+                self.cache = PredictionCache(self.config.cache_bytes, self.config.cache_ttl, store,
+                                             top_k=self.config.top_k)
+
+            started = time.perf_counter()
+            if self.config.mode == 'asyncio':
+                self.async_runner = AsyncServerRunner(self)
+                self.async_runner.start()
+            else:
+                self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                self.server_socket.bind((host, port))
+                self.server_socket.listen(socket.SOMAXCONN)
+                self.server_socket.settimeout(1)
+            self._record_startup("listen", started)
+
+            self.running = True
+            self._stop_event.clear()
+
+            # 연결 대기
+            if self.server_socket is not None:
+                threading.Thread(target=self.listen_for_clients, daemon=True).start()
+            if self.config.stats_interval > 0:
+                threading.Thread(target=self._stats_loop, daemon=True).start()
+            if self.config.metrics_interval > 0:
+                threading.Thread(target=self._metrics_loop, name="metrics", daemon=True).start()
+
+            self.emit("state", running=True, host=host, port=port)
+            self.phase = "ready"
+            self.log(f"서버가 {host}:{port}에서 시작되었습니다. ({self.config.mode})", "INFO")
+            self.log("시작 시간: " + " ".join(f"{name}={seconds:.2f}s" for name, seconds in self.startup_timings.items())
+                     + f" total={sum(self.startup_timings.values()):.2f}s")
+            return True
+
+        except Exception as e:
+            self.phase = "failed"
+            self.running = False
+            if self.batcher is not None:
+                self.batcher.stop()
+                self.batcher = None
+            if self.decode_pool is not None:
+                self.decode_pool.shutdown(wait=False)
+                self.decode_pool = None
+            if self.worker_pool is not None:
+                self.worker_pool.stop()
+                self.worker_pool = None
+            if self.cache is not None:
+                self.cache.close()
+                self.cache = None
+            if self.server_socket:
+                self.server_socket.close()
+                self.server_socket = None
+            self.async_runner = None
+            self.emit("state", running=False, host=host, port=port)
+            self.log(f'서버 실행 실패: {str(e)}', 'ERROR')
+            return False
+
+    def stop(self) -> None:
+        """서버 중지"""
+        if not self.running:
+            self.log("이미 중지된 상태입니다.", "WARNING")
+            return
+
+        self.running = False
+        self.phase = "stopping"
+        self._stop_event.set()
+        self.log("서버 종료중...")
+
+        if self.async_runner is not None:
+            self.async_runner.stop()
+            self.async_runner = None
+
+        # 모든 클라이언트 소켓 닫기
+        clients = self.clients.values()
+        for client_socket, _ in clients:
+            try:
+                client_socket.close()
+            except Exception:
+                pass
+
+        # 모든 클라이언트 스레드 종료 대기
+        for _, thread in clients:
+            if thread.is_alive():
+                thread.join(timeout=1)
+
+        if self.server_socket:
+            try:
+                self.server_socket.close()
+            except Exception:
+                pass
+            self.server_socket = None
+
+        # 추론 워커 종료
+        if self.batcher is not None:
+            self.batcher.stop()
+            self.log(f"배치 통계: {self.batcher.summary()}")
+            self.batcher = None
+
+        if self.decode_pool is not None:
+            self.decode_pool.shutdown(wait=False)
+            self.decode_pool = None
+
+        if self.worker_pool is not None:
+            self.log(f"워커 통계: {self.worker_pool.summary()}")
+            self.worker_pool.stop()
+            self.worker_pool = None
+
+        if self.cache is not None:
+            self.log(f"캐시 통계: {self.cache.summary()}")
+            self.cache.close()
+            self.cache = None
+
+        self.phase = "stopped"
+        self.emit("state", running=False, host=self.config.host, port=self.config.port)
+        self.log("서버가 중지되었습니다.")
+        # 마지막 로그까지 기록하고 writer 스레드와 로그 파일을 닫는다
+        self.logs.close()
+
+    def serve_forever(self) -> int:
+        """UI 없이 실행, SIGINT/SIGTERM 을 받을 때까지 블록"""
+        self.start_status_server()
+        self.start_admin_server()
+        if not self.load_model_and_labels() or not self.start():
+            self.stop_admin_server()
+            self.stop_status_server()
+            self.logs.close()
+            return 1
+
+        def _handle_signal(signum, frame):
+            self._stop_event.set()
+
+        signal.signal(signal.SIGTERM, _handle_signal)
+        try:
+            while not self._stop_event.wait(1):
+                pass
+        except KeyboardInterrupt:
+            pass
+        self.stop()
+        self.stop_admin_server()
+        self.stop_status_server()
+        return 0
+
+    # ------------------------------------------------------------------
+    # 상태 확인
+    # ------------------------------------------------------------------
+    @property
+    def ready(self) -> bool:
+        """워밍업을 마치고 연결을 받는 중인지 여부"""
+        return self.phase == "ready"
+
+    def health_status(self) -> dict:
+        """상태 확인 응답 (FRAME_HEALTH, /healthz, /readyz 공통)"""
+        return {
+            "status": self.phase,
+            "ready": self.ready,
+            "mode": self.config.mode,
+            "workers": self.config.workers,
+            "pending": self.admission.pending,
+            "estimated_wait_ms": round(self.admission.estimated_wait() * 1000.0, 1),
+            "startup_s": {name: round(seconds, 3) for name, seconds in self.startup_timings.items()},
+        }
+
+    def start_status_server(self) -> None:
+        """health_port 가 설정되어 있으면 상태 확인 HTTP 서버 시작 (모델 로드 전부터 응답)"""
+        if self.config.health_port <= 0 or self.status_server is not None:
+            return
+        self.status_server = StatusHTTPServer(self.config.host, self.config.health_port)
+        self.status_server.add_route("/healthz", lambda: json_response(self.health_status()))
+        self.status_server.add_route(
+            "/readyz", lambda: json_response(self.health_status(), 200 if self.ready else 503))
+        self.status_server.add_route(
+            "/metrics", lambda: (200, 'text/plain; version=0.0.4; charset=utf-8',
+                                 self.metrics.registry.render_prometheus().encode('utf-8')))
+        self.status_server.start()
+        self.log(f"상태 확인 HTTP 서버: {self.config.host}:{self.config.health_port} (/healthz, /readyz, /metrics)")
+
+    def stop_status_server(self) -> None:
+        if self.status_server is not None:
+            self.status_server.stop()
+            self.status_server = None
+
+    def start_admin_server(self) -> None:
+        """admin_port 가 설정되어 있으면 로컬 관리 채널 시작 (python admin.py --port N help)"""
+        if self.config.admin_port <= 0 or self.admin_server is not None:
+            return
+        self.admin_server = AdminServer(self.config.admin_port, self.config.admin_dump_dir, self.log)
+        self.admin_server.start()
+        self.log(f"관리 채널: 127.0.0.1:{self.config.admin_port} (덤프 디렉토리 {self.admin_server.dump_dir})")
+
+    def stop_admin_server(self) -> None:
+        if self.admin_server is not None:
+            self.admin_server.stop()
+            self.admin_server = None
+
+    def _metrics_loop(self) -> None:
+        """주기적으로 처리량 갱신, metrics_log 가 설정되어 있으면 메트릭을 JSON lines 로 기록"""
+        path = self.config.metrics_log
+        out = open(path, 'a', encoding='utf-8') if path and path != '-' else None
+        try:
+            self.metrics.update_rates()
+            while not self._stop_event.wait(self.config.metrics_interval):
+                self.metrics.update_rates()
+                if not path:
+                    continue
+                line = json.dumps({"ts": round(time.time(), 3), **self.metrics.registry.snapshot()},
+                                  ensure_ascii=False)
+                if out is None:
+                    metrics_logger.info(line)
+                else:
+                    out.write(line + "\n")
+                    out.flush()
+        finally:
+            if out is not None:
+                out.close()
+
+    def _register_cache_metrics(self) -> None:
+        """캐시/워커 풀이 직접 세고 있는 값을 메트릭으로 노출 (서버 재시작으로 객체가 바뀌어도 현재 객체를 읽는다)"""
+        registry = self.metrics.registry
+        for event in ("hits", "disk_hits", "misses", "coalesced", "evictions", "expirations", "store_errors"):
+            registry.register_callback("flower_cache_events_total", "예측 캐시 이벤트 수",
+                                       lambda event=event: getattr(self.cache, event, 0), kind="counter", event=event)
+        registry.register_callback("flower_cache_bytes", "예측 캐시 메모리 사용량(bytes)",
+                                   lambda: self.cache.stats()["bytes"] if self.cache is not None else 0)
+        registry.register_callback("flower_worker_restarts_total", "비정상 종료 후 재시작한 추론 워커 수",
+                                   lambda: getattr(self.worker_pool, "restarts", 0), kind="counter")
+
+    def _stats_loop(self) -> None:
+        """주기적으로 배치 크기 / 큐 대기 시간 히스토그램 로그"""
+        while not self._stop_event.wait(self.config.stats_interval):
+            batcher, cache, worker_pool = self.batcher, self.cache, self.worker_pool
+            if batcher is not None:
+                self.log(f"배치 통계: {batcher.summary()}")
+            if worker_pool is not None:
+                self.log(f"워커 통계: {worker_pool.summary()}")
+            if cache is not None:
+                self.log(f"캐시 통계: {cache.summary()}")
+            self.log(f"수락 제어: {self.admission.summary()}")
+            self.log(f"로그: {self.logs.summary()}")
+
+    # ------------------------------------------------------------------
+    # 연결 처리
+    # ------------------------------------------------------------------
+    def listen_for_clients(self) -> None:
+        """클라이언트 연결 대기 및 처리 스레드 시작"""
+        while self.running:
+            try:
+                client_socket, client_addr = self.server_socket.accept()
+
+                # 동시 연결 수를 넘으면 스레드를 시작하지 않고 바로 혼잡 응답 후 닫는다
+                client_thread = threading.Thread(
+                    target=self.handle_client,
+                    args=(client_socket, client_addr)
+                )
+                if not self.clients.add(client_addr, (client_socket, client_thread), self.config.max_connections):
+                    self._reject_connection(client_socket, client_addr)
+                    continue
+
+                # 클라이언트 소켓 및 스레드 관리
+                self.log(f"클라이언트 연결: {client_addr}")
+
+                # 클라이언트 목록 업데이트
+                now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                self.emit("client_connected", ip=client_addr[0], port=client_addr[1], time=now)
+
+                # 클라이언트 처리 스레드 시작
+                client_thread.start()
+
+            except socket.timeout:
+                continue
+            except Exception as e:
+                if self.running:
+                    self.log(f"클라이언트 연결 대기중 오류: {str(e)}", "ERROR")
+
+    def _reject_connection(self, client_socket: socket.socket, client_addr: tuple) -> None:
+        overloaded = self.admission.overloaded("connections")
+        self.log(f"{client_addr} - 동시 연결 수 초과로 거절합니다.", "WARNING")
+        try:
+            client_socket.settimeout(1)
+            client_socket.sendall(overloaded.reply().encode('utf-8'))
+        except OSError:
+            pass
+        finally:
+            client_socket.close()
+
+    @staticmethod
+    def _timeout(seconds: float):
+        """설정값 0 이하는 제한 없음(None)"""
+        return seconds if seconds > 0 else None
+
+    def handle_client(self, client_socket: socket.socket, client_addr: tuple) -> None:
+        """단일 클라이언트로부터 데이터를 수신하고 분류하여 결과를 전송"""
+        client_ip, client_port = client_addr
+        metrics = self.metrics
+        metrics.connections.inc()
+        metrics.active_connections.inc()
+        waiting = "idle"
+
+        try:
+            self.log(f"클라이언트 처리 시작: {client_addr}")
+
+            # 첫 요청을 기다리는 동안은 유휴 시간 제한 적용
+            client_socket.settimeout(self._timeout(self.config.idle_timeout))
+
+            # 8byte로 데이터 크기 수신
+            data_size_bytes = recv_exact(client_socket, HEADER_SIZE)
+            if len(data_size_bytes) != HEADER_SIZE:
+                self.log(f"데이터 크기 수신 실패: {client_addr}", "ERROR")
+                return
+
+            # 프레임 프로토콜이면 연결을 유지하며 여러 요청 처리
+            if is_frame_header(data_size_bytes):
+                self.serve_frames(client_socket, client_addr, data_size_bytes)
+                return
+
+            expected_size = int.from_bytes(data_size_bytes, 'big')
+            self.log(f"{client_addr} - 예상 데이터 크기: {expected_size} bytes")
+
+            try:
+                self.check_payload_size(expected_size)
+            except PayloadTooLarge as e:
+                self.log(f"{client_addr} - {str(e)}", "ERROR")
+                metrics.errors.inc()
+                client_socket.sendall(f"이미지가 너무 큽니다: {str(e)}".encode('utf-8'))
+                return
+
+            # 선언된 크기만큼의 버퍼에 직접 수신
+            waiting = "read"
+            client_socket.settimeout(self._timeout(self.config.read_timeout))
+            buffer = self.buffer_pool.acquire(expected_size)
+            try:
+                started = time.perf_counter()
+                received_size = recv_into_exact(client_socket, buffer)
+                metrics.observe_stage("receive", started)
+                metrics.bytes_received.inc(HEADER_SIZE + received_size)
+                received_at = time.perf_counter()
+                self.log(f"{client_addr} - 수신된 데이터 크기: {received_size} bytes")
+
+                result = "서버 오류가 발생했습니다."
+                if received_size != expected_size:
+                    self.log(f"{client_addr} - 수신 데이터 크기가 예상과 다릅니다.", "ERROR")
+                    metrics.errors.inc()
+                    result = "데이터 수신 중 오류가 발생했습니다."
+                else:
+                    try:
+                        future = self.admit_payload(buffer, client_ip)
+                        self.log(f"{client_addr} - 이미지 로드 성공, 분류 중...")
+
+                        prediction = future.result()
+                        result = self.format_result(prediction, self.config.response_format == 'json')
+                        self.log(f"{client_addr} - 분류 결과: {result}", "SUCCESS")
+
+                    except Overloaded as e:
+                        self.log(f"{client_addr} - {str(e)}", "WARNING")
+                        result = e.reply()
+                    except Exception as e:
+                        self.log(f"{client_addr}- 이미지 처리/분류 실패: {str(e)}", "ERROR")
+                        metrics.errors.inc()
+                        result = f"이미지 분류에 실패했습니다: {str(e)}"
+            finally:
+                self.buffer_pool.release(buffer)
+
+            payload = result.encode('utf-8')
+            started = time.perf_counter()
+            client_socket.sendall(payload)
+            metrics.observe_stage("send", started)
+            metrics.bytes_sent.inc(len(payload))
+            metrics.request_latency.observe((time.perf_counter() - received_at) * 1000.0)
+
+        except socket.timeout:
+            self.admission.timeouts[waiting].inc()
+            self.log(f"{client_addr} - {'수신' if waiting == 'read' else '유휴'} 시간 초과로 연결을 닫습니다.", "WARNING")
+        except Exception as e:
+            self.log(f"{client_addr} - 처리 중 오류 발생: {str(e)}", "ERROR")
+        finally:
+            try:
+                client_socket.close()
+            except Exception:
+                pass
+
+            metrics.active_connections.dec()
+            self.emit("client_disconnected", ip=client_ip, port=client_port)
+            self.clients.pop(client_addr)
+
+            self.log(f"클라이언트 연결 종료됨: {client_addr}")
+
+    def serve_frames(self, client_socket: socket.socket, client_addr: tuple, prefix: bytes) -> None:
+        """프레임 프로토콜 연결 처리
+
+        수신 스레드(현재 스레드)는 프레임을 읽어 디코드한 뒤 배칭 스케줄러에 넘기고
+        곧바로 다음 프레임을 읽는다. 추론이 끝난 순서대로 응답 큐에 쌓이고,
+        전용 송신 스레드가 이를 전송하므로 응답 순서는 요청 순서와 다를 수 있다.
+        응답 큐에는 (프레임, 요청 수신 완료 시각) 을 넣는다.
+        """
+        metrics = self.metrics
+        responses = queue.Queue()
+        window = threading.Semaphore(self.config.max_pipeline)
+        writer = threading.Thread(target=self._frame_writer, args=(client_socket, responses), daemon=True)
+        writer.start()
+
+        def error(request_id, message, received_at=None):
+            metrics.errors.inc()
+            responses.put((pack_frame(FRAME_ERROR, request_id, message.encode('utf-8')), received_at))
+
+        def busy(request_id, overloaded, as_json):
+            self.log(f"{client_addr} - {str(overloaded)}", "WARNING")
+            responses.put((pack_frame(FRAME_BUSY, request_id, overloaded.reply(as_json).encode('utf-8')), None))
+
+        def reply(request_id, future, as_json, received_at):
+            try:
+                frame = pack_frame(FRAME_RESULT, request_id, self.encode_result(future.result(), as_json))
+            except Exception as e:
+                error(request_id, f"이미지 분류에 실패했습니다: {str(e)}", received_at)
+            else:
+                responses.put((frame, received_at))
+            window.release()
+
+        self.log(f"{client_addr} - 프레임 프로토콜 연결")
+        idle_timeout = self._timeout(self.config.idle_timeout)
+        read_timeout = self._timeout(self.config.read_timeout)
+        waiting = "read"
+        try:
+            client_socket.settimeout(read_timeout)
+            header = prefix + recv_exact(client_socket, FRAME_HEADER_SIZE - len(prefix))
+            while len(header) == FRAME_HEADER_SIZE:
+                frame_type, flags, request_id, length = parse_frame_header(header)
+                waiting = "read"
+                client_socket.settimeout(read_timeout)
+
+                if frame_type == FRAME_ARCHIVE:
+                    # 본문 전체가 아니라 항목 단위로 크기 제한을 적용하며 읽는다
+                    if not self.serve_archive(client_socket, client_addr, request_id, flags, length,
+                                              responses, window):
+                        self.log(f"{client_addr} - 수신 데이터 크기가 예상과 다릅니다.", "ERROR")
+                        header = b''
+                        break
+                    waiting = "idle"
+                    client_socket.settimeout(idle_timeout)
+                    header = recv_exact(client_socket, FRAME_HEADER_SIZE)
+                    continue
+
+                self.check_payload_size(length)
+                buffer = self.buffer_pool.acquire(length)
+                try:
+                    started = time.perf_counter()
+                    if recv_into_exact(client_socket, buffer) != length:
+                        self.log(f"{client_addr} - 수신 데이터 크기가 예상과 다릅니다.", "ERROR")
+                        header = b''
+                        break
+                    metrics.observe_stage("receive", started)
+                    metrics.bytes_received.inc(FRAME_HEADER_SIZE + length)
+                    received_at = time.perf_counter()
+
+                    if frame_type == FRAME_HEALTH:
+                        responses.put((pack_frame(FRAME_STATUS, request_id,
+                                                  json.dumps(self.health_status()).encode('utf-8')), None))
+                    elif frame_type != FRAME_CLASSIFY:
+                        error(request_id, f"알 수 없는 프레임 종류: {frame_type}")
+                    else:
+                        # 플래그가 없으면 서버 기본 응답 형식을 따른다
+                        as_json = bool(flags & FLAG_JSON) or self.config.response_format == 'json'
+                        window.acquire()
+                        try:
+                            future = self.admit_payload(buffer, client_addr[0], bool(flags & FLAG_RAW_RGB))
+                        except Overloaded as e:
+                            window.release()
+                            busy(request_id, e, as_json)
+                        except Exception as e:
+                            window.release()
+                            self.log(f"{client_addr}- 이미지 처리/분류 실패: {str(e)}", "ERROR")
+                            error(request_id, f"이미지 분류에 실패했습니다: {str(e)}", received_at)
+                        else:
+                            future.add_done_callback(
+                                lambda future, request_id=request_id, as_json=as_json, received_at=received_at:
+                                reply(request_id, future, as_json, received_at))
+                finally:
+                    self.buffer_pool.release(buffer)
+
+                # 다음 요청을 기다리는 동안은 유휴 시간 제한 적용
+                waiting = "idle"
+                client_socket.settimeout(idle_timeout)
+                header = recv_exact(client_socket, FRAME_HEADER_SIZE)
+
+            if header:
+                self.log(f"{client_addr} - 프레임 헤더 수신 중 연결이 끊겼습니다.", "ERROR")
+
+        except (PayloadTooLarge, ProtocolError) as e:
+            self.log(f"{client_addr} - {str(e)}", "ERROR")
+            error(0, str(e))
+        except socket.timeout:
+            self.admission.timeouts[waiting].inc()
+            self.log(f"{client_addr} - {'수신' if waiting == 'read' else '유휴'} 시간 초과로 연결을 닫습니다.", "WARNING")
+        finally:
+            # 처리 중인 요청의 응답까지 보낸 뒤 송신 스레드 종료 (추론이 멈춘 경우를 대비해 시간 제한)
+            deadline = time.monotonic() + RESPONSE_DRAIN_TIMEOUT
+            for _ in range(self.config.max_pipeline):
+                if not window.acquire(timeout=max(0.0, deadline - time.monotonic())):
+                    self.log(f"{client_addr} - 처리 중인 요청의 응답을 기다리지 못하고 연결을 닫습니다.", "WARNING")
+                    break
+            responses.put(None)
+            writer.join()
+
+    def serve_archive(self, client_socket: socket.socket, client_addr: tuple, request_id: int, flags: int,
+                      length: int, responses: queue.Queue, window: threading.Semaphore) -> bool:
+        """FRAME_ARCHIVE 한 건 처리, 본문을 끝까지 받았으면 True
+
+        항목을 읽는 대로 ArchiveRequest 에 넘기고, 응답은 항목 순서대로 responses 에 쌓인다.
+        묶음 하나가 window 한 칸을 차지하며 FRAME_ARCHIVE_END 를 보낸 뒤 반납한다.
+        수락 제어는 항목마다 거치고, 거절된 항목부터는 FRAME_BUSY 로 응답한다.
+        """
+        as_json = bool(flags & FLAG_JSON) or self.config.response_format == 'json'
+        window.acquire()
+        archive = ArchiveRequest(self, request_id, client_addr[0], bool(flags & FLAG_RAW_RGB), as_json,
+                                 lambda frame, received_at: responses.put((frame, received_at)), window.release)
+        try:
+            complete = archive.read(client_socket, length)
+        except Exception as e:
+            # 연결 오류 응답(request_id 0)이 FRAME_ARCHIVE_END 보다 먼저 나가지 않도록 기다린다
+            archive.close(str(e))
+            if not archive.ended.wait(RESPONSE_DRAIN_TIMEOUT):
+                self.log(f"{client_addr} - 아카이브 요청의 남은 응답을 기다리지 못했습니다.", "WARNING")
+            raise
+        archive.close(None if complete else "수신 중 연결이 끊겼습니다.")
+        if archive.rejected is not None:
+            self.log(f"{client_addr} - 아카이브 요청 항목 일부 거절: {str(archive.rejected)}", "WARNING")
+        self.log(f"{client_addr} - 아카이브 요청 항목 {archive.received}건 수신")
+        return complete
+
+    def _frame_writer(self, client_socket: socket.socket, responses: queue.Queue) -> None:
+        """응답 프레임 송신 스레드"""
+        metrics = self.metrics
+        while True:
+            item = responses.get()
+            if item is None:
+                break
+            frame, received_at = item
+            try:
+                started = time.perf_counter()
+                client_socket.sendall(frame)
+            except OSError:
+                # 연결이 끊겨도 남은 응답은 큐에서 계속 비운다
+                continue
+            metrics.observe_stage("send", started)
+            metrics.bytes_sent.inc(len(frame))
+            if received_at is not None:
+                metrics.request_latency.observe((time.perf_counter() - received_at) * 1000.0)
+
+    # ------------------------------------------------------------------
+    # 분류
+    # ------------------------------------------------------------------
+    def preprocess_image(self, image: Image.Image) -> np.ndarray:
+        """이미지 전처리, (299, 299, 3) uint8 배열 반환 (정규화는 배칭 단계에서 수행)"""
+        return to_model_input(image)
+
+    def check_payload_size(self, size: int) -> None:
+        """선언된 요청 크기가 허용 한도를 넘으면 PayloadTooLarge 발생"""
+        if size > self.config.max_payload_bytes:
+            raise PayloadTooLarge(size, self.config.max_payload_bytes)
+
+    def decode_payload(self, data, timings: dict = None, raw: bool = False) -> np.ndarray:
+        """수신한 이미지 바이트를 디코드/전처리하여 (299, 299, 3) 배열 반환 (raw 이면 RGB 배열 그대로)"""
+        return decode_image(data, timings, raw)
+
+    def submit_payload(self, data, raw: bool = False, submit=None) -> Future:
+        """이미지 바이트 한 건의 Prediction Future 반환
+
+        캐시에 있으면 즉시 완료된 Future 를, 같은 내용이 추론 중이면 그 Future 를 공유한다.
+        그 외에는 호출한 스레드에서 디코드/전처리한 뒤 배칭 스케줄러에 넘긴다.
+        raw 이면 data 는 FLAG_RAW_RGB 배열이다. data 는 반환 후 재사용되어도 된다.
+        submit(data, raw) 를 주면 캐시에 없는 경우 그 함수로 넘긴다 (아카이브 요청의 묶음 처리).
+        """
+        submit = submit or self._submit_uncached
+        cache = self.cache
+        if cache is None:
+            return submit(data, raw)
+
+        # 같은 바이트라도 인코딩된 이미지와 RGB 배열은 다른 입력이다
+        key = content_key(data) + (b'r' if raw else b'')
+        future, leader = cache.begin(key)
+        if not leader:
+            return future
+
+        try:
+            inner = submit(data, raw)
+        except Exception as e:
+            cache.fail(key, e)
+            raise
+
+        def _done(f):
+            error = f.exception()
+            if error is not None:
+                cache.fail(key, error)
+            else:
+                cache.complete(key, f.result())
+
+        inner.add_done_callback(_done)
+        return future
+
+    def admit_payload(self, data, client_ip, raw: bool = False) -> Future:
+        """수락 제어를 거쳐 submit_payload, 거절되면 Overloaded 발생 (완료 시 자동으로 release)"""
+        self.admission.admit(client_ip)
+        self.metrics.requests.inc()
+        try:
+            future = self.submit_payload(data, raw)
+        except Exception:
+            self.admission.release()
+            raise
+        future.add_done_callback(self.admission.release)
+        return future
+
+    def _submit_uncached(self, data, raw: bool = False) -> Future:
+        # 워커 프로세스 모드에서는 디코드도 워커에서 수행한다
+        if self.worker_pool is not None:
+            future = self.worker_pool.submit(data, raw)
+        else:
+            timings = {}
+            future = self.batcher.submit(self.decode_payload(data, timings, raw), timings)
+        future.add_done_callback(self._observe_prediction)
+        return future
+
+    def _observe_prediction(self, future: Future) -> None:
+        # 실제로 추론한 요청의 디코드/전처리/큐 대기/추론 시간 기록
+        if future.exception() is None:
+            self.metrics.observe_timings(future.result().timings)
+
+    def classify_image(self, image: Image.Image) -> Prediction:
+        """이미지 분류 (배칭 스케줄러를 거쳐 한 장의 Prediction 반환)"""
+        preprocessed_image = self.preprocess_image(image)
+        return self.batcher.submit(preprocessed_image).result()
+
+    def infer_batch(self, batch: np.ndarray) -> np.ndarray:
+        """(N, 299, 299, 3) 배치 추론, 추론 워커 스레드에서만 호출된다"""
+        return self.backend.infer_batch(batch)
+
+    def format_result(self, prediction: Prediction, as_json: bool = False) -> str:
+        """Prediction 을 클라이언트 응답으로 변환 (기본은 1순위 문장, as_json 이면 상위 k개 JSON)"""
+        if as_json:
+            return to_json(prediction, self.labels)
+        return self.labels.text(int(prediction.top_indices[0]))
+
+    def encode_result(self, prediction: Prediction, as_json: bool = False) -> bytes:
+        """format_result 의 UTF-8 바이트 (텍스트 응답은 미리 인코딩된 문장을 그대로 사용)"""
+        if as_json:
+            return to_json(prediction, self.labels).encode('utf-8')
+        return self.labels.encoded_text(int(prediction.top_indices[0]))
+
+    def output_dim(self):
+        """모델 출력 벡터 길이 (클래스 수), 백엔드에서 알 수 없으면 None"""
+        return self.backend.output_dim()
+
+    def get_flower_names_by_index(self, index: int):
+        """예측된 index에 따른 꽃 이름 반환"""
+        return self.labels[index]
@@ -0,0 +1,288 @@
+import argparse
+import json
+import math
+import multiprocessing as mp
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+from backends import SavedModelBackend, TFLiteBackend, XLABackend, bucket_sizes
+from config import MODEL_DIR
+from preprocess import MODEL_INPUT_SHAPE, decode_image, normalize_into
+
+# 변환 종류
+#   dynamic: 가중치만 int8 로 양자화 (보정 데이터 불필요)
+#   int8: 가중치와 활성값을 int8 로 양자화 (보정 이미지 필요, 입출력은 float32 로 유지)
+#   xla: 파일로 내보내지 않고 서버 시작 시 jit_compile 하므로 보고서에만 포함
+VARIANTS = ('dynamic', 'int8', 'xla')
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+
+def list_images(directory: str, limit: int) -> list:
+    """디렉토리(하위 포함)의 이미지 경로를 이름순으로 최대 limit 개"""
+    paths = []
+    for root, dirnames, filenames in os.walk(directory):
+        dirnames.sort()
+        paths.extend(os.path.join(root, name) for name in sorted(filenames)
+                     if name.lower().endswith(IMAGE_EXTENSIONS))
+    return paths[:limit] if limit > 0 else paths
+
+
+def load_inputs(paths, count: int = 0, seed: int = 0) -> np.ndarray:
+    """서버와 같은 전처리를 거친 (N, 299, 299, 3) float32 입력, 경로가 없으면 무작위 이미지 count 개"""
+    if paths:
+        images = []
+        for path in paths:
+            try:
+                with open(path, 'rb') as f:
+                    images.append(decode_image(f.read()))
+            except OSError as e:
+                print(f"건너뜀 {path}: {e}", file=sys.stderr)
+    else:
+        rng = np.random.default_rng(seed)
+        images = [rng.integers(0, 256, MODEL_INPUT_SHAPE, dtype=np.uint8) for _ in range(count)]
+    out = np.empty((len(images),) + MODEL_INPUT_SHAPE, dtype=np.float32)
+    return normalize_into(out, images)
+
+
+def convert_tflite(model_dir: str, variant: str, calibration: np.ndarray = None) -> bytes:
+    """SavedModel 을 TFLite 로 변환 (dynamic-range 또는 int8 post-training 양자화)"""
+    import tensorflow as tf
+    converter = tf.lite.TFLiteConverter.from_saved_model(model_dir, signature_keys=['serving_default'])
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if variant == 'int8':
+        if calibration is None or len(calibration) == 0:
+            raise ValueError("int8 양자화에는 --calibration-dir 보정 이미지가 필요합니다.")
+
+        def representative_dataset():
+            for image in calibration:
+                yield [image[np.newaxis]]
+
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    return converter.convert()
+
+
+def rss_mb() -> float:
+    """현재 프로세스 상주 메모리(MB), /proc 가 없으면 최대 상주 메모리"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 는 bytes, Linux 는 KB
+    return peak / (1024.0 * 1024.0) if sys.platform == 'darwin' else peak / 1024.0
+
+
+def _percentile(sorted_values: list, q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, max(0, math.ceil(q * len(sorted_values)) - 1))]
+
+
+def make_backend(spec: dict):
+    if spec["kind"] == 'tflite':
+        return TFLiteBackend(spec["path"], spec["sizes"], spec.get("threads", 0))
+    if spec["kind"] == 'xla':
+        return XLABackend(spec["path"], spec["sizes"])
+    return SavedModelBackend(spec["path"])
+
+
+def evaluate(spec: dict, inputs: np.ndarray, iterations: int) -> dict:
+    """백엔드 하나의 로드 시간/메모리/배치 크기별 지연 시간과 처리량, 전체 입력의 출력 측정
+
+    백엔드마다 별도 프로세스에서 실행해 메모리 사용량이 서로 섞이지 않게 한다.
+    """
+    before = rss_mb()
+    started = time.perf_counter()
+    backend = make_backend(spec)
+    backend.load()
+    load_s = time.perf_counter() - started
+
+    # 배치 크기별 첫 실행(그래프 추적, XLA 컴파일)은 측정에서 뺀다
+    started = time.perf_counter()
+    for size in spec["sizes"]:
+        backend.infer_batch(np.resize(inputs, (size,) + MODEL_INPUT_SHAPE))
+    warmup_s = time.perf_counter() - started
+
+    largest = spec["sizes"][-1]
+    outputs = np.concatenate([backend.infer_batch(inputs[i:i + largest]) for i in range(0, len(inputs), largest)])
+
+    latency, throughput = {}, {}
+    for size in spec["sizes"]:
+        batch = np.resize(inputs, (size,) + MODEL_INPUT_SHAPE)
+        samples = []
+        for _ in range(iterations):
+            t = time.perf_counter()
+            backend.infer_batch(batch)
+            samples.append((time.perf_counter() - t) * 1000.0)
+        samples.sort()
+        mean = sum(samples) / len(samples)
+        latency[str(size)] = {"mean": round(mean, 3), "p50": round(_percentile(samples, 0.50), 3),
+                              "p95": round(_percentile(samples, 0.95), 3)}
+        throughput[str(size)] = round(size * 1000.0 / mean, 2) if mean > 0 else 0.0
+
+    return {
+        "load_s": round(load_s, 3),
+        "warmup_s": round(warmup_s, 3),
+        "rss_mb": round(rss_mb() - before, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "latency_ms": latency,
+        "images_per_s": throughput,
+        "outputs": outputs,
+    }
+
+
+def evaluate_isolated(spec: dict, inputs: np.ndarray, iterations: int) -> dict:
+    with mp.get_context('spawn').Pool(1) as pool:
+        return pool.apply(evaluate, (spec, inputs, iterations))
+
+
+def path_size_mb(path: str) -> float:
+    if os.path.isfile(path):
+        return os.path.getsize(path) / 1e6
+    total = 0
+    for root, _, filenames in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in filenames)
+    return total / 1e6
+
+
+def agreement(outputs: np.ndarray, baseline: np.ndarray) -> dict:
+    """기준 모델 대비 1순위 일치율과 확률 차이"""
+    top1 = outputs.argmax(axis=1)
+    base_top1 = baseline.argmax(axis=1)
+    diff = np.abs(outputs.astype(np.float32) - baseline.astype(np.float32))
+    return {
+        "top1_agreement": round(float(np.mean(top1 == base_top1)), 4),
+        "mean_abs_diff": round(float(diff.mean()), 6),
+        "max_abs_diff": round(float(diff.max()), 6),
+    }
+
+
+def server_hint(specs: dict) -> str:
+    """실제로 만든 변환 결과로 서버 실행 예 문장, 쓸 만한 결과가 없으면 빈 문자열 (int8 > dynamic > xla 순)"""
+    for name in ("tflite_int8", "tflite_dynamic"):
+        if name in specs:
+            return f"서버 실행 예: python server.py --backend tflite --tflite-path {specs[name]['path']}"
+    if "xla" in specs:
+        return f"서버 실행 예: python server.py --backend xla --model-dir {specs['xla']['path']}"
+    return ""
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="SavedModel 을 CPU 용 TFLite(양자화)/XLA 로 변환하고 원본과 비교")
+    parser.add_argument('--model-dir', default=MODEL_DIR, help=f"원본 SavedModel 디렉토리 (기본값: {MODEL_DIR})")
+    parser.add_argument('--output-dir', default='./model_export', help="변환 결과/보고서 디렉토리 (기본값: ./model_export)")
+    parser.add_argument('--variants', default='dynamic,int8',
+                        help=f"만들 변환 종류, 쉼표 구분 {VARIANTS} (기본값: dynamic,int8)")
+    parser.add_argument('--calibration-dir', help="int8 양자화 보정용 이미지 디렉토리")
+    parser.add_argument('--calibration-count', type=int, default=200, help="보정에 사용할 최대 이미지 수 (기본값: 200)")
+    parser.add_argument('--eval-dir', help="비교 평가용 이미지 디렉토리 (기본값: 보정 디렉토리)")
+    parser.add_argument('--eval-count', type=int, default=200, help="평가에 사용할 최대 이미지 수 (기본값: 200)")
+    parser.add_argument('--batch-sizes', default='1,16', help="지연 시간/처리량을 잴 배치 크기 (기본값: 1,16)")
+    parser.add_argument('--iterations', type=int, default=20, help="배치 크기별 측정 반복 횟수 (기본값: 20)")
+    parser.add_argument('--threads', type=int, default=0, help="TFLite 추론 스레드 수, 0이면 기본값")
+    parser.add_argument('--skip-report', action='store_true', help="변환만 하고 비교 평가는 생략")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    variants = [v.strip() for v in args.variants.split(',') if v.strip()]
+    unknown = [v for v in variants if v not in VARIANTS]
+    if unknown:
+        raise SystemExit(f"알 수 없는 변환 종류: {unknown}")
+    sizes = [int(s) for s in args.batch_sizes.split(',') if s.strip()]
+    sizes = bucket_sizes(sizes, max(sizes))
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    calibration_paths = list_images(args.calibration_dir, args.calibration_count) if args.calibration_dir else []
+    calibration = load_inputs(calibration_paths) if calibration_paths else None
+    if calibration is not None and len(calibration) == 0:
+        raise SystemExit(f"보정 이미지를 하나도 읽지 못했습니다: {args.calibration_dir}")
+
+    specs = {"savedmodel": {"kind": 'savedmodel', "path": args.model_dir, "sizes": sizes}}
+    failed = []
+    for variant in variants:
+        if variant == 'xla':
+            specs["xla"] = {"kind": 'xla', "path": args.model_dir, "sizes": sizes}
+            continue
+        started = time.perf_counter()
+        try:
+            model = convert_tflite(args.model_dir, variant, calibration)
+        except Exception as e:
+            failed.append(variant)
+            print(f"{variant}: 변환 실패 - {e}", file=sys.stderr)
+            continue
+        path = os.path.join(args.output_dir, f"model_{variant}.tflite")
+        with open(path, 'wb') as f:
+            f.write(model)
+        print(f"{variant}: {path} ({len(model) / 1e6:.1f} MB, {time.perf_counter() - started:.1f}s)", file=sys.stderr)
+        specs[f"tflite_{variant}"] = {"kind": 'tflite', "path": path, "sizes": sizes, "threads": args.threads}
+
+    hint = server_hint(specs)
+    if args.skip_report:
+        if hint:
+            print(hint, file=sys.stderr)
+        return 1 if failed else 0
+
+    eval_dir = args.eval_dir or args.calibration_dir
+    eval_paths = list_images(eval_dir, args.eval_count) if eval_dir else []
+    if not eval_paths:
+        print("평가 이미지가 없어 무작위 이미지로 비교합니다. (1순위 일치율은 참고용)", file=sys.stderr)
+    inputs = load_inputs(eval_paths, count=max(sizes), seed=0)
+    if len(inputs) == 0:
+        raise SystemExit(f"평가 이미지를 하나도 읽지 못했습니다: {eval_dir}")
+
+    results = {}
+    baseline = None
+    for name, spec in specs.items():
+        print(f"{name} 평가 중...", file=sys.stderr)
+        result = evaluate_isolated(spec, inputs, args.iterations)
+        outputs = result.pop("outputs")
+        if baseline is None:
+            baseline = outputs
+        result.update(agreement(outputs, baseline))
+        result["model_mb"] = round(path_size_mb(spec["path"]), 2)
+        result["path"] = spec["path"]
+        results[name] = result
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "model_dir": os.path.abspath(args.model_dir),
+        "eval_images": len(inputs) if eval_paths else f"random x{len(inputs)}",
+        "calibration_images": len(calibration) if calibration is not None else 0,
+        "batch_sizes": sizes,
+        "variants": results,
+    }
+    report_path = os.path.join(args.output_dir, "report.json")
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    largest = str(sizes[-1])
+    print(f"{'variant':16s} {'MB':>8s} {'RSS MB':>8s} {'p50@' + str(sizes[0]) + ' ms':>10s} {'img/s@' + largest:>12s} {'top1 일치':>10s}",
+          file=sys.stderr)
+    for name, result in results.items():
+        print(f"{name:16s} {result['model_mb']:8.1f} {result['rss_mb']:8.1f} "
+              f"{result['latency_ms'][str(sizes[0])]['p50']:10.2f} {result['images_per_s'][largest]:12.1f} "
+              f"{result['top1_agreement'] * 100:9.1f}%", file=sys.stderr)
+    print(f"보고서: {report_path}", file=sys.stderr)
+    if hint:
+        print(hint, file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,610 @@
+import argparse
+import itertools
+import json
+import logging
+import signal
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from admission import Overloaded
+from connections import ConnectionRegistry
+from metrics import STAGE_BUCKETS_MS, Histogram, MetricsRegistry
+from protocol import (
+    DEFAULT_MAX_PAYLOAD_BYTES, FLAG_JSON, FRAME_ARCHIVE, FRAME_BUSY, FRAME_CLASSIFY, FRAME_ERROR, FRAME_HEADER, FRAME_HEADER_SIZE,
+    FRAME_HEALTH, FRAME_MAGIC, FRAME_STATUS, HEADER_SIZE, PROTOCOL_VERSION,
+    PayloadTooLarge, ProtocolError,
+    is_frame_header, pack_frame, parse_frame_header, recv_exact,
+)
+from status_http import StatusHTTPServer, json_response
+
+# 여러 서버 복제본 앞에서 분류 요청을 나눠 주는 게이트웨이
+#
+# 클라이언트와는 서버와 같은 프로토콜(legacy 8byte 길이 + 데이터, 프레임 프로토콜)로 통신하고,
+# 백엔드와는 복제본마다 미리 열어 둔 프레임 프로토콜 연결에 요청 ID 로 여러 요청을 실어 보낸다.
+# 한 머신에서는 포트를 달리해 복제본을 여러 개 띄워 시험할 수 있다.
+#
+#   python server.py --headless --port 9001 &
+#   python server.py --headless --port 9002 &
+#   python gateway.py --port 8080 --backends 127.0.0.1:9001,127.0.0.1:9002
+
+logger = logging.getLogger("flower.gateway")
+
+# 백엔드로 보내는 요청 ID 범위 (0 은 특정 요청과 무관한 오류 응답에 쓰이므로 제외)
+MAX_REQUEST_ID = 0xFFFFFFFF
+
+# 클라이언트 연결 종료 시 전달 중인 요청의 응답을 기다리는 최대 시간(초)
+RESPONSE_DRAIN_TIMEOUT = 30.0
+
+
+class BackendUnavailable(Exception):
+    """요청을 보낼 정상 백엔드가 없거나 백엔드 연결이 끊긴 경우"""
+
+
+class ConnectFailed(BackendUnavailable):
+    """백엔드에 새로 연결하지 못한 경우 (상태 확인을 기다리지 않고 바로 제외한다)"""
+
+
+def parse_address(spec: str, default_host: str = '127.0.0.1') -> tuple:
+    """'host:port' 또는 ':port' / 'port' -> (host, port)"""
+    host, _, port = spec.strip().rpartition(':')
+    return host or default_host, int(port)
+
+
+class BackendConnection:
+    """백엔드와의 지속 프레임 연결 하나
+
+    요청마다 요청 ID 를 붙여 보내고, 읽기 스레드가 응답의 요청 ID 로 Future 를 찾아 완료한다.
+    연결이 끊기면 응답을 기다리던 요청은 모두 BackendUnavailable 로 실패한다.
+
+    백엔드가 읽지 못한 요청(크기 초과 등)은 요청 ID 0 의 오류 프레임을 보내고, 앞서 받은 요청의
+    응답을 마저 보낸 뒤 연결을 닫는다. 이때는 새 요청을 싣지 않고 남은 응답을 끝까지 받으며,
+    응답을 받지 못한 가장 먼저 보낸 요청만 그 오류로 응답한다.
+    """
+
+    def __init__(self, address: tuple, connect_timeout: float):
+        self.address = address
+        try:
+            self._sock = socket.create_connection(address, timeout=connect_timeout)
+        except OSError as e:
+            raise ConnectFailed(f"{address[0]}:{address[1]} 연결 실패: {e}") from e
+        self._sock.settimeout(None)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._send_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._pending = {}      # request_id -> Future, 보낸 순서
+        self._ids = itertools.count()
+        self.closed = False
+        self.draining = False   # 연결 단위 오류를 받아 백엔드가 닫기를 기다리는 중
+        self._reader = threading.Thread(target=self._read_loop, name=f"backend-{address[1]}", daemon=True)
+        self._reader.start()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    @property
+    def usable(self) -> bool:
+        return not (self.closed or self.draining)
+
+    def request(self, frame_type: int, payload=b'', flags: int = 0) -> Future:
+        """프레임 전송, (응답 프레임 종류, 본문) 을 결과로 갖는 Future 반환"""
+        future = Future()
+        try:
+            # 요청 ID 등록도 전송 잠금 안에서 해야 _pending 순서가 백엔드가 받는 순서와 같다
+            with self._send_lock:
+                with self._lock:
+                    if not self.usable:
+                        raise BackendUnavailable(f"{self.address[0]}:{self.address[1]} 연결이 닫혔습니다.")
+                    request_id = next(self._ids) % MAX_REQUEST_ID + 1
+                    self._pending[request_id] = future
+                header = FRAME_HEADER.pack(FRAME_MAGIC, PROTOCOL_VERSION, frame_type, flags, 0, request_id,
+                                           len(payload))
+                # 큰 이미지를 헤더와 합치며 복사하지 않도록 따로 보낸다
+                self._sock.sendall(header)
+                if payload:
+                    self._sock.sendall(payload)
+        except OSError as e:
+            self.close(e)
+        return future
+
+    def cancel(self, future: Future) -> None:
+        """응답을 더 기다리지 않는 요청을 처리 중 목록에서 뺌 (늦게 온 응답은 버린다)"""
+        with self._lock:
+            for request_id, pending in self._pending.items():
+                if pending is future:
+                    del self._pending[request_id]
+                    break
+        future.cancel()
+
+    def _read_loop(self) -> None:
+        error = "연결 종료"
+        rejected = None
+        try:
+            while True:
+                header = recv_exact(self._sock, FRAME_HEADER_SIZE)
+                if len(header) < FRAME_HEADER_SIZE:
+                    break
+                frame_type, _, request_id, length = parse_frame_header(header)
+                body = recv_exact(self._sock, length)
+                if len(body) < length:
+                    break
+                with self._lock:
+                    future = self._pending.pop(request_id, None)
+                if future is not None:
+                    future.set_result((frame_type, body))
+                elif request_id == 0 and rejected is None:
+                    # 백엔드가 요청 하나를 읽지 못해 연결을 닫는 중, 남은 응답은 계속 받는다
+                    with self._lock:
+                        self.draining = True
+                    rejected = (frame_type, body)
+                    error = body.decode('utf-8', 'replace')
+        except (OSError, ProtocolError) as e:
+            error = e
+        self.close(error, rejected)
+
+    def close(self, error=None, rejected: tuple = None) -> None:
+        """연결 닫기, rejected 가 있으면 응답을 받지 못한 첫 요청의 응답으로 쓰고 나머지는 실패 처리"""
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            pending, self._pending = self._pending, {}
+        if rejected is not None and pending:
+            pending.pop(next(iter(pending))).set_result(rejected)
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+        for future in pending.values():
+            future.set_exception(BackendUnavailable(f"{self.address[0]}:{self.address[1]} 연결 끊김: {error}"))
+
+
+class Backend:
+    """백엔드 복제본 하나: 연결 풀, 처리 중 요청 수, 상태 확인 결과"""
+
+    def __init__(self, address: tuple, pool_size: int, connect_timeout: float, registry: MetricsRegistry):
+        self.address = address
+        self.name = f"{address[0]}:{address[1]}"
+        self.pool_size = max(1, pool_size)
+        self.connect_timeout = connect_timeout
+        self._connections = []
+        self._connecting = 0    # 잠금 밖에서 연결 중인 수
+        self._lock = threading.Lock()
+
+        self.outstanding = 0    # 게이트웨이가 보내고 응답을 기다리는 요청 수 (Gateway 잠금으로 보호)
+        self.healthy = False    # 상태 확인에 성공해야 요청을 받는다
+        self.was_healthy = False
+        self.successes = 0      # 연속 성공/실패 횟수
+        self.failures = 0
+        self.last_status = {}
+
+        self.requests = registry.counter("flower_gateway_requests_total", "백엔드로 보낸 분류 요청 수", backend=self.name)
+        self.errors = registry.counter("flower_gateway_backend_errors_total", "연결 끊김/시간 초과로 실패한 요청 수",
+                                       backend=self.name)
+        registry.register_callback("flower_gateway_outstanding", "백엔드별 처리 중 요청 수",
+                                   lambda: self.outstanding, backend=self.name)
+        registry.register_callback("flower_gateway_backend_up", "백엔드 투입 여부 (1: 정상)",
+                                   lambda: int(self.healthy), backend=self.name)
+
+    def connection(self) -> BackendConnection:
+        """처리 중 요청이 없는 연결 (없으면 풀 크기까지 새로 연결, 가득 차면 가장 한가한 연결)"""
+        with self._lock:
+            self._connections = [c for c in self._connections if c.usable]
+            idle = next((c for c in self._connections if c.in_flight == 0), None)
+            if idle is not None:
+                return idle
+            if self._connections and len(self._connections) + self._connecting >= self.pool_size:
+                return min(self._connections, key=lambda c: c.in_flight)
+            self._connecting += 1
+
+        # 응답이 없는 백엔드에 연결하는 동안 다른 요청이 기존 연결을 쓸 수 있도록 잠금 밖에서 연결한다
+        try:
+            connection = BackendConnection(self.address, self.connect_timeout)
+        finally:
+            with self._lock:
+                self._connecting -= 1
+        with self._lock:
+            self._connections.append(connection)
+        return connection
+
+    def close(self, error=None) -> None:
+        """풀의 모든 연결 닫기 (응답을 기다리던 요청은 실패 처리되어 다른 백엔드로 재시도된다)"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close(error)
+
+    def describe(self) -> dict:
+        return {
+            "address": self.name,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "connections": len(self._connections),
+            "pending": self.last_status.get("pending"),
+            "estimated_wait_ms": self.last_status.get("estimated_wait_ms"),
+        }
+
+
+class Gateway:
+    """length-prefixed 프로토콜을 그대로 받아 여러 백엔드 복제본으로 나눠 보내는 게이트웨이
+
+    요청은 정상 백엔드 중 처리 중 요청(outstanding)이 가장 적은 곳으로 보낸다.
+    백엔드 연결이 끊기거나 혼잡 응답(FRAME_BUSY)을 받으면 다른 백엔드로 retries 번까지 다시 보낸다.
+    백엔드마다 health_interval 초마다 FRAME_HEALTH 를 보내, fall 번 연속 실패하면 제외하고
+    rise 번 연속 성공하면 다시 투입한다 (처음에는 한 번 성공하면 투입). 요청 처리 중에는 새 연결이
+    실패한 경우에만 바로 제외하고, 연결이 끊긴 경우의 판단은 상태 확인에 맡긴다.
+    """
+
+    def __init__(self, args):
+        self.args = args
+        self.registry = MetricsRegistry()
+        self.backends = [Backend(parse_address(spec), args.pool_size, args.connect_timeout, self.registry)
+                         for spec in args.backends.split(',') if spec.strip()]
+        if not self.backends:
+            raise ValueError("--backends 에 백엔드 주소를 하나 이상 지정해야 합니다.")
+
+        self._lock = threading.Lock()
+        self._turn = itertools.count()
+        self.clients = ConnectionRegistry()     # (ip, port) -> 클라이언트 소켓
+        self.executor = ThreadPoolExecutor(max_workers=args.forward_threads, thread_name_prefix="forward")
+        self.server_socket = None
+        self.status_server = None
+        self._stop_event = threading.Event()
+
+        self.retries = self.registry.counter("flower_gateway_retries_total", "다른 백엔드로 다시 보낸 요청 수")
+        self.unavailable = self.registry.counter("flower_gateway_unavailable_total",
+                                                 "정상 백엔드가 없어 거절한 요청 수")
+        self.latency = self.registry.histogram("flower_gateway_latency_ms",
+                                               "백엔드 전달부터 응답 수신까지 시간(ms)", STAGE_BUCKETS_MS)
+
+    # ------------------------------------------------------------------
+    # 라우팅
+    # ------------------------------------------------------------------
+    def choose(self, exclude=()) -> Backend:
+        """정상 백엔드 중 처리 중 요청이 가장 적은 백엔드 (같으면 돌아가며 선택)"""
+        with self._lock:
+            candidates = [b for b in self.backends if b.healthy and b not in exclude]
+            if not candidates:
+                raise BackendUnavailable("요청을 처리할 수 있는 백엔드가 없습니다.")
+            start = next(self._turn) % len(candidates)
+            backend = min(candidates[start:] + candidates[:start], key=lambda b: b.outstanding)
+            # 선택과 증가를 함께 해야 동시에 들어온 요청이 한 백엔드로 몰리지 않는다
+            backend.outstanding += 1
+            return backend
+
+    def _done(self, backend: Backend) -> None:
+        with self._lock:
+            backend.outstanding -= 1
+
+    def forward(self, payload, flags: int) -> tuple:
+        """분류 요청을 백엔드로 전달, (응답 프레임 종류, 본문) 반환"""
+        tried = []
+        busy = None
+        error = None
+        for attempt in range(self.args.retries + 1):
+            if attempt > 0:
+                self.retries.inc()
+            try:
+                backend = self.choose(tried)
+            except BackendUnavailable as e:
+                error = error or e
+                break
+            tried.append(backend)
+            started = time.perf_counter()
+            try:
+                connection = backend.connection()
+                future = connection.request(FRAME_CLASSIFY, payload, flags)
+                frame_type, body = future.result(self.args.request_timeout)
+            except BackendUnavailable as e:
+                backend.errors.inc()
+                if isinstance(e, ConnectFailed):
+                    self.mark_down(backend, str(e))
+                error = e
+                continue
+            except FutureTimeout:
+                # 응답이 끝내 오지 않아도 처리 중 요청 수(in_flight)에 남지 않도록 뺀다
+                connection.cancel(future)
+                backend.errors.inc()
+                return FRAME_ERROR, f"백엔드 {backend.name} 응답 시간 초과".encode('utf-8')
+            finally:
+                self._done(backend)
+            backend.requests.inc()
+            self.latency.observe((time.perf_counter() - started) * 1000.0)
+            if frame_type == FRAME_BUSY:
+                busy = (frame_type, body)
+                continue
+            return frame_type, body
+
+        if busy is not None:
+            return busy
+        self.unavailable.inc()
+        raise error
+
+    def unavailable_reply(self, as_json: bool) -> bytes:
+        """정상 백엔드가 없을 때의 혼잡 응답 (서버의 과부하 응답과 같은 형식)"""
+        return Overloaded("no_backend", self.args.health_interval).reply(as_json).encode('utf-8')
+
+    # ------------------------------------------------------------------
+    # 상태 확인
+    # ------------------------------------------------------------------
+    def check(self, backend: Backend) -> bool:
+        """FRAME_HEALTH 로 백엔드가 요청을 받을 수 있는지 확인"""
+        try:
+            frame_type, body = backend.connection().request(FRAME_HEALTH).result(self.args.health_timeout)
+            if frame_type != FRAME_STATUS:
+                return False
+            backend.last_status = json.loads(body)
+            return bool(backend.last_status.get("ready"))
+        except (BackendUnavailable, FutureTimeout, ValueError):
+            return False
+
+    def mark_down(self, backend: Backend, reason: str) -> None:
+        with self._lock:
+            was_healthy = backend.healthy
+            backend.healthy = False
+            backend.successes = 0
+        if was_healthy:
+            logger.warning(f"백엔드 제외: {backend.name} ({reason})")
+        backend.close(reason)
+
+    def _record_health(self, backend: Backend, ok: bool) -> None:
+        if not ok:
+            backend.successes = 0
+            backend.failures += 1
+            if backend.healthy and backend.failures >= self.args.fall:
+                self.mark_down(backend, f"상태 확인 {backend.failures}회 연속 실패")
+            return
+        backend.failures = 0
+        backend.successes += 1
+        if not backend.healthy and backend.successes >= (self.args.rise if backend.was_healthy else 1):
+            with self._lock:
+                backend.healthy = True
+                backend.was_healthy = True
+            logger.info(f"백엔드 투입: {backend.name}")
+
+    def _health_loop(self, backend: Backend) -> None:
+        while not self._stop_event.is_set():
+            self._record_health(backend, self.check(backend))
+            self._stop_event.wait(self.args.health_interval)
+
+    def status(self) -> dict:
+        """게이트웨이 상태 (FRAME_HEALTH, /healthz, /readyz 공통)"""
+        backends = [b.describe() for b in self.backends]
+        ready = any(b["healthy"] for b in backends)
+        return {"status": "ready" if ready else "no_backend", "ready": ready, "backends": backends}
+
+    # ------------------------------------------------------------------
+    # 클라이언트 연결
+    # ------------------------------------------------------------------
+    def check_payload_size(self, size: int) -> None:
+        if size > self.args.max_payload_bytes:
+            raise PayloadTooLarge(size, self.args.max_payload_bytes)
+
+    @staticmethod
+    def _timeout(seconds: float):
+        return seconds if seconds > 0 else None
+
+    def listen_for_clients(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                client_socket, client_addr = self.server_socket.accept()
+            except socket.timeout:
+                continue
+            except OSError as e:
+                if not self._stop_event.is_set():
+                    logger.error(f"클라이언트 연결 대기중 오류: {e}")
+                continue
+            if not self.clients.add(client_addr, client_socket, self.args.max_connections):
+                try:
+                    client_socket.settimeout(1)
+                    client_socket.sendall(Overloaded("connections", 1.0).reply().encode('utf-8'))
+                except OSError:
+                    pass
+                client_socket.close()
+                continue
+            threading.Thread(target=self.handle_client, args=(client_socket, client_addr), daemon=True).start()
+
+    def handle_client(self, client_socket: socket.socket, client_addr: tuple) -> None:
+        """클라이언트 연결 처리 (legacy 요청 1건 또는 프레임 프로토콜 연결)"""
+        client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            client_socket.settimeout(self._timeout(self.args.idle_timeout))
+            header = recv_exact(client_socket, HEADER_SIZE)
+            if len(header) < HEADER_SIZE:
+                return
+            if is_frame_header(header):
+                self.serve_frames(client_socket, client_addr, header)
+                return
+
+            size = int.from_bytes(header, 'big')
+            try:
+                self.check_payload_size(size)
+            except PayloadTooLarge as e:
+                client_socket.sendall(f"이미지가 너무 큽니다: {str(e)}".encode('utf-8'))
+                return
+            client_socket.settimeout(self._timeout(self.args.read_timeout))
+            payload = recv_exact(client_socket, size)
+            if len(payload) != size:
+                return
+            try:
+                _, body = self.forward(payload, 0)
+            except BackendUnavailable:
+                body = self.unavailable_reply(False)
+            client_socket.sendall(body)
+        except OSError as e:
+            logger.debug(f"{client_addr} - {e}")
+        finally:
+            try:
+                client_socket.close()
+            except OSError:
+                pass
+            self.clients.pop(client_addr)
+
+    def serve_frames(self, client_socket: socket.socket, client_addr: tuple, prefix: bytes) -> None:
+        """프레임 프로토콜 연결 처리, 요청마다 전달 스레드에서 백엔드 응답을 기다려 끝나는 순서대로 응답"""
+        write_lock = threading.Lock()
+        window = threading.Semaphore(self.args.max_pipeline)
+
+        def send(frame):
+            with write_lock:
+                try:
+                    client_socket.sendall(frame)
+                except OSError:
+                    pass
+
+        def relay(request_id, payload, flags):
+            try:
+                frame_type, body = self.forward(payload, flags)
+            except BackendUnavailable:
+                frame_type, body = FRAME_BUSY, self.unavailable_reply(bool(flags & FLAG_JSON))
+            except Exception as e:
+                logger.exception(f"{client_addr} - 요청 전달 실패")
+                frame_type, body = FRAME_ERROR, f"요청 전달에 실패했습니다: {str(e)}".encode('utf-8')
+            try:
+                send(pack_frame(frame_type, request_id, body))
+            finally:
+                window.release()
+
+        try:
+            header = prefix + recv_exact(client_socket, FRAME_HEADER_SIZE - len(prefix))
+            while len(header) == FRAME_HEADER_SIZE:
+                frame_type, flags, request_id, length = parse_frame_header(header)
+                if frame_type == FRAME_ARCHIVE:
+                    raise ProtocolError("아카이브 요청은 게이트웨이를 거치지 않고 서버에 직접 보내야 합니다.")
+                self.check_payload_size(length)
+                client_socket.settimeout(self._timeout(self.args.read_timeout))
+                payload = recv_exact(client_socket, length)
+                if len(payload) != length:
+                    break
+
+                if frame_type == FRAME_HEALTH:
+                    send(pack_frame(FRAME_STATUS, request_id, json.dumps(self.status()).encode('utf-8')))
+                elif frame_type != FRAME_CLASSIFY:
+                    send(pack_frame(FRAME_ERROR, request_id, f"알 수 없는 프레임 종류: {frame_type}".encode('utf-8')))
+                else:
+                    window.acquire()
+                    self.executor.submit(relay, request_id, payload, flags)
+
+                client_socket.settimeout(self._timeout(self.args.idle_timeout))
+                header = recv_exact(client_socket, FRAME_HEADER_SIZE)
+        except (PayloadTooLarge, ProtocolError) as e:
+            send(pack_frame(FRAME_ERROR, 0, str(e).encode('utf-8')))
+        finally:
+            # 전달 중인 요청의 응답을 보낸 뒤 연결을 닫는다 (백엔드가 멈춘 경우를 대비해 시간 제한)
+            deadline = time.monotonic() + RESPONSE_DRAIN_TIMEOUT
+            for _ in range(self.args.max_pipeline):
+                if not window.acquire(timeout=max(0.0, deadline - time.monotonic())):
+                    logger.warning(f"{client_addr} - 전달 중인 요청의 응답을 기다리지 못하고 연결을 닫습니다.")
+                    break
+
+    # ------------------------------------------------------------------
+    # 수명 주기
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        for backend in self.backends:
+            threading.Thread(target=self._health_loop, args=(backend,), name=f"health-{backend.name}",
+                             daemon=True).start()
+
+        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server_socket.bind((self.args.host, self.args.port))
+        self.server_socket.listen(socket.SOMAXCONN)
+        self.server_socket.settimeout(1)
+        threading.Thread(target=self.listen_for_clients, name="accept", daemon=True).start()
+
+        if self.args.health_port > 0:
+            self.status_server = StatusHTTPServer(self.args.host, self.args.health_port)
+            self.status_server.add_route("/healthz", lambda: json_response(self.status()))
+            self.status_server.add_route("/readyz",
+                                         lambda: json_response(self.status(), 200 if self.status()["ready"] else 503))
+            self.status_server.add_route(
+                "/metrics", lambda: (200, 'text/plain; version=0.0.4; charset=utf-8',
+                                     self.registry.render_prometheus().encode('utf-8')))
+            self.status_server.start()
+        logger.info(f"게이트웨이가 {self.args.host}:{self.args.port}에서 시작되었습니다. "
+                    f"백엔드: {', '.join(b.name for b in self.backends)}")
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self.server_socket is not None:
+            self.server_socket.close()
+            self.server_socket = None
+        for client_socket in self.clients.clear():
+            try:
+                client_socket.close()
+            except OSError:
+                pass
+        self.executor.shutdown(wait=False)
+        for backend in self.backends:
+            backend.close("게이트웨이 종료")
+        if self.status_server is not None:
+            self.status_server.stop()
+            self.status_server = None
+        logger.info("게이트웨이가 중지되었습니다.")
+
+    def summary(self) -> str:
+        parts = [f"{b.name}[{'up' if b.healthy else 'down'} outstanding={b.outstanding} "
+                 f"requests={b.requests.value()} errors={b.errors.value()}]" for b in self.backends]
+        snap = self.latency.snapshot()
+        return (" ".join(parts) + f" retries={self.retries.value()} unavailable={self.unavailable.value()} "
+                f"p50={Histogram.quantile(snap, 0.5):.1f}ms p95={Histogram.quantile(snap, 0.95):.1f}ms")
+
+    def serve_forever(self) -> int:
+        """SIGINT/SIGTERM 을 받을 때까지 블록"""
+        self.start()
+        signal.signal(signal.SIGTERM, lambda signum, frame: self._stop_event.set())
+        interval = self.args.stats_interval if self.args.stats_interval > 0 else 1.0
+        try:
+            while not self._stop_event.wait(interval):
+                if self.args.stats_interval > 0:
+                    logger.info(f"게이트웨이 통계: {self.summary()}")
+        except KeyboardInterrupt:
+            pass
+        self.stop()
+        return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="꽃 분류 서버 복제본 앞단 게이트웨이")
+    parser.add_argument('--host', default='0.0.0.0', help="바인드 주소")
+    parser.add_argument('--port', type=int, default=8080, help="바인드 포트")
+    parser.add_argument('--backends', required=True,
+                        help="백엔드 주소 목록 (쉼표 구분, 예: 127.0.0.1:9001,127.0.0.1:9002)")
+    parser.add_argument('--pool-size', type=int, default=4, help="백엔드당 지속 연결 수")
+    parser.add_argument('--forward-threads', type=int, default=256, help="백엔드 응답을 기다리는 전달 스레드 수")
+    parser.add_argument('--retries', type=int, default=1, help="연결 끊김/혼잡 시 다른 백엔드로 다시 보낼 횟수")
+    parser.add_argument('--request-timeout', type=float, default=30.0, help="백엔드 응답 제한 시간(초)")
+    parser.add_argument('--connect-timeout', type=float, default=2.0, help="백엔드 연결 제한 시간(초)")
+    parser.add_argument('--health-interval', type=float, default=2.0, help="백엔드 상태 확인 주기(초)")
+    parser.add_argument('--health-timeout', type=float, default=1.0, help="상태 확인 응답 제한 시간(초)")
+    parser.add_argument('--fall', type=int, default=2, help="연속 실패 몇 번이면 백엔드를 제외할지")
+    parser.add_argument('--rise', type=int, default=2, help="제외된 백엔드를 연속 성공 몇 번 후 다시 투입할지")
+    parser.add_argument('--max-connections', type=int, default=1024, help="동시 클라이언트 연결 수 제한")
+    parser.add_argument('--max-pipeline', type=int, default=32, help="프레임 연결당 동시 처리 요청 수")
+    parser.add_argument('--max-payload-bytes', type=int, default=DEFAULT_MAX_PAYLOAD_BYTES,
+                        help="요청 1건의 최대 크기(bytes)")
+    parser.add_argument('--read-timeout', type=float, default=30.0, help="요청 수신 제한 시간(초), 0이면 무제한")
+    parser.add_argument('--idle-timeout', type=float, default=300.0, help="다음 요청을 기다리는 최대 시간(초)")
+    parser.add_argument('--health-port', type=int, default=0,
+                        help="상태 확인/메트릭 HTTP 포트 (/healthz, /readyz, /metrics), 0이면 끔")
+    parser.add_argument('--stats-interval', type=float, default=30.0, help="통계 로그 주기(초), 0이면 끔")
+    parser.add_argument('--log-level', default='INFO', help="표준 로그 레벨")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=args.log_level.upper(),
+        format="[%(asctime)s] [%(levelname)s] %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+    return Gateway(args).serve_forever()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
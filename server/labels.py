@@ -0,0 +1,142 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
+
+# 텍스트 응답 문장 형식
+RESULT_TEMPLATE = "이 꽃은 {ko}({en})인 것 같아요!"
+
+# 라벨 파일 열 이름
+EN_COLUMN = 'en_class'
+KO_COLUMN = 'ko_class'
+
+
+class LabelRegistry:
+    """클래스 index -> (영문명, 한글명) 조회 테이블
+
+    시작 시 한 번 튜플로 만들어 두고, 텍스트 응답 문장도 클래스별로 미리
+    UTF-8 인코딩해 두어 요청마다 DataFrame 조회/문자열 조립을 하지 않는다.
+    """
+
+    def __init__(self, en_classes, ko_classes):
+        if len(en_classes) != len(ko_classes):
+            raise ValueError("영문/한글 라벨 개수가 다릅니다.")
+        self.en_classes = tuple(str(name) for name in en_classes)
+        self.ko_classes = tuple(str(name) for name in ko_classes)
+        self._names = tuple(zip(self.en_classes, self.ko_classes))
+        self._texts = tuple(RESULT_TEMPLATE.format(en=en, ko=ko) for en, ko in self._names)
+        self._encoded = tuple(text.encode('utf-8') for text in self._texts)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __getitem__(self, index: int) -> tuple:
+        """(en_class, ko_class) 반환"""
+        return self._names[index]
+
+    def text(self, index: int) -> str:
+        """텍스트 응답 문장"""
+        return self._texts[index]
+
+    def encoded_text(self, index: int) -> bytes:
+        """UTF-8 로 미리 인코딩된 텍스트 응답 문장"""
+        return self._encoded[index]
+
+    def validate(self, num_classes) -> None:
+        """모델 출력 차원과 라벨 개수가 다르면 ValueError (차원을 알 수 없으면 통과)"""
+        if num_classes is not None and int(num_classes) != len(self):
+            raise ValueError(f"모델 출력 클래스 수({num_classes})와 라벨 개수({len(self)})가 다릅니다.")
+
+    # ------------------------------------------------------------------
+    # 파일 입출력
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_rows(cls, rows) -> "LabelRegistry":
+        rows = list(rows)
+        return cls([row[0] for row in rows], [row[1] for row in rows])
+
+    @classmethod
+    def from_json(cls, path: str) -> "LabelRegistry":
+        with open(path, encoding='utf-8') as f:
+            return cls.from_rows(json.load(f)["labels"])
+
+    @classmethod
+    def from_csv(cls, path: str) -> "LabelRegistry":
+        with open(path, encoding='utf-8', newline='') as f:
+            reader = csv.DictReader(f)
+            return cls.from_rows((row[EN_COLUMN], row[KO_COLUMN]) for row in reader)
+
+    @classmethod
+    def from_excel(cls, path: str) -> "LabelRegistry":
+        # pandas/openpyxl 은 캐시를 새로 만들 때만 필요하다
+        import pandas as pd
+        df = pd.read_excel(path)
+        return cls(df[EN_COLUMN].tolist(), df[KO_COLUMN].tolist())
+
+    def save_json(self, path: str, source_hash: str = None) -> None:
+        # 사람이 diff 로 확인하기 쉽도록 라벨 한 줄에 하나씩 기록
+        rows = ",\n".join("  " + json.dumps(list(names), ensure_ascii=False) for names in self._names)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(f'{{\n "source_hash": {json.dumps(source_hash)},\n "labels": [\n{rows}\n ]\n}}\n')
+        os.replace(tmp_path, path)
+
+
+def cache_path_for(path: str) -> str:
+    """xlsx 라벨 파일의 JSON 캐시 경로 (같은 위치, 확장자만 .json)"""
+    return os.path.splitext(path)[0] + ".json"
+
+
+def file_hash(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+def load_labels(path: str, log=None) -> LabelRegistry:
+    """라벨 파일 로드
+
+    .json/.csv 는 그대로 읽는다. .xlsx 는 같은 위치의 JSON 캐시가 원본과 같은
+    내용(해시)으로 만들어졌으면 캐시를 읽고, 아니면 xlsx 를 읽어 캐시를 새로 쓴다.
+    """
+    log = log or (lambda message, msg_type="INFO": None)
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.json':
+        return LabelRegistry.from_json(path)
+    if ext == '.csv':
+        return LabelRegistry.from_csv(path)
+
+    cache_path = cache_path_for(path)
+    source_hash = file_hash(path)
+    try:
+        with open(cache_path, encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("source_hash") == source_hash:
+            return LabelRegistry.from_rows(data["labels"])
+    except (OSError, ValueError, KeyError):
+        pass
+
+    registry = LabelRegistry.from_excel(path)
+    try:
+        registry.save_json(cache_path, source_hash)
+        log(f"라벨 캐시 생성: {cache_path}")
+    except OSError as e:
+        log(f"라벨 캐시를 저장하지 못했습니다: {str(e)}", "WARNING")
+    return registry
+
+
+def main(argv=None) -> None:
+    """xlsx 라벨 파일로 JSON 캐시 생성 (python labels.py label.xlsx)"""
+    parser = argparse.ArgumentParser(description="라벨 xlsx 파일을 서버용 JSON 캐시로 변환")
+    parser.add_argument("label_path", help="라벨 xlsx 파일 경로")
+    parser.add_argument("-o", "--output", help="출력 JSON 경로 (기본값: 같은 위치의 .json)")
+    args = parser.parse_args(argv)
+
+    registry = LabelRegistry.from_excel(args.label_path)
+    output = args.output or cache_path_for(args.label_path)
+    registry.save_json(output, file_hash(args.label_path))
+    print(f"{len(registry)}개 라벨 -> {output}")
+
+
+if __name__ == "__main__":
+    main()
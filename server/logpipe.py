@@ -0,0 +1,218 @@
+import atexit
+import collections
+import datetime
+import itertools
+import logging
+import os
+import queue
+import threading
+import time
+
+logger = logging.getLogger("flower.server")
+
+_LEVELS = {
+    "INFO": logging.INFO,
+    "SUCCESS": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+}
+
+# writer 스레드가 한 번에 모아 기록하는 최대 로그 수
+WRITE_BATCH = 512
+
+# 초당 로그 수(부하)를 다시 계산하는 주기(초)
+RATE_WINDOW = 1.0
+
+
+class RotatingLogFile:
+    """크기 기준으로 path.1 ... path.N 으로 밀어내며 쓰는 로그 파일 (writer 스레드 전용)"""
+
+    def __init__(self, path: str, max_bytes: int, backup_count: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'ab')
+        self._size = self._file.tell()
+
+    def write(self, data: bytes) -> None:
+        if self.max_bytes > 0 and self._size > 0 and self._size + len(data) > self.max_bytes:
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+        self._size += len(data)
+
+    def _rotate(self) -> None:
+        self._file.close()
+        if self.backup_count > 0:
+            for i in range(self.backup_count - 1, 0, -1):
+                source = f"{self.path}.{i}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.path}.{i + 1}")
+            os.replace(self.path, f"{self.path}.1")
+            self._file = open(self.path, 'ab')
+        else:
+            self._file = open(self.path, 'wb')
+        self._size = 0
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class LogPipeline:
+    """엔진 로그를 호출 스레드에서 떼어 내는 비동기 파이프라인
+
+    submit() 은 크기가 정해진 큐에 넣기만 하고 (가득 차면 버림), writer 스레드가 모아서
+    한 번에 포맷한 뒤 표준 로거, 회전 로그 파일, UI 용 링 버퍼에 기록한다.
+    초당 로그 수가 log_sample_threshold 를 넘는 동안에는 log_sampling 에 지정한
+    레벨별로 N 건 중 1건만 남긴다 (지정하지 않은 레벨은 모두 남김).
+    초당 로그 수는 writer 스레드가 계산하므로 submit() 은 잠금을 잡지 않는다.
+    close() 후 start() 로 다시 시작할 수 있다 (엔진 재시작).
+    """
+
+    def __init__(self, config, registry):
+        self.threshold = config.log_sample_threshold
+        self.sample_every = config.log_sample_every()
+        self.loaded = False     # 직전 구간의 로그 수가 임계값을 넘었는지 여부 (샘플링 중)
+
+        self._queue = queue.Queue(maxsize=max(1, config.log_queue_size))
+        self._ring = collections.deque(maxlen=max(1, config.log_ring_size))
+        self._ring_lock = threading.Lock()
+        self._seq = 0   # 링 버퍼에 마지막으로 들어간 항목 번호
+        # itertools.count 의 next() 는 GIL 아래에서 원자적이므로 여러 스레드가 잠금 없이 센다
+        self._counters = {level: itertools.count() for level in self.sample_every}
+        self._submitted = itertools.count()
+        self._window_start = time.monotonic()
+        self._window_total = 0  # 현재 구간 시작 시점의 _submitted 값 (writer 스레드 전용)
+        self._second = None     # 타임스탬프 문자열 캐시 (같은 초의 로그가 많으므로)
+
+        self._file_args = (config.log_file, config.log_max_bytes, config.log_backup_count)
+        self.file = None
+        self.dropped = {
+            reason: registry.counter("flower_log_dropped_total", "샘플링/큐 초과로 버린 로그 수", reason=reason)
+            for reason in ("sampled", "queue_full")
+        }
+        registry.register_callback("flower_log_queue_size", "기록 대기 중인 로그 수", self._queue.qsize)
+
+        self._closed = True
+        self._thread = None
+        self.start()
+
+    def start(self) -> None:
+        """writer 스레드 시작 (이미 실행 중이면 무시), 닫힌 동안 쌓인 로그부터 기록한다"""
+        if not self._closed:
+            return
+        self._closed = False
+        if self._file_args[0]:
+            self.file = RotatingLogFile(*self._file_args)
+        self._thread = threading.Thread(target=self._write_loop, name="log-writer", daemon=True)
+        self._thread.start()
+        # 프로세스 종료 시 큐에 남은 로그를 마저 기록
+        atexit.register(self.close)
+
+    def _accept(self, level: str) -> bool:
+        next(self._submitted)
+        every = self.sample_every.get(level, 1)
+        if not self.loaded or every <= 1:
+            return True
+        return next(self._counters[level]) % every == 0
+
+    def _update_load(self) -> None:
+        """RATE_WINDOW 마다 직전 구간의 초당 로그 수로 샘플링 여부 결정 (writer 스레드)"""
+        now = time.monotonic()
+        elapsed = now - self._window_start
+        if elapsed < RATE_WINDOW:
+            return
+        # 현재 값을 읽는 next() 도 1 을 더하므로 다음 구간은 그 다음 값부터 센다
+        total = next(self._submitted)
+        count = total - self._window_total
+        self._window_total = total + 1
+        self._window_start = now
+        self.loaded = 0 < self.threshold <= count / elapsed
+
+    def submit(self, message: str, level: str = "INFO") -> None:
+        """로그 한 건 추가, 블록하지 않는다 (샘플링되거나 큐가 가득 차면 버림)"""
+        if not self._accept(level):
+            self.dropped["sampled"].inc()
+            return
+        try:
+            self._queue.put_nowait((time.time(), level, message))
+        except queue.Full:
+            self.dropped["queue_full"].inc()
+
+    def since(self, seq: int):
+        """seq 이후에 기록된 링 버퍼 항목 [(번호, 레벨, 줄)] 과, 링에서 밀려나 놓친 건수"""
+        with self._ring_lock:
+            missed = self._seq - seq
+            if missed <= 0:
+                return [], 0
+            count = min(missed, len(self._ring))
+            entries = list(itertools.islice(self._ring, len(self._ring) - count, None))
+        return entries, missed - count
+
+    def _timestamp(self, timestamp: float) -> str:
+        second = int(timestamp)
+        if self._second is None or self._second[0] != second:
+            self._second = (second, datetime.datetime.fromtimestamp(second).strftime('%Y-%m-%d %H:%M:%S'))
+        return self._second[1]
+
+    def _write_loop(self) -> None:
+        while True:
+            try:
+                record = self._queue.get(timeout=RATE_WINDOW)
+            except queue.Empty:
+                self._update_load()
+                continue
+            batch = [record]
+            while record is not None and len(batch) < WRITE_BATCH:
+                try:
+                    record = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(record)
+
+            stopping = batch[-1] is None
+            if stopping:
+                batch.pop()
+            if batch:
+                self._write(batch)
+            if stopping:
+                return
+            self._update_load()
+
+    def _write(self, batch: list) -> None:
+        lines = []
+        for timestamp, level, message in batch:
+            logger.log(_LEVELS.get(level, logging.INFO), message)
+            lines.append(f"[{self._timestamp(timestamp)}] [{level}] {message}")
+
+        if self.file is not None:
+            try:
+                self.file.write(("\n".join(lines) + "\n").encode('utf-8'))
+            except OSError:
+                logger.exception("로그 파일 기록 실패")
+
+        with self._ring_lock:
+            for (_, level, _), line in zip(batch, lines):
+                self._seq += 1
+                self._ring.append((self._seq, level, line))
+
+    def close(self, timeout: float = 5.0) -> None:
+        """남은 로그를 기록하고 writer 스레드 종료, 이후 submit 한 로그는 다시 start() 할 때 기록된다"""
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self.close)
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def summary(self) -> str:
+        dropped = " ".join(f"{reason}={counter.value()}" for reason, counter in self.dropped.items())
+        return f"queued={self._queue.qsize()} sampling={'on' if self.loaded else 'off'} dropped[{dropped}]"
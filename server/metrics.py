@@ -0,0 +1,248 @@
+import bisect
+import itertools
+import threading
+import time
+
+# 스레드들을 고정 개수의 stripe 에 나눠 배정하여, 값 갱신 시 같은 잠금을 두고
+# 경합하는 스레드 수를 줄인다 (읽을 때만 모든 stripe 를 합산).
+_STRIPES = 16
+_local = threading.local()
+_next_stripe = itertools.count()
+
+
+def _stripe_index() -> int:
+    try:
+        return _local.stripe
+    except AttributeError:
+        _local.stripe = next(_next_stripe) % _STRIPES
+        return _local.stripe
+
+
+class Counter:
+    """여러 스레드에서 갱신하는 합계 (음수 증가도 허용하므로 현재 연결 수 같은 값에도 사용)"""
+
+    def __init__(self):
+        self._locks = [threading.Lock() for _ in range(_STRIPES)]
+        self._values = [0] * _STRIPES
+
+    def inc(self, amount=1) -> None:
+        i = _stripe_index()
+        with self._locks[i]:
+            self._values[i] += amount
+
+    def dec(self, amount=1) -> None:
+        self.inc(-amount)
+
+    def value(self):
+        return sum(self._values)
+
+
+class Histogram:
+    """고정 버킷 히스토그램 (누적 아님, 버킷별 카운트)"""
+
+    def __init__(self, buckets):
+        # 마지막 버킷 뒤에는 +Inf 버킷이 하나 더 붙는다
+        self.buckets = sorted(buckets)
+        size = len(self.buckets) + 1
+        self._locks = [threading.Lock() for _ in range(_STRIPES)]
+        self._counts = [[0] * size for _ in range(_STRIPES)]
+        self._sums = [0.0] * _STRIPES
+
+    def observe(self, value: float) -> None:
+        idx = bisect.bisect_left(self.buckets, value)
+        i = _stripe_index()
+        with self._locks[i]:
+            self._counts[i][idx] += 1
+            self._sums[i] += value
+
+    def snapshot(self) -> dict:
+        """현재 상태 복사본 반환"""
+        counts = [0] * (len(self.buckets) + 1)
+        total = 0.0
+        for i in range(_STRIPES):
+            with self._locks[i]:
+                for j, count in enumerate(self._counts[i]):
+                    counts[j] += count
+                total += self._sums[i]
+        return {
+            "buckets": list(self.buckets),
+            "counts": counts,
+            "sum": total,
+            "count": sum(counts),
+        }
+
+    @staticmethod
+    def quantile(snap: dict, q: float) -> float:
+        """snapshot 에서 분위수 추정 (버킷 안에서는 선형 보간, +Inf 버킷이면 마지막 경계 반환)"""
+        if snap["count"] == 0:
+            return 0.0
+        rank = q * snap["count"]
+        seen = 0
+        lower = 0.0
+        for bound, count in zip(snap["buckets"], snap["counts"]):
+            if count and seen + count >= rank:
+                return lower + (bound - lower) * (rank - seen) / count
+            seen += count
+            lower = bound
+        return snap["buckets"][-1]
+
+    def format(self, unit: str = "") -> str:
+        """로그 출력용 한 줄 요약"""
+        snap = self.snapshot()
+        if snap["count"] == 0:
+            return "n=0"
+        parts = []
+        for bound, count in zip(snap["buckets"], snap["counts"]):
+            if count:
+                parts.append(f"<={bound:g}{unit}:{count}")
+        if snap["counts"][-1]:
+            parts.append(f">{snap['buckets'][-1]:g}{unit}:{snap['counts'][-1]}")
+        mean = snap["sum"] / snap["count"]
+        return f"n={snap['count']} mean={mean:.2f}{unit} " + " ".join(parts)
+
+
+def _label_text(labels: tuple, extra: str = "") -> str:
+    parts = [f'{key}="{value}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class MetricsRegistry:
+    """메트릭 모음, Prometheus 텍스트 형식과 JSON 용 dict 로 내보낸다
+
+    같은 이름을 다른 레이블로 여러 번 등록하면 한 메트릭 계열로 묶인다.
+    """
+
+    def __init__(self):
+        self._families = {}   # name -> (종류, 설명, {레이블 튜플: 메트릭 또는 함수})
+        self._lock = threading.Lock()
+
+    def _register(self, kind: str, name: str, help_text: str, labels: dict, metric):
+        with self._lock:
+            family = self._families.setdefault(name, (kind, help_text, {}))
+            family[2][tuple(sorted(labels.items()))] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, **labels) -> Counter:
+        return self._register("counter", name, help_text, labels, Counter())
+
+    def gauge(self, name: str, help_text: str, **labels) -> Counter:
+        return self._register("gauge", name, help_text, labels, Counter())
+
+    def histogram(self, name: str, help_text: str, buckets, **labels) -> Histogram:
+        return self._register("histogram", name, help_text, labels, Histogram(buckets))
+
+    def register_callback(self, name: str, help_text: str, fn, kind: str = "gauge", **labels) -> None:
+        """조회 시점에 fn() 을 호출해 값을 얻는 메트릭 (다른 객체가 이미 세고 있는 값 노출용)"""
+        self._register(kind, name, help_text, labels, fn)
+
+    def _items(self):
+        with self._lock:
+            return [(name, kind, help_text, list(metrics.items()))
+                    for name, (kind, help_text, metrics) in self._families.items()]
+
+    @staticmethod
+    def _value(metric):
+        return metric.value() if isinstance(metric, Counter) else metric()
+
+    def render_prometheus(self) -> str:
+        """Prometheus 텍스트 노출 형식 (버전 0.0.4)"""
+        lines = []
+        for name, kind, help_text, metrics in self._items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, metric in metrics:
+                if kind != "histogram":
+                    lines.append(f"{name}{_label_text(labels)} {self._value(metric):g}")
+                    continue
+                snap = metric.snapshot()
+                cumulative = 0
+                for bound, count in zip(snap["buckets"], snap["counts"]):
+                    cumulative += count
+                    le = 'le="%g"' % bound
+                    lines.append(f"{name}_bucket{_label_text(labels, le)} {cumulative}")
+                le = 'le="+Inf"'
+                lines.append(f"{name}_bucket{_label_text(labels, le)} {snap['count']}")
+                lines.append(f"{name}_sum{_label_text(labels)} {snap['sum']:g}")
+                lines.append(f"{name}_count{_label_text(labels)} {snap['count']}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict:
+        """JSON 직렬화용 {메트릭 이름{레이블}: 값}, 히스토그램은 count/mean/p50/p95/p99 요약"""
+        result = {}
+        for name, kind, _, metrics in self._items():
+            for labels, metric in metrics:
+                key = name + _label_text(labels).replace('"', '')
+                if kind != "histogram":
+                    result[key] = self._value(metric)
+                    continue
+                snap = metric.snapshot()
+                count = snap["count"]
+                result[key] = {
+                    "count": count,
+                    "mean": round(snap["sum"] / count, 3) if count else 0.0,
+                    "p50": round(Histogram.quantile(snap, 0.50), 3),
+                    "p95": round(Histogram.quantile(snap, 0.95), 3),
+                    "p99": round(Histogram.quantile(snap, 0.99), 3),
+                }
+        return result
+
+
+# 단계별 처리 시간 버킷 (ms)
+STAGE_BUCKETS_MS = [0.25, 0.5, 1, 2, 5, 10, 20, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+# 요청 처리 단계
+STAGES = ("receive", "decode", "preprocess", "queue", "inference", "send")
+
+
+class ServerMetrics:
+    """서버 처리 경로 계측 (요청/오류/바이트/연결 카운터, 단계별 시간 히스토그램, 처리량)"""
+
+    def __init__(self):
+        self.registry = MetricsRegistry()
+        r = self.registry
+        self.requests = r.counter("flower_requests_total", "수락한 분류 요청 수 (거절은 flower_rejected_total)")
+        self.errors = r.counter("flower_errors_total", "실패 응답을 보낸 요청 수")
+        self.bytes_received = r.counter("flower_received_bytes_total", "수신한 요청 바이트 수")
+        self.bytes_sent = r.counter("flower_sent_bytes_total", "송신한 응답 바이트 수")
+        self.connections = r.counter("flower_connections_total", "수락한 연결 수")
+        self.active_connections = r.gauge("flower_active_connections", "현재 연결 수")
+        self.stages = {
+            stage: r.histogram("flower_stage_latency_ms", "요청 처리 단계별 소요 시간(ms)",
+                               STAGE_BUCKETS_MS, stage=stage)
+            for stage in STAGES
+        }
+        self.request_latency = r.histogram("flower_request_latency_ms",
+                                           "요청 수신 완료부터 응답 송신까지 시간(ms)", STAGE_BUCKETS_MS)
+
+        # 처리량은 update_rates() 호출 간격 동안의 평균
+        self.request_rate = 0.0
+        self.byte_rate = 0.0
+        self._last_sample = None
+        r.register_callback("flower_throughput_requests_per_second", "최근 구간 초당 요청 수",
+                            lambda: self.request_rate)
+        r.register_callback("flower_throughput_received_bytes_per_second", "최근 구간 초당 수신 바이트 수",
+                            lambda: self.byte_rate)
+
+    def observe_stage(self, stage: str, started: float) -> None:
+        """perf_counter 기준 started 부터 지금까지를 stage 시간으로 기록"""
+        self.stages[stage].observe((time.perf_counter() - started) * 1000.0)
+
+    def observe_timings(self, timings: dict) -> None:
+        """Prediction.timings 의 단계별 시간(ms) 기록"""
+        for stage, value in timings.items():
+            histogram = self.stages.get(stage)
+            if histogram is not None:
+                histogram.observe(value)
+
+    def update_rates(self) -> None:
+        now = time.monotonic()
+        requests, received = self.requests.value(), self.bytes_received.value()
+        if self._last_sample is not None:
+            last_time, last_requests, last_received = self._last_sample
+            elapsed = now - last_time
+            if elapsed > 0:
+                self.request_rate = (requests - last_requests) / elapsed
+                self.byte_rate = (received - last_received) / elapsed
+        self._last_sample = (now, requests, received)
@@ -0,0 +1,170 @@
+import argparse
+import io
+import json
+import math
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+from batching import InferenceBatcher
+from config import ServerConfig
+from preprocess import MODEL_INPUT_SHAPE, decode_image, normalize_into, open_image
+
+# 합성 이미지 기본 크기
+DEFAULT_SIZES = "640x480,1920x1080,4032x3024"
+
+
+def synthetic_jpeg(size: tuple, quality: int = 90) -> bytes:
+    """그라디언트 + 잡음 JPEG (사진과 비슷한 디코드 비용)"""
+    base = Image.linear_gradient('L').resize(size).convert('RGB')
+    noise = Image.effect_noise(size, 25).convert('RGB')
+    buffer = io.BytesIO()
+    Image.blend(base, noise, 0.5).save(buffer, 'JPEG', quality=quality)
+    return buffer.getvalue()
+
+
+def load_samples(args) -> dict:
+    """{이름: 이미지 바이트}"""
+    if args.images:
+        names = sorted(n for n in os.listdir(args.images) if n.lower().endswith(('.jpg', '.jpeg', '.png')))
+        samples = {}
+        for name in names[:args.max_images or None]:
+            with open(os.path.join(args.images, name), 'rb') as f:
+                samples[name] = f.read()
+        return samples
+    samples = {}
+    for item in args.sizes.split(','):
+        width, height = (int(v) for v in item.strip().lower().split('x'))
+        samples[f"{width}x{height}"] = synthetic_jpeg((width, height))
+    return samples
+
+
+def measure(fn, iterations: int, warmup: int) -> dict:
+    """fn() 을 warmup 회 버린 뒤 iterations 회 측정한 소요 시간 요약(ms)"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000.0)
+    samples.sort()
+    pick = lambda q: samples[min(len(samples) - 1, max(0, math.ceil(q * len(samples)) - 1))]
+    mean = sum(samples) / len(samples)
+    return {
+        "iterations": iterations,
+        "mean": round(mean, 3),
+        "p50": round(pick(0.50), 3),
+        "p95": round(pick(0.95), 3),
+        "p99": round(pick(0.99), 3),
+        "max": round(samples[-1], 3),
+        "ops_per_s": round(1000.0 / mean, 2) if mean > 0 else 0.0,
+    }
+
+
+def bench_preprocess(engine, samples: dict, args) -> dict:
+    """preprocess_image (열린 이미지 -> uint8 배열) 와 decode_image (바이트 -> uint8 배열)"""
+    results = {}
+    for name, data in samples.items():
+        results[name] = {
+            "bytes": len(data),
+            "preprocess_image": measure(lambda: engine.preprocess_image(open_image(data)),
+                                        args.iterations, args.warmup),
+            "decode_image": measure(lambda: decode_image(data), args.iterations, args.warmup),
+        }
+    batch = [decode_image(data) for data in samples.values()]
+    batch = (batch * args.max_batch_size)[:args.max_batch_size]
+    out = np.empty((len(batch),) + MODEL_INPUT_SHAPE, dtype=np.float32)
+    results["normalize_into"] = {
+        "batch_size": len(batch),
+        **measure(lambda: normalize_into(out, batch), args.iterations, args.warmup),
+    }
+    return results
+
+
+def bench_classify(engine, samples: dict, args) -> dict:
+    """모델 추론만(infer_batch, 배치 크기별)과 배칭 스케줄러를 거친 classify_image"""
+    if not engine.load_model_and_labels() or not engine.model_loaded:
+        raise SystemExit("모델을 불러오지 못했습니다.")
+
+    results = {"infer_batch": {}}
+    for size in sorted(set(engine.config.warmup_sizes() or [1, args.max_batch_size])):
+        batch = np.zeros((size,) + MODEL_INPUT_SHAPE, dtype=np.float32)
+        stats = measure(lambda: engine.infer_batch(batch), args.iterations, args.warmup)
+        stats["images_per_s"] = round(stats["ops_per_s"] * size, 2)
+        results["infer_batch"][str(size)] = stats
+
+    # 대기 없이 한 장씩 처리하도록 배치 대기 시간을 0으로 둔다
+    engine.batcher = InferenceBatcher(engine.infer_batch, max_batch_size=args.max_batch_size,
+                                      max_wait_ms=0, top_k=engine.config.top_k)
+    engine.batcher.start()
+    try:
+        results["classify_image"] = {}
+        for name, data in samples.items():
+            results["classify_image"][name] = measure(
+                lambda: engine.classify_image(open_image(data)), args.iterations, args.warmup)
+    finally:
+        engine.batcher.stop()
+        engine.batcher = None
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="preprocess_image / classify_image 단독 마이크로 벤치마크")
+    parser.add_argument('--iterations', type=int, default=50, help="측정 반복 횟수 (기본값: 50)")
+    parser.add_argument('--warmup', type=int, default=5, help="버리는 반복 횟수 (기본값: 5)")
+    parser.add_argument('--images', help="샘플 이미지 디렉토리 (없으면 합성 JPEG)")
+    parser.add_argument('--max-images', type=int, default=0, help="디렉토리에서 읽을 최대 이미지 수, 0이면 전부")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help=f"합성 이미지 크기 (기본값: {DEFAULT_SIZES})")
+    parser.add_argument('--skip-classify', action='store_true', help="모델 없이 전처리만 측정")
+    parser.add_argument('--label', default='', help="결과에 함께 기록할 이름")
+    parser.add_argument('--output', help="결과 JSON 파일 경로 ('-' 이면 표준 출력)")
+    ServerConfig.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    from engine import FlowerServer
+    config = ServerConfig.from_args(args)
+    config.workers = 0
+    engine = FlowerServer(config)
+    samples = load_samples(args)
+
+    results = {"preprocess": bench_preprocess(engine, samples, args)}
+    if not args.skip_classify:
+        results["classify"] = bench_classify(engine, samples, args)
+
+    report = {
+        "label": args.label,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "config": {"iterations": args.iterations, "warmup": args.warmup,
+                   "max_batch_size": args.max_batch_size, "samples": list(samples)},
+        "results": results,
+    }
+
+    for name, entry in results["preprocess"].items():
+        if name == "normalize_into":
+            print(f"normalize_into[{entry['batch_size']}]: p50={entry['p50']}ms", file=sys.stderr)
+        else:
+            print(f"{name}: preprocess_image p50={entry['preprocess_image']['p50']}ms "
+                  f"decode_image p50={entry['decode_image']['p50']}ms", file=sys.stderr)
+    for size, entry in results.get("classify", {}).get("infer_batch", {}).items():
+        print(f"infer_batch[{size}]: p50={entry['p50']}ms ({entry['images_per_s']} img/s)", file=sys.stderr)
+    for name, entry in results.get("classify", {}).get("classify_image", {}).items():
+        print(f"classify_image {name}: p50={entry['p50']}ms p99={entry['p99']}ms", file=sys.stderr)
+
+    if args.output == '-':
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    elif args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
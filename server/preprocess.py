@@ -0,0 +1,107 @@
+import io
+import time
+
+import numpy as np
+from PIL import Image, ImageFile
+
+from protocol import BufferReader
+
+# 불완전한 이미지 데이터 처리 허용
+ImageFile.LOAD_TRUNCATED_IMAGES = True
+
+# 모델 입력 크기
+MODEL_INPUT_SIZE = (299, 299)
+MODEL_INPUT_SHAPE = (MODEL_INPUT_SIZE[1], MODEL_INPUT_SIZE[0], 3)
+
+# FLAG_RAW_RGB 요청 본문 크기
+RAW_INPUT_BYTES = MODEL_INPUT_SHAPE[0] * MODEL_INPUT_SHAPE[1] * MODEL_INPUT_SHAPE[2]
+
+# uint8 -> [0, 1] float32 정규화 계수
+_SCALE = np.float32(1.0 / 255.0)
+
+
+def open_image(data) -> Image.Image:
+    """이미지 바이트(bytes/bytearray/memoryview)를 복사 없이 연다"""
+    return Image.open(BufferReader(data))
+
+
+def load_image(data) -> Image.Image:
+    """이미지 바이트 디코드 (JPEG 는 draft 로 축소 디코드)"""
+    image = open_image(data)
+    if image.format == 'JPEG':
+        image.draft('RGB', MODEL_INPUT_SIZE)
+    image.load()
+    return image
+
+
+def to_model_input(image: Image.Image) -> np.ndarray:
+    """PIL 이미지를 (299, 299, 3) uint8 배열로 변환
+
+    JPEG 는 draft() 로 디코드 단계에서 1/2, 1/4, 1/8 축소가 적용되어
+    큰 사진도 299x299 이상인 가장 작은 크기로만 디코드한다.
+    정규화(float32 변환)는 배칭 단계에서 배치 버퍼에 직접 수행한다.
+    """
+    if image.format == 'JPEG':
+        image.draft('RGB', MODEL_INPUT_SIZE)
+
+    if image.mode != 'RGB':
+        # P 모드의 투명도는 RGBA 를 거쳐야 색이 올바르게 변환된다
+        if image.mode == 'P' and 'transparency' in image.info:
+            image = image.convert('RGBA')
+        image = image.convert('RGB')
+
+    if image.size != MODEL_INPUT_SIZE:
+        # draft 가 적용되지 않는 형식(PNG 등)은 reducing_gap 으로 정수배 축소를 먼저 수행
+        image = image.resize(MODEL_INPUT_SIZE, reducing_gap=3.0)
+    return np.asarray(image, dtype=np.uint8)
+
+
+def raw_to_array(data) -> np.ndarray:
+    """FLAG_RAW_RGB 본문을 디코드/리사이즈 없이 (299, 299, 3) uint8 배열로 변환
+
+    수신 버퍼는 반환 후 재사용되므로 복사본을 반환한다.
+    """
+    if len(data) != RAW_INPUT_BYTES:
+        raise ValueError(f"RGB 배열 크기가 {RAW_INPUT_BYTES} bytes 가 아닙니다: {len(data)} bytes")
+    return np.frombuffer(data, dtype=np.uint8).reshape(MODEL_INPUT_SHAPE).copy()
+
+
+def decode_image(data, timings: dict = None, raw: bool = False) -> np.ndarray:
+    """이미지 바이트를 디코드하여 (299, 299, 3) uint8 배열 반환
+
+    timings 를 넘기면 "decode", "preprocess" 소요 시간(ms)을 기록한다.
+    raw 이면 data 를 이미 모델 입력 크기인 RGB 배열로 보고 디코드를 건너뛴다.
+    """
+    started = time.perf_counter()
+    if raw:
+        arr = raw_to_array(data)
+        if timings is not None:
+            timings["decode"] = (time.perf_counter() - started) * 1000.0
+            timings["preprocess"] = 0.0
+        return arr
+    image = load_image(data)
+    decoded = time.perf_counter()
+    arr = to_model_input(image)
+    if timings is not None:
+        timings["decode"] = (decoded - started) * 1000.0
+        timings["preprocess"] = (time.perf_counter() - decoded) * 1000.0
+    return arr
+
+
+def warmup_decoder() -> None:
+    """더미 JPEG/PNG 를 한 번씩 디코드하여 PIL 플러그인 초기화 비용을 첫 요청 전에 치른다"""
+    for fmt in ('JPEG', 'PNG'):
+        buffer = io.BytesIO()
+        Image.new('RGB', (MODEL_INPUT_SIZE[0] * 2, MODEL_INPUT_SIZE[1] * 2)).save(buffer, fmt)
+        decode_image(buffer.getvalue())
+
+
+def normalize_into(out: np.ndarray, images) -> np.ndarray:
+    """uint8 이미지들을 미리 할당된 float32 배치 버퍼에 [0, 1] 로 정규화해 채우고 채운 구간 반환
+
+    float64 중간 배열 없이 이미지마다 한 번의 곱셈으로 out 에 직접 기록한다.
+    """
+    n = len(images)
+    for i, image in enumerate(images):
+        np.multiply(image, _SCALE, out=out[i], dtype=np.float32)
+    return out[:n]
@@ -0,0 +1,195 @@
+import io
+import socket
+import struct
+import threading
+
+# 단발성(legacy) 요청 헤더: 이미지 데이터 크기 (8byte, big endian)
+# 응답은 길이 정보 없는 UTF-8 문자열이며 서버가 응답 후 연결을 닫는다.
+HEADER_SIZE = 8
+
+# 기본 최대 이미지 크기
+DEFAULT_MAX_PAYLOAD_BYTES = 32 * 1024 * 1024
+
+# 프레임 프로토콜 (버전 1)
+# 한 연결에서 여러 요청을 주고받으며, 응답은 request_id 로 요청과 짝을 맞추므로
+# 순서가 뒤바뀌어 도착할 수 있다(파이프라이닝).
+#
+#   magic(2s) version(B) type(B) flags(H) reserved(H) request_id(I) length(I)  = 16 bytes
+#
+# 첫 2바이트가 magic 'FL' 이면 프레임 프로토콜로 판단한다. legacy 헤더로 해석하면
+# 약 5 * 10^18 바이트가 되어 어떤 허용 한도보다도 크므로 두 형식이 겹치지 않는다.
+FRAME_MAGIC = b'FL'
+PROTOCOL_VERSION = 1
+FRAME_HEADER = struct.Struct('>2sBBHHII')
+FRAME_HEADER_SIZE = FRAME_HEADER.size
+
+# 프레임 종류 (요청 0x01~, 응답 0x81~)
+FRAME_CLASSIFY = 0x01
+FRAME_HEALTH = 0x02     # 상태 확인, 본문 없음
+FRAME_ARCHIVE = 0x03    # 여러 이미지 묶음, 본문은 (항목 길이(4byte, big endian) + 이미지 데이터) 의 반복
+FRAME_RESULT = 0x81
+FRAME_ERROR = 0x82
+FRAME_BUSY = 0x83
+FRAME_STATUS = 0x84     # FRAME_HEALTH 응답, 본문은 상태 JSON
+FRAME_ARCHIVE_END = 0x85    # FRAME_ARCHIVE 의 마지막 응답, 본문은 {"count", "errors", "busy"} JSON
+
+# FRAME_ARCHIVE 응답은 같은 request_id 로 항목 순서대로 FRAME_RESULT / FRAME_ERROR 를 보내고
+# 마지막에 FRAME_ARCHIVE_END 를 보낸다. 수락 제어가 거절한 항목부터는 모두 FRAME_BUSY 로 응답한다.
+ARCHIVE_ENTRY_HEADER = struct.Struct('>I')
+
+# 요청 프레임 flags
+FLAG_JSON = 0x0001      # 응답을 JSON(상위 k개, 확률, 단계별 시간)으로 요청
+FLAG_RAW_RGB = 0x0002   # 본문이 인코딩된 이미지가 아닌 299x299 RGB uint8 배열 (행 우선, 268203 bytes)
+
+
+class ProtocolError(Exception):
+    """프레임 형식이 잘못된 경우"""
+
+
+class PayloadTooLarge(Exception):
+    """클라이언트가 선언한 데이터 크기가 허용 한도를 넘는 경우"""
+
+    def __init__(self, size: int, limit: int):
+        super().__init__(f"요청 크기 {size} bytes 가 허용 한도 {limit} bytes 를 초과했습니다.")
+        self.size = size
+        self.limit = limit
+
+
+def is_frame_header(prefix: bytes) -> bool:
+    """요청 첫 바이트들이 프레임 프로토콜인지 여부"""
+    return prefix[:len(FRAME_MAGIC)] == FRAME_MAGIC
+
+
+def parse_frame_header(header: bytes) -> tuple:
+    """프레임 헤더 해석, (frame_type, flags, request_id, length) 반환"""
+    magic, version, frame_type, flags, _, request_id, length = FRAME_HEADER.unpack(header)
+    if magic != FRAME_MAGIC:
+        raise ProtocolError("프레임 magic 이 올바르지 않습니다.")
+    if version != PROTOCOL_VERSION:
+        raise ProtocolError(f"지원하지 않는 프로토콜 버전입니다: {version}")
+    return frame_type, flags, request_id, length
+
+
+def pack_frame(frame_type: int, request_id: int, payload: bytes = b'', flags: int = 0) -> bytes:
+    """프레임 헤더 + 본문 직렬화"""
+    return FRAME_HEADER.pack(FRAME_MAGIC, PROTOCOL_VERSION, frame_type, flags, 0,
+                             request_id, len(payload)) + payload
+
+
+def recv_exact(sock: socket.socket, size: int) -> bytes:
+    """정확히 size 바이트 수신, 연결이 먼저 끊기면 받은 만큼만 반환 (헤더 등 작은 데이터용)"""
+    buf = bytearray(size)
+    received = recv_into_exact(sock, memoryview(buf))
+    return bytes(buf[:received])
+
+
+def recv_into_exact(sock: socket.socket, view: memoryview) -> int:
+    """미리 할당된 버퍼에 복사 없이 직접 수신, 실제 수신한 바이트 수 반환"""
+    total = len(view)
+    received = 0
+    while received < total:
+        n = sock.recv_into(view[received:])
+        if n == 0:
+            break
+        received += n
+    return received
+
+
+def discard_exact(sock: socket.socket, size: int, chunk_size: int = 64 * 1024) -> bool:
+    """size 바이트를 받아서 버림 (거절한 요청의 본문 건너뛰기), 끝까지 받았으면 True"""
+    buf = memoryview(bytearray(min(size, chunk_size)))
+    remaining = size
+    while remaining > 0:
+        n = sock.recv_into(buf[:min(remaining, len(buf))])
+        if n == 0:
+            return False
+        remaining -= n
+    return True
+
+
+class BufferPool:
+    """수신 버퍼 재사용 풀
+
+    요청마다 bytearray 를 새로 만들지 않도록 2의 거듭제곱 크기 단위로
+    버퍼를 보관해 두었다가 재사용한다. 보관 총량은 max_pooled_bytes 로 제한한다.
+    """
+
+    MIN_BUFFER_SIZE = 64 * 1024
+
+    def __init__(self, max_pooled_bytes: int = 64 * 1024 * 1024, max_per_class: int = 8):
+        self.max_pooled_bytes = max_pooled_bytes
+        self.max_per_class = max_per_class
+        self._free = {}
+        self._pooled_bytes = 0
+        self._lock = threading.Lock()
+
+    def _size_class(self, size: int) -> int:
+        cap = self.MIN_BUFFER_SIZE
+        while cap < size:
+            cap <<= 1
+        return cap
+
+    def acquire(self, size: int) -> memoryview:
+        """size 바이트 길이의 쓰기 가능한 memoryview 반환"""
+        cap = self._size_class(size)
+        buf = None
+        with self._lock:
+            free = self._free.get(cap)
+            if free:
+                buf = free.pop()
+                self._pooled_bytes -= cap
+        if buf is None:
+            buf = bytearray(cap)
+        return memoryview(buf)[:size]
+
+    def release(self, view: memoryview) -> None:
+        """acquire 로 받은 버퍼 반납, 이후 view 는 사용할 수 없다"""
+        buf = view.obj
+        view.release()
+        cap = len(buf)
+        with self._lock:
+            free = self._free.setdefault(cap, [])
+            if len(free) < self.max_per_class and self._pooled_bytes + cap <= self.max_pooled_bytes:
+                free.append(buf)
+                self._pooled_bytes += cap
+
+
+class BufferReader(io.RawIOBase):
+    """memoryview 를 복사 없이 읽는 파일 객체 (PIL Image.open 용)"""
+
+    def __init__(self, view):
+        self._view = memoryview(view)
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = min(len(b), len(self._view) - self._pos)
+        if n <= 0:
+            return 0
+        b[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = len(self._view) + offset
+        else:
+            raise ValueError(f"잘못된 whence 값: {whence}")
+        self._pos = max(0, pos)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def close(self) -> None:
+        self._view.release()
+        super().close()
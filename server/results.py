@@ -0,0 +1,56 @@
+import json
+from collections import namedtuple
+
+import numpy as np
+
+# 한 요청의 추론 결과
+# probs: (C,) 출력 벡터, top_indices/top_scores: 확률 내림차순 상위 k개,
+# timings: 단계별 소요 시간(ms) {"decode", "preprocess", "queue", "inference"},
+# cached: 캐시에서 가져온 결과인지 여부
+Prediction = namedtuple("Prediction", ["probs", "top_indices", "top_scores", "timings", "cached"],
+                        defaults=(False,))
+
+
+def top_k(outputs: np.ndarray, k: int) -> tuple:
+    """(N, C) 출력 전체에 대해 상위 k개 (indices, scores) 를 한 번에 계산
+
+    전체 정렬 대신 argpartition 으로 k개만 고른 뒤 그 k개만 정렬한다.
+    """
+    outputs = np.asarray(outputs)
+    k = max(1, min(k, outputs.shape[1]))
+    if k < outputs.shape[1]:
+        part = np.argpartition(outputs, -k, axis=1)[:, -k:]
+    else:
+        part = np.broadcast_to(np.arange(outputs.shape[1]), outputs.shape)
+    part_scores = np.take_along_axis(outputs, part, axis=1)
+    order = np.argsort(-part_scores, axis=1)
+    return np.take_along_axis(part, order, axis=1), np.take_along_axis(part_scores, order, axis=1)
+
+
+def predictions_from_batch(outputs: np.ndarray, k: int, timings: list) -> list:
+    """배치 출력을 요청별 Prediction 목록으로 변환"""
+    indices, scores = top_k(outputs, k)
+    return [Prediction(outputs[i], indices[i], scores[i], timings[i]) for i in range(len(outputs))]
+
+
+def prediction_from_vector(probs: np.ndarray, k: int, timings: dict, cached: bool = False) -> Prediction:
+    """출력 벡터 하나로 Prediction 생성 (캐시 적중, 워커 프로세스 결과 등)"""
+    prediction = predictions_from_batch(np.asarray(probs)[np.newaxis], k, [timings])[0]
+    return prediction._replace(cached=cached)
+
+
+def to_json(prediction: Prediction, labels) -> str:
+    """구조화된 JSON 응답 생성, labels[index] 는 (en_class, ko_class) 를 반환"""
+    top = []
+    for index, score in zip(prediction.top_indices, prediction.top_scores):
+        en_label, ko_label = labels[int(index)]
+        top.append({
+            "index": int(index),
+            "en_class": en_label,
+            "ko_class": ko_label,
+            "probability": round(float(score), 6),
+        })
+    timings = {key: (round(value, 3) if isinstance(value, float) else value)
+               for key, value in prediction.timings.items()}
+    return json.dumps({"top_k": top, "cached": prediction.cached, "timings_ms": timings},
+                      ensure_ascii=False)
@@ -0,0 +1,64 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def json_response(data, status: int = 200) -> tuple:
+    """라우트 핸들러용 (상태 코드, content-type, 본문) 생성"""
+    body = (json.dumps(data, ensure_ascii=False) + "\n").encode('utf-8')
+    return status, 'application/json; charset=utf-8', body
+
+
+class StatusHTTPServer:
+    """오케스트레이터/모니터링용 작은 HTTP 서버 (GET 만 지원)
+
+    add_route 로 등록한 핸들러는 인자 없이 호출되어 (상태 코드, content-type, 본문 bytes) 를
+    반환해야 한다. 요청은 별도 데몬 스레드에서 처리되어 분류 요청 처리와 무관하다.
+    """
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.routes = {}
+        self._httpd = None
+        self._thread = None
+
+    def add_route(self, path: str, handler) -> None:
+        self.routes[path] = handler
+
+    def start(self) -> None:
+        routes = self.routes
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                handler = routes.get(self.path.split('?', 1)[0])
+                if handler is None:
+                    status, content_type, body = 404, 'text/plain; charset=utf-8', b'not found\n'
+                else:
+                    try:
+                        status, content_type, body = handler()
+                    except Exception as e:
+                        status, content_type, body = 500, 'text/plain; charset=utf-8', f"{e}\n".encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # 주기적인 상태 확인 요청으로 로그가 넘치지 않도록 접근 로그는 남기지 않는다
+                pass
+
+        self._httpd = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="status-http", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._httpd is None:
+            return
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join(timeout=2)
+        self._httpd = None
+        self._thread = None
@@ -0,0 +1,256 @@
+import tkinter as tk
+from tkinter import ttk, scrolledtext, messagebox
+import queue
+import threading
+import time
+
+from connections import ConnectionRegistry
+from engine import FlowerServer, ServerEvent
+
+# 이벤트 큐 폴링 주기 및 1회 폴링당 최대 처리 이벤트 수
+EVENT_POLL_MS = 100
+MAX_EVENTS_PER_POLL = 500
+
+
+class FlowerServerUI:
+    """FlowerServer 엔진을 관찰하는 Tkinter 창
+
+    엔진은 워커 스레드에서 이벤트를 큐에 넣기만 하고, 위젯 갱신은
+    root.after 로 큐를 폴링하는 Tk 메인 스레드에서만 이루어진다.
+    로그는 엔진의 링 버퍼에서 새 항목만 읽어 오며, 로그 창도 링 버퍼 크기만큼만 유지한다.
+    """
+
+    def __init__(self, root, server: FlowerServer):
+        self.root = root
+        self.root.title("서버")
+        self.root.geometry("800x600")
+
+        self.root.protocol("WM_DELETE_WINDOW", self.close_app)
+
+        # 스타일 설정
+        style = ttk.Style()
+        style.theme_use('aqua')
+        # style.theme_use('clam') # docker 환경에서는 이거 써야 됨
+        style.configure("Treeview.Heading", font=("NanumGothic", 10, 'bold'))
+
+        self.server = server
+        self.client_items = ConnectionRegistry()    # (ip, port) -> Treeview 항목 ID
+        self.log_seq = 0                            # 마지막으로 표시한 로그 번호
+        self.max_log_lines = server.config.log_ring_size
+        self.stop_thread = None                     # 진행 중인 중지 스레드
+        self.closing = False
+        self.create_widgets()
+
+        # 엔진 이벤트 수신
+        self.events = queue.Queue()
+        self.server.add_observer(self.events.put)
+        self.root.after(EVENT_POLL_MS, self.poll_events)
+
+    def create_widgets(self):
+        # 메인 프레임
+        main_frame = ttk.Frame(self.root, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        main_frame.rowconfigure(2, weight=1)
+        main_frame.columnconfigure(0, weight=1)
+
+        # 상단 프레임 (상태 + 제어)
+        top_frame = ttk.Frame(main_frame)
+        top_frame.grid(row=0, column=0, sticky="ew", pady=(0, 10))
+        top_frame.columnconfigure(0, weight=1)
+
+        # 서버 상태 프레임
+        status_frame = ttk.LabelFrame(top_frame, text="서버 상태", padding="10")
+        status_frame.grid(row=0, column=0, sticky="ewns")
+
+        ttk.Label(status_frame, text="IP 주소:").grid(row=0, column=0, sticky="w")
+        self.ip_label = ttk.Label(status_frame, text=str(self.server.config.host), font=("NanumGothic", 10))
+        self.ip_label.grid(row=0, column=1, sticky="w")
+
+        ttk.Label(status_frame, text="포트:").grid(row=1, column=0, sticky="w")
+        self.port_label = ttk.Label(status_frame, text=str(self.server.config.port), font=("NanumGothic", 10))
+        self.port_label.grid(row=1, column=1, sticky="w")
+
+        ttk.Label(status_frame, text="상태:").grid(row=2, column=0, sticky="w")
+        self.status_label = ttk.Label(status_frame, text="Stopped", foreground="red", font=("NanumGothic", 10))
+        self.status_label.grid(row=2, column=1, sticky="w")
+
+        # 서버 제어 프레임
+        control_frame = ttk.LabelFrame(top_frame, text="서버 제어", padding="10")
+        control_frame.grid(row=0, column=1, sticky="ns", padx=(10, 0))
+
+        # 버튼들이 프레임 너비에 맞게 확장되도록 설정
+        self.start_button = ttk.Button(control_frame, text="서버 시작", command=self.start_server)
+        self.start_button.pack(pady=5, fill=tk.X)
+        self.stop_button = ttk.Button(control_frame, text="서버 중지", command=self.stop_server, state=tk.DISABLED)
+        self.stop_button.pack(pady=5, fill=tk.X)
+
+        # 프로그램 종료 버튼
+        ttk.Separator(control_frame, orient='horizontal').pack(fill='x', pady=10)
+        self.exit_button = ttk.Button(control_frame, text="프로그램 종료", command=self.close_app)
+        self.exit_button.pack(pady=5, fill=tk.X)
+
+
+        # 클라이언트 목록 프레임
+        clients_frame = ttk.LabelFrame(main_frame, text="연결된 클라이언트", padding="10")
+        clients_frame.grid(row=1, column=0, sticky="ew", pady=5)
+        clients_frame.columnconfigure(0, weight=1)
+        clients_frame.rowconfigure(0, weight=1)
+
+        self.client_tree = ttk.Treeview(
+            clients_frame,
+            columns=("ip", "port", "time"),
+            show="headings",
+            height=5
+        )
+        self.client_tree.grid(row=0, column=0, sticky="ew")
+
+        self.client_tree.heading("ip", text="IP 주소")
+        self.client_tree.heading("port", text="포트")
+        self.client_tree.heading("time", text="연결 시간")
+
+        self.client_tree.column("ip", width=150)
+        self.client_tree.column("port", width=100)
+        self.client_tree.column("time", width=200)
+
+        # 상세 로그 프레임
+        log_frame = ttk.LabelFrame(main_frame, text="상세 로그", padding="10")
+        log_frame.grid(row=2, column=0, sticky="nsew", pady=(5, 0))
+        log_frame.rowconfigure(0, weight=1)
+        log_frame.columnconfigure(0, weight=1)
+
+        self.log_text = scrolledtext.ScrolledText(log_frame, wrap=tk.WORD, state=tk.DISABLED, font=("NanumGothic", 9))
+        self.log_text.grid(row=0, column=0, sticky="nsew")
+
+        # 로그 타입별 색상 설정
+        self.log_text.tag_config("INFO", foreground="royalblue")
+        self.log_text.tag_config("SUCCESS", foreground="green")
+        self.log_text.tag_config("ERROR", foreground="red")
+        self.log_text.tag_config("WARNING", foreground="orange")
+
+    def start_server(self):
+        """서버 시작 (워커 시작/워밍업으로 오래 걸릴 수 있으므로 별도 스레드에서 실행)"""
+        self.start_button.config(state=tk.DISABLED)
+        self.status_label.config(text="Starting", foreground="orange")
+        threading.Thread(target=self._start_in_background, name="server-start", daemon=True).start()
+
+    def _start_in_background(self):
+        if not self.server.start():
+            # 엔진이 상태 이벤트 없이 거절한 경우에도 버튼이 다시 활성화되도록 상태를 알린다
+            # (위젯 갱신은 poll_events 가 Tk 메인 스레드에서 처리)
+            self.events.put(ServerEvent("state", time.time(), {
+                "running": self.server.running, "host": self.server.config.host, "port": self.server.config.port}))
+
+    def stop_server(self):
+        """서버 중지 (클라이언트 스레드/워커 종료 대기가 길어질 수 있으므로 별도 스레드에서 실행)"""
+        if self.stop_thread is not None and self.stop_thread.is_alive():
+            return
+        self.stop_button.config(state=tk.DISABLED)
+        self.status_label.config(text="Stopping", foreground="orange")
+        self.stop_thread = threading.Thread(target=self._stop_in_background, name="server-stop", daemon=True)
+        self.stop_thread.start()
+
+    def _stop_in_background(self):
+        running = self.server.running
+        self.server.stop()
+        if not running:
+            # 이미 중지된 경우 엔진이 상태 이벤트를 보내지 않으므로 버튼 갱신을 위해 직접 알린다
+            self.events.put(ServerEvent("state", time.time(), {
+                "running": False, "host": self.server.config.host, "port": self.server.config.port}))
+
+    def poll_events(self):
+        """엔진 이벤트 큐를 비우고 위젯 갱신 (Tk 메인 스레드)"""
+        for _ in range(MAX_EVENTS_PER_POLL):
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                break
+            self.handle_event(event)
+        self.poll_logs()
+        self.root.after(EVENT_POLL_MS, self.poll_events)
+
+    def poll_logs(self):
+        """엔진 로그 링 버퍼에서 새 로그를 가져와 표시"""
+        entries, missed = self.server.logs.since(self.log_seq)
+        if entries:
+            self.log_seq = entries[-1][0]
+            self.add_logs(entries, missed)
+
+    def handle_event(self, event):
+        """단일 엔진 이벤트 반영"""
+        data = event.data
+        if event.kind == "client_connected":
+            self.add_client_to_tree(data["ip"], data["port"], data["time"])
+        elif event.kind == "client_disconnected":
+            self.remove_client_from_tree(data["ip"], data["port"])
+        elif event.kind == "state":
+            self.update_state(data["running"], data["host"], data["port"])
+
+    def update_state(self, running, host, port):
+        """서버 상태 라벨 및 버튼 갱신"""
+        if running:
+            self.status_label.config(text="Running", foreground="green")
+            self.ip_label.config(text=host)
+            self.port_label.config(text=str(port))
+            self.start_button.config(state=tk.DISABLED)
+            self.stop_button.config(state=tk.NORMAL)
+        else:
+            self.status_label.config(text="Stopped", foreground="red")
+            self.start_button.config(state=tk.NORMAL)
+            self.stop_button.config(state=tk.DISABLED)
+            self.clear_client_tree()
+
+    def add_logs(self, entries, missed=0):
+        """로그 표시, 링 버퍼 크기를 넘는 오래된 줄은 지운다"""
+        self.log_text.config(state=tk.NORMAL)
+
+        if missed:
+            self.log_text.insert(tk.END, f"... 로그 {missed}건 생략\n", "WARNING")
+        for _, level, line in entries:
+            self.log_text.insert(tk.END, line + "\n", level)
+
+        # 마지막 줄은 항상 빈 줄이므로 1을 뺀다
+        excess = int(self.log_text.index('end-1c').split('.')[0]) - 1 - self.max_log_lines
+        if excess > 0:
+            self.log_text.delete('1.0', f"{excess + 1}.0")
+
+        # 스크롤을 맨 아래로 이동
+        self.log_text.see(tk.END)
+        self.log_text.config(state=tk.DISABLED)
+
+    def add_client_to_tree(self, ip, port, time):
+        """클라이언트 정보를 Treeview에 추가"""
+        # 같은 주소의 이전 항목이 남아 있으면 교체
+        previous = self.client_items.pop((ip, port))
+        if previous is not None:
+            self.client_tree.delete(previous)
+        item = self.client_tree.insert("", tk.END, values=(ip, port, time))
+        self.client_items.add((ip, port), item)
+
+    def remove_client_from_tree(self, ip, port):
+        """ip, port를 기준으로 클라이언트 정보를 Treeview에서 제거"""
+        item = self.client_items.pop((ip, port))
+        if item is not None:
+            self.client_tree.delete(item)
+
+    def clear_client_tree(self):
+        """TreeView의 모든 항목 삭제"""
+        items = self.client_items.clear()
+        if items:
+            self.client_tree.delete(*items)
+
+    def close_app(self):
+        """프로그램 종료, 서버가 실행중이면 중지 스레드가 끝난 뒤 창을 닫는다"""
+        if self.closing or not messagebox.askokcancel("종료 확인", "프로그램을 종료하시겠습니까?"):
+            return
+        self.closing = True
+        if self.server.running:
+            self.stop_server()
+        self._quit_when_stopped()
+
+    def _quit_when_stopped(self):
+        if self.stop_thread is not None and self.stop_thread.is_alive():
+            self.root.after(EVENT_POLL_MS, self._quit_when_stopped)
+            return
+        self.server.remove_observer(self.events.put)
+        self.root.quit()
+        self.root.destroy()
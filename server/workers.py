@@ -0,0 +1,420 @@
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from admission import Overloaded
+from backends import backend_options, create_backend
+from results import prediction_from_vector
+
+# 출력 벡터 최대 길이 (클래스 수), 공유 메모리 슬롯의 최소 크기를 정한다
+OUTPUT_CAPACITY = 4096
+OUTPUT_BYTES = OUTPUT_CAPACITY * 4
+
+# 워커 생존 확인 주기(초)
+MONITOR_INTERVAL = 1.0
+
+# 빈 슬롯을 기다리는 동안 풀 종료 여부를 확인하는 주기(초)
+SLOT_POLL_INTERVAL = 0.1
+
+
+def attach_shared_memory(name: str) -> SharedMemory:
+    """수락 프로세스가 만든 공유 메모리에 연결 (워커 쪽)
+
+    해제(unlink)는 만든 쪽이 책임지므로 resource_tracker 에 등록하지 않는다. 등록되면
+    워커 종료 시 아직 쓰고 있는 슬롯이 unlink 되고 누수 경고가 출력된다.
+    """
+    try:
+        return SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python 3.12 이하는 track 인자가 없으므로 등록을 직접 취소한다
+        shm = SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+def worker_main(worker_id: int, options: dict, task_queue, result_queue) -> None:
+    """추론 워커 프로세스 진입점
+
+    task_queue 로 (request_id, shm 이름, 길이, 임시 여부, 제출 시각, RGB 배열 여부) 를 받아 공유 메모리의 이미지를
+    디코드/전처리하고, 쌓여 있는 요청을 모아 한 번에 추론한 뒤 출력 벡터를 같은
+    공유 메모리 앞부분에 기록하고 result_queue 로 완료를 알린다.
+    """
+    intra = options["intra_threads"]
+    inter = options["inter_threads"]
+    if intra > 0:
+        os.environ.setdefault("OMP_NUM_THREADS", str(intra))
+
+    started = time.perf_counter()
+    from preprocess import MODEL_INPUT_SHAPE, decode_image, normalize_into, warmup_decoder
+
+    # TensorFlow 는 이를 쓰는 백엔드(savedmodel, xla)에서만 불러와 스레드 수를 설정한다
+    if options["backend"]["name"] in ('savedmodel', 'xla'):
+        import tensorflow as tf
+        if intra > 0:
+            tf.config.threading.set_intra_op_parallelism_threads(intra)
+        if inter > 0:
+            tf.config.threading.set_inter_op_parallelism_threads(inter)
+
+    backend = create_backend(dict(options["backend"], threads=options["backend"]["threads"] or intra))
+    backend.load()
+    run_batch = backend.infer_batch
+    num_classes = backend.output_dim()
+    loaded = time.perf_counter()
+
+    max_batch = options["max_batch_size"]
+    batch_buffer = np.empty((max_batch,) + MODEL_INPUT_SHAPE, dtype=np.float32)
+    attached = {}
+
+    # 준비 완료를 알리기 전에 배치 크기별로 미리 추론해 둔다
+    warmup_decoder()
+    batch_buffer.fill(0.0)
+    for size in options["warmup_sizes"]:
+        run_batch(batch_buffer[:size])
+    info = {
+        "num_classes": num_classes,
+        "load_s": loaded - started,
+        "warmup_s": time.perf_counter() - loaded,
+    }
+
+    def attach(name):
+        shm = attached.get(name)
+        if shm is None:
+            shm = attach_shared_memory(name)
+            attached[name] = shm
+        return shm
+
+    result_queue.put(("ready", worker_id, os.getpid(), info))
+
+    stopping = False
+    while not stopping:
+        task = task_queue.get()
+        if task is None:
+            break
+        tasks = [task]
+        while len(tasks) < max_batch:
+            try:
+                task = task_queue.get_nowait()
+            except queue.Empty:
+                break
+            if task is None:
+                stopping = True
+                break
+            tasks.append(task)
+
+        picked_at = time.time()
+        images, ready = [], []
+        for request_id, name, length, temporary, submitted_at, raw in tasks:
+            timings = {"queue": max(0.0, picked_at - submitted_at) * 1000.0}
+            shm = None
+            try:
+                if temporary:
+                    shm = attach_shared_memory(name)
+                    data = bytes(shm.buf[:length])
+                else:
+                    shm = attach(name)
+                    data = shm.buf[:length]
+                images.append(decode_image(data, timings, raw))
+                ready.append((request_id, shm, temporary, timings))
+            except Exception as e:
+                # 요청마다 붙인 임시 공유 메모리는 오래 실행되는 워커에 매핑이 쌓이지 않도록 바로 닫는다
+                if temporary and shm is not None:
+                    shm.close()
+                result_queue.put(("error", request_id, f"이미지 처리 실패: {str(e)}"))
+
+        if not ready:
+            continue
+
+        try:
+            started = time.perf_counter()
+            batch = normalize_into(batch_buffer, images)
+            outputs = run_batch(batch)
+            inference_ms = (time.perf_counter() - started) * 1000.0
+        except Exception as e:
+            for request_id, shm, temporary, _ in ready:
+                if temporary:
+                    shm.close()
+                result_queue.put(("error", request_id, f"추론 실패: {str(e)}"))
+            continue
+
+        for (request_id, shm, temporary, timings), row in zip(ready, outputs):
+            n = min(len(row), OUTPUT_CAPACITY)
+            np.ndarray((n,), dtype=np.float32, buffer=shm.buf)[:] = row[:n]
+            if temporary:
+                shm.close()
+            timings["inference"] = inference_ms
+            result_queue.put(("done", request_id, n, timings))
+
+    for shm in attached.values():
+        try:
+            shm.close()
+        except BufferError:
+            pass
+
+
+class _Worker:
+    __slots__ = ("index", "process", "task_queue", "outstanding", "pid", "ready")
+
+    def __init__(self, index, process, task_queue):
+        self.index = index
+        self.process = process
+        self.task_queue = task_queue
+        self.outstanding = set()
+        self.pid = None
+        self.ready = False  # "ready" 를 보내기 전(모델 로드/워밍업 중)에는 요청을 배정하지 않는다
+
+
+class ProcessWorkerPool:
+    """여러 추론 워커 프로세스에 요청을 나눠 주는 풀 (수락 프로세스 쪽)
+
+    이미지 바이트는 미리 만들어 둔 공유 메모리 슬롯에 복사해 전달하고, 큐로는
+    슬롯 이름과 길이만 보낸다. 슬롯보다 큰 요청은 임시 공유 메모리를 만든다.
+    요청은 준비된 워커 중 처리 중인 요청이 가장 적은 워커에 배정하며, 워커가 죽으면
+    그 워커의 요청을 실패 처리하고 새 프로세스로 교체한다 (준비될 때까지 배정 제외).
+    """
+
+    def __init__(self, config, log=None, num_classes: int = None):
+        self.config = config
+        self.log = log or (lambda message, msg_type="INFO": None)
+        self.num_workers = max(1, config.workers)
+        self.slot_bytes = max(config.shm_slot_bytes, OUTPUT_BYTES)
+
+        intra = config.worker_intra_threads
+        if intra <= 0:
+            # 워커 수로 코어를 나눠 과다 할당을 막는다
+            intra = max(1, (os.cpu_count() or 1) // self.num_workers)
+        self.options = {
+            "max_batch_size": config.max_batch_size,
+            "intra_threads": intra,
+            "inter_threads": config.worker_inter_threads,
+            "warmup_sizes": config.warmup_sizes(),
+            "backend": backend_options(config, num_classes),
+        }
+
+        self._ctx = mp.get_context('spawn')
+        self.result_queue = None
+        self._workers = []
+        self._slots = []
+        self._free_slots = queue.Queue()
+        self._pending = {}   # request_id -> (future, worker index, slot index, 임시 shm)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._ready = threading.Semaphore(0)
+        self._stopping = threading.Event()
+        self._threads = []
+
+        self.num_classes = None   # 워커가 보고한 모델 출력 차원 (라벨 검증용)
+        self.restarts = 0
+        self.completed = 0
+        self.failed = 0
+
+    def start(self, timeout: float = 300.0) -> None:
+        """워커 생성 후 모든 워커가 모델 로드를 마칠 때까지 대기"""
+        self._stopping.clear()
+        self.result_queue = self._ctx.Queue()
+        slot_count = self.num_workers * max(1, self.config.worker_slots)
+        for i in range(slot_count):
+            self._slots.append(SharedMemory(create=True, size=self.slot_bytes))
+            self._free_slots.put(i)
+
+        self._workers = [self._spawn(i) for i in range(self.num_workers)]
+        self._threads = [
+            threading.Thread(target=self._collect_loop, name="worker-results", daemon=True),
+            threading.Thread(target=self._monitor_loop, name="worker-monitor", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+        deadline = time.monotonic() + timeout
+        for _ in range(self.num_workers):
+            if not self._ready.acquire(timeout=max(0.0, deadline - time.monotonic())):
+                self.stop()
+                raise RuntimeError("추론 워커가 제한 시간 안에 준비되지 않았습니다.")
+
+    def stop(self) -> None:
+        """워커 종료 및 공유 메모리 해제"""
+        self._stopping.set()
+        for worker in self._workers:
+            try:
+                worker.task_queue.put(None)
+            except Exception:
+                pass
+        for worker in self._workers:
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.terminate()
+                worker.process.join(timeout=1)
+
+        if self.result_queue is not None:
+            self.result_queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout=2)
+        self._threads = []
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for future, _, _, temp in pending.values():
+            self._unlink(temp)
+            if not future.done():
+                future.set_exception(RuntimeError("추론 워커 풀이 종료되었습니다."))
+
+        for shm in self._slots:
+            self._unlink(shm)
+        self._slots = []
+        self._free_slots = queue.Queue()
+        self._workers = []
+
+    def submit(self, data, raw: bool = False) -> Future:
+        """이미지 바이트 한 건을 워커에 보내고 Prediction Future 반환 (raw 이면 FLAG_RAW_RGB 배열)
+
+        빈 슬롯이 없으면 worker_slot_timeout 초까지 호출 스레드를 막아 역압(backpressure)을 걸고,
+        그래도 없으면 Overloaded 를 발생시킨다. 슬롯보다 큰 요청은 슬롯을 쓰지 않는다.
+        """
+        length = len(data)
+        temp = slot = None
+        if length > self.slot_bytes:
+            self._check_running()
+            temp = SharedMemory(create=True, size=max(length, OUTPUT_BYTES))
+        else:
+            slot = self._acquire_slot()
+
+        future = Future()
+        request_id = next(self._ids)
+        try:
+            shm = temp if temp is not None else self._slots[slot]
+            shm.buf[:length] = data
+            with self._lock:
+                # 기다리는 동안 풀이 종료됐으면 등록하지 않는다 (stop 이 대기 요청을 이미 정리함)
+                self._check_running()
+                # 재시작 중인 워커는 모델을 불러오는 동안 제외 (모두 재시작 중이면 가장 한가한 워커의 큐에 쌓는다)
+                candidates = [w for w in self._workers if w.ready] or self._workers
+                worker = min(candidates, key=lambda w: len(w.outstanding))
+                worker.outstanding.add(request_id)
+                self._pending[request_id] = (future, worker.index, slot, temp)
+        except Exception:
+            self._release(slot, temp)
+            raise
+        worker.task_queue.put((request_id, shm.name, length, temp is not None, time.time(), raw))
+        return future
+
+    def _check_running(self) -> None:
+        if self._stopping.is_set() or not self._workers:
+            raise RuntimeError("추론 워커 풀이 종료되었습니다.")
+
+    def _acquire_slot(self) -> int:
+        """빈 공유 메모리 슬롯 번호, 제한 시간 안에 비지 않으면 Overloaded"""
+        free_slots = self._free_slots
+        deadline = time.monotonic() + max(0.0, self.config.worker_slot_timeout)
+        while True:
+            self._check_running()
+            remaining = deadline - time.monotonic()
+            try:
+                return free_slots.get(timeout=max(0.0, min(remaining, SLOT_POLL_INTERVAL)))
+            except queue.Empty:
+                if remaining <= SLOT_POLL_INTERVAL:
+                    raise Overloaded("queue_full", self.config.worker_slot_timeout or 1.0)
+
+    def summary(self) -> str:
+        with self._lock:
+            outstanding = [len(w.outstanding) for w in self._workers]
+        return (f"workers={self.num_workers} outstanding={outstanding} completed={self.completed} "
+                f"failed={self.failed} restarts={self.restarts}")
+
+    def _spawn(self, index: int) -> _Worker:
+        task_queue = self._ctx.Queue()
+        process = self._ctx.Process(
+            target=worker_main,
+            args=(index, self.options, task_queue, self.result_queue),
+            name=f"inference-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        return _Worker(index, process, task_queue)
+
+    def _finish(self, request_id: int):
+        """대기 중인 요청 정리 후 (future, shm) 반환, 이미 정리된 요청이면 None"""
+        with self._lock:
+            entry = self._pending.pop(request_id, None)
+            if entry is None:
+                return None
+            future, worker_index, slot, temp = entry
+            self._workers[worker_index].outstanding.discard(request_id)
+        return future, slot, temp
+
+    def _release(self, slot, temp) -> None:
+        self._unlink(temp)
+        if slot is not None:
+            self._free_slots.put(slot)
+
+    @staticmethod
+    def _unlink(shm) -> None:
+        if shm is None:
+            return
+        try:
+            shm.close()
+            shm.unlink()
+        except (FileNotFoundError, BufferError):
+            pass
+
+    def _collect_loop(self) -> None:
+        while True:
+            message = self.result_queue.get()
+            if message is None:
+                break
+            kind = message[0]
+
+            if kind == "ready":
+                _, index, pid, info = message
+                with self._lock:
+                    self._workers[index].pid = pid
+                    self._workers[index].ready = True
+                self.num_classes = info["num_classes"]
+                self.log(f"추론 워커 {index} 준비 완료 (pid={pid}, 로드 {info['load_s']:.2f}s, "
+                         f"워밍업 {info['warmup_s']:.2f}s)", "SUCCESS")
+                self._ready.release()
+                continue
+
+            finished = self._finish(message[1])
+            if finished is None:
+                continue
+            future, slot, temp = finished
+            if kind == "done":
+                shm = temp if temp is not None else self._slots[slot]
+                value = np.ndarray((message[2],), dtype=np.float32, buffer=shm.buf).copy()
+                self._release(slot, temp)
+                self.completed += 1
+                future.set_result(prediction_from_vector(value, self.config.top_k, message[3]))
+            else:
+                self._release(slot, temp)
+                self.failed += 1
+                future.set_exception(RuntimeError(message[2]))
+
+    def _monitor_loop(self) -> None:
+        while not self._stopping.wait(MONITOR_INTERVAL):
+            for index, worker in enumerate(list(self._workers)):
+                if worker.process.is_alive() or self._stopping.is_set():
+                    continue
+
+                self.log(f"추론 워커 {index} 비정상 종료 (exitcode={worker.process.exitcode}), 재시작합니다.",
+                         "ERROR")
+                with self._lock:
+                    lost = list(worker.outstanding)
+                for request_id in lost:
+                    finished = self._finish(request_id)
+                    if finished is None:
+                        continue
+                    future, slot, temp = finished
+                    self._release(slot, temp)
+                    self.failed += 1
+                    future.set_exception(RuntimeError("추론 워커가 비정상 종료되었습니다."))
+
+                with self._lock:
+                    self._workers[index] = self._spawn(index)
+                self.restarts += 1
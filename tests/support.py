@@ -0,0 +1,96 @@
+"""테스트 공통 준비
+
+서버 모듈은 server/ 디렉토리에서 바로 실행하는 구조(형제 모듈을 직접 import)이므로
+server/ 를 import 경로에 추가한다. client/protocol.py 는 서버의 protocol.py 와 이름이
+같으므로 load_client() 로 다른 이름을 붙여 불러온다.
+"""
+import importlib.util
+import logging
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER_DIR = os.path.join(ROOT, "server")
+CLIENT_DIR = os.path.join(ROOT, "client")
+
+if SERVER_DIR not in sys.path:
+    sys.path.insert(0, SERVER_DIR)
+
+# 서버 로그가 테스트 출력에 섞이지 않도록 한다
+logging.getLogger("flower").addHandler(logging.NullHandler())
+
+
+# 다른 client 모듈이 import 하는 client 모듈 (앞의 것만 뒤의 것이 import 한다)
+CLIENT_SIBLINGS = ("protocol", "upload")
+
+
+def load_client(name: str):
+    """client/<name>.py 를 client_<name> 모듈로 불러옴"""
+    module_name = f"client_{name}"
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    # client 모듈은 형제 모듈(protocol, upload)을 이름 그대로 import 하므로
+    # 불러오는 동안만 서버 모듈 대신 client 쪽 모듈이 보이도록 바꿔 둔다
+    needed = CLIENT_SIBLINGS[:CLIENT_SIBLINGS.index(name)] if name in CLIENT_SIBLINGS else CLIENT_SIBLINGS
+    siblings = {sibling: load_client(sibling) for sibling in needed}
+    saved = {sibling: sys.modules.get(sibling) for sibling in siblings}
+    sys.modules.update(siblings)
+    try:
+        spec = importlib.util.spec_from_file_location(module_name, os.path.join(CLIENT_DIR, f"{name}.py"))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+    finally:
+        for sibling, original in saved.items():
+            if original is None:
+                sys.modules.pop(sibling, None)
+            else:
+                sys.modules[sibling] = original
+    return module
+
+
+def write_labels(directory: str, count: int = 5) -> str:
+    """flowerN / 꽃N 라벨 CSV 를 만들고 경로 반환"""
+    path = os.path.join(directory, "labels.csv")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("en_class,ko_class\n")
+        for i in range(count):
+            f.write(f"flower{i},꽃{i}\n")
+    return path
+
+
+def jpeg_bytes(color=(200, 30, 30), size=(64, 64)) -> bytes:
+    """단색 JPEG 이미지 바이트"""
+    import io
+
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+def stub_config(directory: str, **overrides):
+    """모델 없이 stub 백엔드로 127.0.0.1 의 빈 포트에서 실행하는 설정"""
+    from config import ServerConfig
+
+    options = dict(host="127.0.0.1", port=0, label_path=write_labels(directory), backend="stub",
+                   warmup_batch_sizes="none", stats_interval=0, metrics_interval=0)
+    options.update(overrides)
+    return ServerConfig(**options)
+
+
+def start_server(testcase, **overrides):
+    """stub 서버를 시작하고 (엔진, (host, port)) 반환, 테스트가 끝나면 중지"""
+    import tempfile
+
+    from engine import FlowerServer
+
+    directory = tempfile.mkdtemp()
+    server = FlowerServer(stub_config(directory, **overrides))
+    testcase.assertTrue(server.load_model_and_labels())
+    testcase.assertTrue(server.start())
+    testcase.addCleanup(server.stop)
+    if server.async_runner is not None:
+        return server, server.async_runner._server.sockets[0].getsockname()[:2]
+    return server, server.server_socket.getsockname()[:2]
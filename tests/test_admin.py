@@ -0,0 +1,47 @@
+import socket
+import tempfile
+import unittest
+
+import support  # noqa: F401
+from admin import ADMIN_HOST, AdminServer
+
+
+def command(port: int, line: str) -> str:
+    reply = bytearray()
+    with socket.create_connection((ADMIN_HOST, port), timeout=5) as conn:
+        conn.sendall((line + "\n").encode("utf-8"))
+        while True:
+            chunk = conn.recv(65536)
+            if not chunk:
+                break
+            reply += chunk
+    return reply.decode("utf-8")
+
+
+class AdminServerTest(unittest.TestCase):
+    def start_admin(self):
+        admin = AdminServer(0, tempfile.mkdtemp())
+        admin.start()
+        self.addCleanup(admin.stop)
+        return admin
+
+    def test_thread_dump(self):
+        admin = self.start_admin()
+        reply = command(admin.port, "threads")
+        self.assertIn('"admin"', reply)
+        self.assertIn("MainThread", reply)
+
+    def test_profile_writes_collapsed_stacks(self):
+        admin = self.start_admin()
+        reply = command(admin.port, "profile 0.2 collapsed 1 wall")
+        self.assertIn("collapsed stack:", reply)
+
+    def test_stop_joins_accept_thread_and_closes_port(self):
+        admin = self.start_admin()
+        thread = admin._thread
+        port = admin.port
+        admin.stop()
+        self.assertFalse(thread.is_alive())
+        with self.assertRaises(OSError):
+            socket.create_connection((ADMIN_HOST, port), timeout=1).close()
+        admin.stop()    # 두 번 불러도 된다
@@ -0,0 +1,91 @@
+import json
+import socket
+import tempfile
+import time
+import unittest
+
+import support
+from admission import AdmissionController, Overloaded, RateLimiter
+from metrics import MetricsRegistry
+from protocol import FLAG_JSON, FRAME_BUSY, FRAME_RESULT
+
+client_protocol = support.load_client("protocol")
+
+
+def controller(**overrides):
+    return AdmissionController(support.stub_config(tempfile.mkdtemp(), **overrides), MetricsRegistry())
+
+
+class AdmissionControllerTest(unittest.TestCase):
+    def test_queue_full(self):
+        admission = controller(max_queue=2, max_queue_wait_ms=0)
+        admission.admit("a")
+        admission.admit("a")
+        with self.assertRaises(Overloaded) as caught:
+            admission.admit("b")
+        self.assertEqual(caught.exception.reason, "queue_full")
+        self.assertEqual(admission.rejections["queue_full"].value(), 1)
+        admission.release()
+        admission.admit("b")
+        self.assertEqual(admission.pending, 2)
+
+    def test_wait_time(self):
+        admission = controller(max_queue=0, max_queue_wait_ms=100)
+        admission.admit("a")
+        admission.service_rate = 5.0    # 초당 5건이면 대기 1건당 200ms
+        with self.assertRaises(Overloaded) as caught:
+            admission.admit("a")
+        self.assertEqual(caught.exception.reason, "wait_time")
+        self.assertAlmostEqual(caught.exception.retry_after, 0.2)
+
+    def test_rate_limited_per_client(self):
+        admission = controller(rate_limit=0.5, rate_burst=2, max_queue=0, max_queue_wait_ms=0)
+        admission.admit("a")
+        admission.admit("a")
+        with self.assertRaises(Overloaded) as caught:
+            admission.admit("a")
+        self.assertEqual(caught.exception.reason, "rate_limited")
+        self.assertGreater(caught.exception.retry_after, 1.0)
+        admission.admit("b")    # 다른 IP 는 따로 센다
+
+    def test_reply_formats(self):
+        error = Overloaded("queue_full", 1.5)
+        self.assertEqual(json.loads(error.reply(True)),
+                         {"error": "overloaded", "reason": "queue_full", "retry_after_ms": 1500})
+        self.assertIn("1.5", error.reply())
+
+
+class RateLimiterTest(unittest.TestCase):
+    def test_refills_over_time(self):
+        limiter = RateLimiter(rate=100.0, burst=1)
+        self.assertEqual(limiter.acquire("a"), 0.0)
+        self.assertGreater(limiter.acquire("a"), 0.0)
+        time.sleep(0.03)
+        self.assertEqual(limiter.acquire("a"), 0.0)
+
+    def test_forgets_oldest_clients(self):
+        limiter = RateLimiter(rate=1.0, burst=1, max_clients=2)
+        for key in ("a", "b", "c"):
+            limiter.acquire(key)
+        self.assertEqual(list(limiter._buckets), ["b", "c"])
+
+
+class ServerAdmissionTest(unittest.TestCase):
+    def test_rate_limited_request_gets_busy_frame(self):
+        server, address = support.start_server(self, rate_limit=0.001, rate_burst=1)
+        with client_protocol.FrameConnection(address) as client:
+            frame_type, _ = client.request(support.jpeg_bytes())
+            self.assertEqual(frame_type, FRAME_RESULT)
+            frame_type, text = client.request(support.jpeg_bytes(), flags=FLAG_JSON)
+            self.assertEqual(frame_type, FRAME_BUSY)
+            self.assertEqual(json.loads(text)["reason"], "rate_limited")
+        self.assertEqual(server.admission.pending, 0)
+
+    def test_connection_limit(self):
+        _, address = support.start_server(self, max_connections=1)
+        with socket.create_connection(address, timeout=5) as first:
+            first.sendall(b"F")     # 프로토콜 판별 전 대기 상태로 연결을 붙잡아 둔다
+            time.sleep(0.1)
+            with socket.create_connection(address, timeout=5) as second:
+                reply = second.recv(4096).decode("utf-8")
+        self.assertIn("혼잡", reply)
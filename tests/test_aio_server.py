@@ -0,0 +1,68 @@
+import socket
+import tempfile
+import time
+import unittest
+
+import support
+from engine import FlowerServer
+from protocol import FRAME_CLASSIFY, FRAME_ERROR, FRAME_RESULT, pack_frame
+from test_engine import classify_legacy
+
+client_protocol = support.load_client("protocol")
+
+
+class AsyncServerTest(unittest.TestCase):
+    """mode='asyncio' 에서 legacy/프레임 요청 처리"""
+
+    def start_server(self, **overrides):
+        server = FlowerServer(support.stub_config(tempfile.mkdtemp(), mode="asyncio", **overrides))
+        self.assertTrue(server.load_model_and_labels())
+        self.assertTrue(server.start())
+        self.addCleanup(server.stop)
+        self.assertIsNone(server.server_socket)
+        return server, server.async_runner._server.sockets[0].getsockname()[:2]
+
+    def test_legacy_request(self):
+        _, address = self.start_server()
+        self.assertIn("flower", classify_legacy(address, support.jpeg_bytes()))
+        self.assertIn("실패", classify_legacy(address, b"not an image"))
+
+    def test_legacy_payload_limit(self):
+        _, address = self.start_server(max_payload_bytes=256)
+        self.assertIn("너무 큽니다", classify_legacy(address, b"x" * 1024))
+
+    def test_pipelined_frames(self):
+        server, address = self.start_server()
+        items = [support.jpeg_bytes((i * 40, 10, 10)) for i in range(5)] + [b"not an image"]
+        with client_protocol.FrameConnection(address) as client:
+            results = client.classify_many(items, window=3)
+            self.assertTrue(client.health()["ready"])
+        self.assertEqual([results[i][0] for i in range(len(items))], [FRAME_RESULT] * 5 + [FRAME_ERROR])
+        self.assertEqual(server.async_runner.inflight, 0)
+        self.assertEqual(server.admission.pending, 0)
+
+    def test_truncated_frame_gets_no_legacy_reply(self):
+        _, address = self.start_server()
+        for data in (pack_frame(FRAME_CLASSIFY, 1, b"x" * 100)[:40], pack_frame(FRAME_CLASSIFY, 1)[:10]):
+            with socket.create_connection(address, timeout=5) as sock:
+                sock.sendall(data)
+                sock.shutdown(socket.SHUT_WR)
+                self.assertEqual(sock.recv(1024), b"")
+
+    def test_stop_releases_inflight_requests(self):
+        server, address = self.start_server(stub_latency_ms=500)
+        admission = server.admission
+        with socket.create_connection(address, timeout=5) as sock:
+            for request_id in (1, 2):
+                sock.sendall(pack_frame(FRAME_CLASSIFY, request_id, support.jpeg_bytes()))
+            deadline = time.monotonic() + 5
+            while admission.pending < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(admission.pending, 2)
+            runner = server.async_runner
+            started = time.monotonic()
+            server.stop()
+            # 연결이 열려 있어도 이벤트 루프가 시간 제한 전에 끝나야 한다
+            self.assertLess(time.monotonic() - started, 3.0)
+            self.assertIsNone(runner.loop)
+        self.assertEqual(admission.pending, 0)
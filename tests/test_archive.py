@@ -0,0 +1,58 @@
+import unittest
+
+import support
+from protocol import FRAME_BUSY, FRAME_ERROR, FRAME_RESULT
+
+
+class CountingPool:
+    """수신 버퍼 풀을 감싸 빌려 간 버퍼가 모두 반납되는지 센다"""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.acquired = 0
+        self.released = 0
+
+    def acquire(self, size):
+        self.acquired += 1
+        return self.pool.acquire(size)
+
+    def release(self, view):
+        self.released += 1
+        self.pool.release(view)
+
+
+class ArchiveTest(unittest.TestCase):
+    """FRAME_ARCHIVE 묶음 요청의 항목별 응답, 수락 제어, 버퍼 반납"""
+
+    def classify(self, address, items):
+        client = support.load_client("protocol").FrameConnection(address)
+        with client:
+            replies = list(client.classify_archive(items))
+            return replies, client.archive_summary
+
+    def test_entries_answered_in_order(self):
+        server, address = support.start_server(self, max_batch_size=2)
+        pool = server.buffer_pool = CountingPool(server.buffer_pool)
+        items = [support.jpeg_bytes((i * 40, 10, 10)) for i in range(5)] + [b"not an image"]
+
+        replies, summary = self.classify(address, items)
+        self.assertEqual([frame_type for frame_type, _ in replies], [FRAME_RESULT] * 5 + [FRAME_ERROR])
+        self.assertEqual(summary, {"count": 6, "errors": 1, "busy": 0})
+        self.assertEqual(pool.acquired, 6)
+        self.assertEqual(pool.released, 6)
+        self.assertEqual(server.admission.pending, 0)
+
+    def test_each_entry_goes_through_admission(self):
+        server, address = support.start_server(self, rate_limit=0.001, rate_burst=2)
+        items = [support.jpeg_bytes((i * 40, 10, 10)) for i in range(5)]
+
+        client = support.load_client("protocol").FrameConnection(address)
+        with client:
+            replies = list(client.classify_archive(items))
+            # 요청률 제한에 걸린 항목에서 멈추고 나머지는 FRAME_ARCHIVE_END 까지 건너뛴다
+            self.assertEqual([frame_type for frame_type, _ in replies], [FRAME_RESULT, FRAME_RESULT, FRAME_BUSY])
+            self.assertEqual(client.archive_summary, {"count": 5, "errors": 0, "busy": 3})
+            # 같은 연결에서 이어지는 요청도 응답 짝이 맞는다
+            self.assertTrue(client.health()["ready"])
+        self.assertEqual(server.admission.rejections["rate_limited"].value(), 1)
+        self.assertEqual(server.admission.pending, 0)
@@ -0,0 +1,98 @@
+import importlib.util
+import os
+import unittest
+
+import numpy as np
+
+import support
+from backends import InferenceBackend, ONNXBackend, SavedModelBackend, StubBackend, bucket_sizes
+from preprocess import MODEL_INPUT_SHAPE
+
+# 실제 모델 비교용 경로 (없으면 해당 테스트는 건너뛴다)
+MODEL_DIR = os.environ.get("FLOWER_MODEL_DIR", os.path.join(support.SERVER_DIR, "model"))
+ONNX_PATH = os.environ.get("FLOWER_ONNX_PATH", os.path.join(support.SERVER_DIR, "model.onnx"))
+
+HAS_TF = importlib.util.find_spec("tensorflow") is not None
+HAS_ORT = importlib.util.find_spec("onnxruntime") is not None
+
+
+def sample_batch(n: int = 4, seed: int = 1) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.random((n,) + MODEL_INPUT_SHAPE, dtype=np.float32)
+
+
+class BackendContract:
+    """모든 백엔드가 지켜야 하는 infer_batch 규약 확인"""
+
+    def assert_contract(self, backend: InferenceBackend, batch: np.ndarray) -> np.ndarray:
+        outputs = np.asarray(backend.infer_batch(batch.copy()))
+        self.assertEqual(outputs.shape[0], len(batch))
+        if backend.output_dim() is not None:
+            self.assertEqual(outputs.shape[1], backend.output_dim())
+        np.testing.assert_allclose(outputs.sum(axis=1), 1.0, atol=1e-3)
+        # 배치로 묶어도 한 장씩 추론한 결과와 같아야 한다 (패딩/배칭이 결과를 바꾸지 않음)
+        singles = np.concatenate([backend.infer_batch(batch[i:i + 1].copy()) for i in range(len(batch))])
+        np.testing.assert_allclose(outputs, singles, atol=1e-4)
+        return outputs
+
+
+class InterfaceTest(unittest.TestCase):
+    def test_interface_is_abstract(self):
+        with self.assertRaises(TypeError):
+            InferenceBackend()
+
+        class Incomplete(InferenceBackend):
+            def load(self):
+                pass
+
+            def output_dim(self):
+                return 1
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+    def test_bucket_sizes_include_max(self):
+        self.assertEqual(bucket_sizes([1, 4, 64], 16), [1, 4, 16])
+
+
+class StubBackendTest(BackendContract, unittest.TestCase):
+    def test_contract(self):
+        backend = StubBackend(num_classes=7)
+        backend.load()
+        self.assertEqual(backend.output_dim(), 7)
+        self.assert_contract(backend, sample_batch())
+
+    def test_deterministic(self):
+        first, second = StubBackend(num_classes=7), StubBackend(num_classes=7)
+        first.load()
+        second.load()
+        batch = sample_batch()
+        np.testing.assert_array_equal(first.infer_batch(batch), second.infer_batch(batch))
+
+
+@unittest.skipUnless(HAS_TF and HAS_ORT and os.path.isdir(MODEL_DIR) and os.path.isfile(ONNX_PATH),
+                     "tensorflow/onnxruntime 또는 SavedModel/ONNX 모델이 없습니다.")
+class ModelParityTest(BackendContract, unittest.TestCase):
+    """SavedModel 과 ONNX 로 변환한 모델이 같은 입력에 같은 결과를 내는지 확인"""
+
+    def test_savedmodel_onnx_parity(self):
+        saved = SavedModelBackend(MODEL_DIR)
+        onnx = ONNXBackend(ONNX_PATH)
+        saved.load()
+        onnx.load()
+        self.assertEqual(saved.output_dim(), onnx.output_dim())
+
+        batch = sample_batch()
+        expected = self.assert_contract(saved, batch)
+        actual = self.assert_contract(onnx, batch)
+        np.testing.assert_array_equal(actual.argmax(axis=1), expected.argmax(axis=1))
+        np.testing.assert_allclose(actual, expected, atol=1e-3)
+
+    def test_stub_matches_model_shape(self):
+        # stub 백엔드는 실제 모델 대신 부하 시험에 쓰이므로 출력 형식이 같아야 한다
+        saved = SavedModelBackend(MODEL_DIR)
+        saved.load()
+        stub = StubBackend(num_classes=int(saved.output_dim()))
+        stub.load()
+        batch = sample_batch(2)
+        self.assertEqual(self.assert_contract(stub, batch).shape, self.assert_contract(saved, batch).shape)
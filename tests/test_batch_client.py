@@ -0,0 +1,138 @@
+import contextlib
+import csv
+import io
+import json
+import os
+import socket
+import tempfile
+import unittest
+
+import support
+
+batch = support.load_client("batch")
+
+
+def image_dir(count: int, extra=None) -> str:
+    """JPEG count 개(하위 디렉토리 포함)와 extra {이름: 내용} 을 담은 임시 디렉토리"""
+    directory = tempfile.mkdtemp()
+    os.mkdir(os.path.join(directory, "sub"))
+    for i in range(count):
+        name = os.path.join("sub" if i % 2 else "", f"img{i:02d}.jpg")
+        with open(os.path.join(directory, name), "wb") as f:
+            f.write(support.jpeg_bytes((40 * i % 256, 100, 50)))
+    for name, data in (extra or {}).items():
+        with open(os.path.join(directory, name), "wb") as f:
+            f.write(data)
+    return directory
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def read_jsonl(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class HelperTest(unittest.TestCase):
+    def test_iter_paths_walks_sorted_and_filters_extensions(self):
+        directory = image_dir(3, {"notes.txt": b"x"})
+        listing = os.path.join(directory, "list.txt")
+        with open(listing, "w", encoding="utf-8") as f:
+            f.write("# 주석\n\n/elsewhere/a.jpg\n")
+        args = batch.build_parser().parse_args([directory, "--files-from", listing, "-o", "out.csv"])
+        paths = list(batch.iter_paths(args))
+        self.assertEqual([os.path.relpath(p, directory) for p in paths[:3]],
+                         ["img00.jpg", "img02.jpg", os.path.join("sub", "img01.jpg")])
+        self.assertEqual(paths[3:], ["/elsewhere/a.jpg"])
+
+    def test_read_done_skips_failed_and_truncated_lines(self):
+        path = os.path.join(tempfile.mkdtemp(), "out.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"path": "a", "status": "ok"}) + "\n")
+            f.write(json.dumps({"path": "b", "status": "failed"}) + "\n")
+            f.write(json.dumps({"path": "c", "status": "rejected"}) + "\n")
+            f.write('{"path": "d", "sta')
+        self.assertEqual(batch.read_done(path, "jsonl"), {"a", "c"})
+
+    def test_writer_appends_after_truncated_line(self):
+        path = os.path.join(tempfile.mkdtemp(), "out.csv")
+        writer = batch.ResultWriter(path, "csv", append=False)
+        writer.write({"path": "a", "status": "ok"})
+        writer.close()
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("b,fai")
+        writer = batch.ResultWriter(path, "csv", append=True)
+        writer.write({"path": "c", "status": "ok"})
+        writer.close()
+        self.assertEqual(batch.read_done(path, "csv"), {"a", "c"})
+
+    def test_busy_retry_after(self):
+        self.assertEqual(batch.busy_retry_after('{"retry_after_ms": 1500}'), 1.5)
+        self.assertEqual(batch.busy_retry_after("서버가 바쁩니다."), 0.0)
+        self.assertEqual(batch.busy_retry_after("[1]"), 0.0)
+
+
+class BatchRunTest(unittest.TestCase):
+    def run_batch(self, *argv) -> int:
+        with contextlib.redirect_stderr(io.StringIO()):
+            return batch.main(list(argv))
+
+    def setUp(self):
+        _, (self.host, self.port) = support.start_server(self)
+        self.server_args = ["--host", self.host, "--port", str(self.port), "--concurrency", "2",
+                            "--progress", "0"]
+
+    def test_classifies_directory_and_rejects_unreadable_files(self):
+        directory = image_dir(5, {"broken.jpg": b"not an image", "empty.jpg": b""})
+        output = os.path.join(tempfile.mkdtemp(), "out.jsonl")
+        # 거부된 항목이 있으면 종료 코드 1
+        self.assertEqual(self.run_batch(directory, "-o", output, *self.server_args), 1)
+        records = {os.path.basename(r["path"]): r for r in read_jsonl(output)}
+        self.assertEqual(len(records), 7)
+        self.assertEqual(records["broken.jpg"]["status"], batch.STATUS_REJECTED)
+        self.assertEqual(records["empty.jpg"]["status"], batch.STATUS_REJECTED)
+        ok = [r for r in records.values() if r["status"] == batch.STATUS_OK]
+        self.assertEqual(len(ok), 5)
+        self.assertTrue(all(r["en_class"].startswith("flower") and r["top_k"] for r in ok))
+
+    def test_resume_skips_done_paths(self):
+        directory = image_dir(3)
+        output = os.path.join(tempfile.mkdtemp(), "out.csv")
+        self.assertEqual(self.run_batch(directory, "-o", output, *self.server_args), 0)
+        # 결과 파일이 있으면 --resume/--overwrite 없이는 실행하지 않는다
+        with self.assertRaises(SystemExit):
+            self.run_batch(directory, "-o", output, *self.server_args)
+
+        with open(os.path.join(directory, "img09.jpg"), "wb") as f:
+            f.write(support.jpeg_bytes())
+        self.run_batch(directory, "-o", output, "--resume", *self.server_args)
+        with open(output, encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(len({row["path"] for row in rows}), 4)
+        self.assertTrue(all(row["status"] == batch.STATUS_OK for row in rows))
+
+    def test_archive_mode_with_jpeg_upload(self):
+        directory = image_dir(5, {"broken.jpg": b"not an image"})
+        output = os.path.join(tempfile.mkdtemp(), "out.jsonl")
+        self.run_batch(directory, "-o", output, "--archive", "4", "--upload", "jpeg", "--upload-size", "32x32",
+                       *self.server_args)
+        statuses = sorted(r["status"] for r in read_jsonl(output))
+        self.assertEqual(statuses, [batch.STATUS_OK] * 5 + [batch.STATUS_REJECTED])
+
+    def test_unreachable_server_fails_after_retries(self):
+        directory = image_dir(1)
+        output = os.path.join(tempfile.mkdtemp(), "out.jsonl")
+        self.server_args[3] = str(free_port())
+        self.run_batch(directory, "-o", output, "--retries", "1", "--backoff", "0.01", *self.server_args)
+        [record] = read_jsonl(output)
+        self.assertEqual(record["status"], batch.STATUS_FAILED)
+        self.assertEqual(record["attempts"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import threading
+import time
+import unittest
+
+import numpy as np
+
+import support  # noqa: F401  (server/ 경로 추가)
+from batching import InferenceBatcher
+
+SHAPE = (4, 4, 3)
+NUM_CLASSES = 5
+
+
+def image(value: int) -> np.ndarray:
+    return np.full(SHAPE, value, dtype=np.uint8)
+
+
+class RecordingInfer:
+    """배치 크기를 기록하고, 이미지 평균값에 따라 1순위 클래스가 정해지는 가짜 추론 함수"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.batch_sizes = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, batch: np.ndarray) -> np.ndarray:
+        self.release.wait()
+        self.batch_sizes.append(len(batch))
+        if self.delay:
+            time.sleep(self.delay)
+        outputs = np.zeros((len(batch), NUM_CLASSES), dtype=np.float32)
+        for i, item in enumerate(batch):
+            outputs[i, int(round(float(item.mean()) * 255)) % NUM_CLASSES] = 1.0
+        return outputs
+
+
+class InferenceBatcherTest(unittest.TestCase):
+    def make(self, infer, **kwargs) -> InferenceBatcher:
+        batcher = InferenceBatcher(infer, input_shape=SHAPE, top_k=3, **kwargs)
+        batcher.start()
+        self.addCleanup(batcher.stop, 1.0)
+        return batcher
+
+    def test_results_match_inputs(self):
+        batcher = self.make(RecordingInfer(), max_batch_size=4, max_wait_ms=5)
+        futures = [batcher.submit(image(i)) for i in range(10)]
+        for i, future in enumerate(futures):
+            prediction = future.result(timeout=5)
+            self.assertEqual(int(prediction.top_indices[0]), i % NUM_CLASSES)
+            self.assertIn("queue", prediction.timings)
+            self.assertIn("inference", prediction.timings)
+
+    def test_lone_request_does_not_wait_for_batch(self):
+        # 한가한 서버에서 요청 하나가 max_batch_wait 만큼 기다리면 안 된다
+        batcher = self.make(RecordingInfer(), max_batch_size=16, max_wait_ms=500)
+        started = time.perf_counter()
+        batcher.submit(image(1)).result(timeout=5)
+        self.assertLess(time.perf_counter() - started, 0.25)
+
+    def test_queued_requests_share_a_batch(self):
+        infer = RecordingInfer()
+        infer.release.clear()
+        batcher = self.make(infer, max_batch_size=8, max_wait_ms=50)
+        # 첫 배치가 추론 중인 동안 쌓인 요청은 다음 배치 하나로 묶인다
+        first = batcher.submit(image(0))
+        time.sleep(0.05)
+        rest = [batcher.submit(image(i)) for i in range(1, 7)]
+        infer.release.set()
+        for future in [first] + rest:
+            future.result(timeout=5)
+        self.assertEqual(infer.batch_sizes, [1, 6])
+
+    def test_submit_many_is_not_split(self):
+        infer = RecordingInfer()
+        batcher = self.make(infer, max_batch_size=4, max_wait_ms=0)
+        futures = batcher.submit_many([image(i) for i in range(8)])
+        for future in futures:
+            future.result(timeout=5)
+        self.assertEqual(infer.batch_sizes, [4, 4])
+
+    def test_infer_error_fails_whole_batch(self):
+        def broken(batch):
+            raise RuntimeError("boom")
+
+        batcher = self.make(broken, max_batch_size=4)
+        with self.assertRaises(RuntimeError):
+            batcher.submit(image(0)).result(timeout=5)
+
+    def test_stop_fails_queued_requests_when_worker_is_stuck(self):
+        infer = RecordingInfer()
+        infer.release.clear()
+        batcher = InferenceBatcher(infer, input_shape=SHAPE, max_batch_size=1, max_wait_ms=0)
+        batcher.start()
+        stuck = batcher.submit(image(0))
+        time.sleep(0.05)
+        queued = [batcher.submit(image(i)) for i in range(3)]
+
+        batcher.stop(timeout=0.1)
+        for future in queued:
+            with self.assertRaises(RuntimeError):
+                future.result(timeout=1)
+        # 종료 후 들어온 요청도 멈추지 않고 바로 실패한다
+        with self.assertRaises(RuntimeError):
+            batcher.submit(image(0)).result(timeout=1)
+
+        infer.release.set()
+        stuck.result(timeout=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
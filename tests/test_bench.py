@@ -0,0 +1,90 @@
+import contextlib
+import io
+import json
+import os
+import random
+import tempfile
+import unittest
+
+from PIL import Image
+
+import support
+
+bench = support.load_client("bench")
+
+
+class HelperTest(unittest.TestCase):
+    def test_parse_sizes(self):
+        self.assertEqual(bench.parse_sizes("640x480:0.5, 1920X1080:0.5,"),
+                         [((640, 480), 0.5), ((1920, 1080), 0.5)])
+        self.assertEqual(bench.parse_sizes("32x32"), [((32, 32), 1.0)])
+
+    def test_percentile_is_nearest_rank(self):
+        values = [float(v) for v in range(1, 101)]
+        self.assertEqual(bench.percentile(values, 0.50), 50.0)
+        self.assertEqual(bench.percentile(values, 0.99), 99.0)
+        self.assertEqual(bench.percentile(values, 1.0), 100.0)
+        self.assertEqual(bench.percentile([], 0.5), 0.0)
+
+    def test_summarize_counts_errors(self):
+        recorder = bench.Recorder()
+        recorder.add(0.010, 100)
+        recorder.add(0.030, 100)
+        recorder.add(0.5, 100, "timeout")
+        result = bench.summarize(recorder, 2.0)
+        self.assertEqual(result["requests"], 3)
+        self.assertEqual(result["ok"], 2)
+        self.assertEqual(result["error_kinds"], {"timeout": 1})
+        self.assertEqual(result["throughput_rps"], 1.0)
+        self.assertEqual(result["latency_ms"]["mean"], 20.0)
+        self.assertEqual(result["latency_ms"]["max"], 30.0)
+
+    def test_synthetic_jpeg_has_requested_size(self):
+        data = bench.synthetic_jpeg((48, 32), random.Random(0), 80)
+        with Image.open(io.BytesIO(data)) as image:
+            self.assertEqual((image.format, image.size), ("JPEG", (48, 32)))
+
+    def test_cache_bust_changes_every_request(self):
+        picker = bench.ImagePicker([b"jpeg"], None, seed=0, cache_bust=True)
+        first, second = picker.pick(), picker.pick()
+        self.assertTrue(first.startswith(b"jpeg"))
+        self.assertNotEqual(first, second)
+        self.assertEqual(bench.ImagePicker([b"jpeg"], None, 0, False).pick(), b"jpeg")
+
+
+class BenchRunTest(unittest.TestCase):
+    def run_bench(self, *extra):
+        _, (host, port) = support.start_server(self)
+        output = os.path.join(tempfile.mkdtemp(), "result.json")
+        argv = ["--host", host, "--port", str(port), "--duration", "0", "--requests", "6",
+                "--warmup", "0", "--concurrency", "2", "--sizes", "64x48", "--output", output, *extra]
+        with contextlib.redirect_stderr(io.StringIO()):
+            status = bench.main(argv)
+        with open(output, encoding="utf-8") as f:
+            return status, json.load(f)
+
+    def test_closed_loop_frame(self):
+        status, report = self.run_bench()
+        self.assertEqual(status, 0)
+        self.assertEqual(report["result"]["requests"], 6)
+        self.assertEqual(report["result"]["errors"], 0)
+
+    def test_open_loop_legacy(self):
+        status, report = self.run_bench("--mode", "open", "--rate", "200", "--protocol", "legacy")
+        self.assertEqual(status, 0)
+        self.assertEqual(report["result"]["ok"], 6)
+
+    def test_compare_reports_change(self):
+        _, report = self.run_bench()
+        path = os.path.join(tempfile.mkdtemp(), "baseline.json")
+        baseline = json.loads(json.dumps(report))
+        baseline["result"]["throughput_rps"] = report["result"]["throughput_rps"] / 2
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(baseline, f)
+        lines = bench.compare(report["result"], path)
+        self.assertTrue(lines[0].startswith("throughput_rps"))
+        self.assertIn("+100.0%", lines[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import io
+import socket
+import unittest
+
+from PIL import Image
+
+import support
+from protocol import FRAME_ERROR, HEADER_SIZE, BufferPool, BufferReader
+
+
+class BufferPoolTest(unittest.TestCase):
+    def test_reuses_released_buffer(self):
+        pool = BufferPool()
+        view = pool.acquire(1000)
+        self.assertEqual(len(view), 1000)
+        buf = view.obj
+        self.assertEqual(len(buf), BufferPool.MIN_BUFFER_SIZE)
+        pool.release(view)
+        again = pool.acquire(2000)
+        self.assertIs(again.obj, buf)
+
+    def test_size_classes_are_powers_of_two(self):
+        pool = BufferPool()
+        view = pool.acquire(BufferPool.MIN_BUFFER_SIZE + 1)
+        self.assertEqual(len(view.obj), BufferPool.MIN_BUFFER_SIZE * 2)
+
+    def test_pooled_bytes_are_capped(self):
+        pool = BufferPool(max_pooled_bytes=BufferPool.MIN_BUFFER_SIZE)
+        first, second = pool.acquire(10), pool.acquire(10)
+        pool.release(first)
+        pool.release(second)
+        self.assertEqual(pool._pooled_bytes, BufferPool.MIN_BUFFER_SIZE)
+
+    def test_reader_decodes_image_without_copy(self):
+        data = support.jpeg_bytes(size=(32, 16))
+        pool = BufferPool()
+        view = pool.acquire(len(data))
+        view[:] = data
+        with Image.open(BufferReader(view)) as image:
+            self.assertEqual(image.size, (32, 16))
+        reader = BufferReader(b"abcdef")
+        reader.seek(-2, io.SEEK_END)
+        self.assertEqual(reader.read(), b"ef")
+        pool.release(view)
+
+
+class PayloadLimitTest(unittest.TestCase):
+    """선언된 크기가 한도를 넘으면 본문을 받기 전에 거절"""
+
+    def test_legacy_request_over_limit(self):
+        _, address = support.start_server(self, max_payload_bytes=1024)
+        with socket.create_connection(address, timeout=5) as sock:
+            sock.sendall((10 ** 9).to_bytes(HEADER_SIZE, "big"))
+            reply = sock.recv(4096).decode("utf-8")
+        self.assertIn("너무 큽니다", reply)
+
+    def test_frame_over_limit_is_connection_error(self):
+        _, address = support.start_server(self, max_payload_bytes=1024)
+        client_protocol = support.load_client("protocol")
+        client = client_protocol.FrameConnection(address)
+        with client:
+            request_id = client.send_request(b"x" * 2048)
+            rid, frame_type, payload = client.recv_response()
+        self.assertNotEqual(request_id, 0)
+        self.assertEqual((rid, frame_type), (0, FRAME_ERROR))
+        self.assertIn("1024", payload.decode("utf-8"))
@@ -0,0 +1,121 @@
+import os
+import tempfile
+import threading
+import unittest
+
+import numpy as np
+
+import support  # noqa: F401
+from cache import PredictionCache, SqliteStore, content_key
+from results import prediction_from_vector
+
+
+def prediction(values):
+    return prediction_from_vector(np.asarray(values, dtype=np.float32), 3, {})
+
+
+class FailingStore:
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, key):
+        self.calls += 1
+        raise OSError("disk I/O error")
+
+    def put(self, key, created, value):
+        pass
+
+    def delete(self, key):
+        pass
+
+    def close(self):
+        pass
+
+
+class PredictionCacheTest(unittest.TestCase):
+    def test_hit_after_complete(self):
+        cache = PredictionCache(1 << 20)
+        future, leader = cache.begin(b"k")
+        self.assertTrue(leader)
+        cache.complete(b"k", prediction([0.1, 0.7, 0.2]))
+        self.assertEqual(int(future.result(timeout=1).top_indices[0]), 1)
+
+        cached, leader = cache.begin(b"k")
+        self.assertFalse(leader)
+        self.assertTrue(cached.result(timeout=1).cached)
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_concurrent_requests_are_coalesced(self):
+        cache = PredictionCache(1 << 20)
+        first, leader = cache.begin(b"k")
+        second, follower = cache.begin(b"k")
+        self.assertTrue(leader)
+        self.assertFalse(follower)
+        self.assertIs(first, second)
+        cache.complete(b"k", prediction([1.0, 0.0]))
+        self.assertEqual(cache.stats()["coalesced"], 1)
+
+    def test_failure_is_shared_and_not_cached(self):
+        cache = PredictionCache(1 << 20)
+        future, _ = cache.begin(b"k")
+        follower, _ = cache.begin(b"k")
+        cache.fail(b"k", ValueError("bad image"))
+        with self.assertRaises(ValueError):
+            follower.result(timeout=1)
+        _, leader = cache.begin(b"k")
+        self.assertTrue(leader)
+
+    def test_failing_store_falls_back_to_miss(self):
+        # 디스크 조회가 실패해도 같은 키의 이후 요청이 끝나지 않는 Future 에 묶이면 안 된다
+        store = FailingStore()
+        cache = PredictionCache(1 << 20, store=store)
+        future, leader = cache.begin(b"k")
+        self.assertTrue(leader)
+        follower, is_leader = cache.begin(b"k")
+        self.assertFalse(is_leader)
+        cache.complete(b"k", prediction([0.2, 0.8]))
+        self.assertEqual(int(follower.result(timeout=1).top_indices[0]), 1)
+        self.assertEqual(cache.stats()["store_errors"], 1)
+
+    def test_lru_eviction_respects_byte_limit(self):
+        vector = [0.5] * 64
+        cost = np.asarray(vector, dtype=np.float32).nbytes + 256
+        cache = PredictionCache(cost * 2)
+        for key in (b"a", b"b", b"c"):
+            cache.begin(key)
+            cache.complete(key, prediction(vector))
+        self.assertEqual(cache.stats()["entries"], 2)
+        self.assertEqual(cache.stats()["evictions"], 1)
+        _, leader = cache.begin(b"a")
+        self.assertTrue(leader)
+
+    def test_ttl_expires_entries(self):
+        cache = PredictionCache(1 << 20, ttl=0.01)
+        cache.begin(b"k")
+        cache.complete(b"k", prediction([1.0, 0.0]))
+        threading.Event().wait(0.05)
+        _, leader = cache.begin(b"k")
+        self.assertTrue(leader)
+        self.assertEqual(cache.stats()["expirations"], 1)
+
+    def test_sqlite_store_survives_restart(self):
+        path = os.path.join(tempfile.mkdtemp(), "cache.db")
+        cache = PredictionCache(1 << 20, store=SqliteStore(path))
+        cache.begin(b"k")
+        cache.complete(b"k", prediction([0.1, 0.9]))
+        cache.close()
+
+        cache = PredictionCache(1 << 20, store=SqliteStore(path))
+        self.addCleanup(cache.close)
+        future, leader = cache.begin(b"k")
+        self.assertFalse(leader)
+        self.assertEqual(int(future.result(timeout=1).top_indices[0]), 1)
+        self.assertEqual(cache.stats()["disk_hits"], 1)
+
+    def test_content_key_depends_on_bytes(self):
+        self.assertEqual(content_key(b"abc"), content_key(bytearray(b"abc")))
+        self.assertNotEqual(content_key(b"abc"), content_key(b"abd"))
+
+
+if __name__ == '__main__':
+    unittest.main()
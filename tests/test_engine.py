@@ -0,0 +1,66 @@
+import queue
+import tempfile
+import types
+import unittest
+
+import support
+from engine import FlowerServer
+from protocol import HEADER_SIZE
+
+
+def classify_legacy(address, data: bytes) -> str:
+    import socket
+
+    with socket.create_connection(address, timeout=5) as sock:
+        sock.sendall(len(data).to_bytes(HEADER_SIZE, "big") + data)
+        chunks = []
+        while True:
+            chunk = sock.recv(4096)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    return b"".join(chunks).decode("utf-8")
+
+
+class HeadlessEngineTest(unittest.TestCase):
+    def test_runs_without_ui_and_reports_state(self):
+        events = queue.Queue()
+        server = FlowerServer(support.stub_config(tempfile.mkdtemp()))
+        server.add_observer(events.put)
+        self.assertTrue(server.load_model_and_labels())
+        self.assertTrue(server.start())
+        try:
+            address = server.server_socket.getsockname()[:2]
+            self.assertIn("flower", classify_legacy(address, support.jpeg_bytes()))
+        finally:
+            server.stop()
+        states = [event.data["running"] for event in list(events.queue) if event.kind == "state"]
+        self.assertEqual(states, [True, False])
+
+    def test_start_without_model_is_rejected(self):
+        server = FlowerServer(support.stub_config(tempfile.mkdtemp()))
+        self.assertFalse(server.start())
+        self.assertFalse(server.running)
+
+    def test_legacy_bad_image_gets_error_text(self):
+        _, address = support.start_server(self)
+        self.assertIn("실패", classify_legacy(address, b"not an image"))
+
+
+class UIStartTest(unittest.TestCase):
+    def test_rejected_start_posts_state_event(self):
+        try:
+            from ui import FlowerServerUI
+        except ImportError as e:  # tkinter 가 없는 환경
+            self.skipTest(str(e))
+        server = FlowerServer(support.stub_config(tempfile.mkdtemp()))
+        fake = types.SimpleNamespace(server=server, events=queue.Queue())
+        # 위젯 없이 백그라운드 시작 경로만 실행 (모델이 없으므로 거절된다)
+        FlowerServerUI._start_in_background(fake)
+        event = fake.events.get_nowait()
+        self.assertEqual(event.kind, "state")
+        self.assertFalse(event.data["running"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import contextlib
+import importlib.util
+import io
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import support
+from backends import SavedModelBackend, TFLiteBackend
+from export_model import agreement, convert_tflite, list_images, load_inputs, main, server_hint
+from preprocess import MODEL_INPUT_SHAPE, decode_image, normalize_into
+
+MODEL_DIR = os.environ.get("FLOWER_MODEL_DIR", os.path.join(support.SERVER_DIR, "model"))
+
+HAS_TF = importlib.util.find_spec("tensorflow") is not None
+
+
+class HelperTest(unittest.TestCase):
+    def test_list_images_is_sorted_and_limited(self):
+        directory = tempfile.mkdtemp()
+        os.mkdir(os.path.join(directory, "b"))
+        for name in ("c.JPG", "a.png", "notes.txt", os.path.join("b", "d.jpeg")):
+            with open(os.path.join(directory, name), "wb") as f:
+                f.write(support.jpeg_bytes())
+        paths = [os.path.relpath(p, directory) for p in list_images(directory, 0)]
+        self.assertEqual(paths, ["a.png", "c.JPG", os.path.join("b", "d.jpeg")])
+        self.assertEqual(len(list_images(directory, 2)), 2)
+
+    def test_load_inputs_matches_server_preprocessing(self):
+        # 보정/비교 입력은 서버와 같은 전처리를 거쳐야 양자화 결과가 서버 입력 분포에 맞는다
+        path = os.path.join(tempfile.mkdtemp(), "a.jpg")
+        with open(path, "wb") as f:
+            f.write(support.jpeg_bytes((10, 120, 240), (400, 300)))
+        missing = path + ".missing"
+        with contextlib.redirect_stderr(io.StringIO()) as stderr:
+            inputs = load_inputs([path, missing])
+        self.assertIn(missing, stderr.getvalue())
+        with open(path, "rb") as f:
+            expected = normalize_into(np.empty((1,) + MODEL_INPUT_SHAPE, np.float32), [decode_image(f.read())])
+        np.testing.assert_array_equal(inputs, expected)
+
+    def test_load_inputs_random_is_reproducible(self):
+        first, second = load_inputs([], count=2, seed=3), load_inputs([], count=2, seed=3)
+        self.assertEqual(first.shape, (2,) + MODEL_INPUT_SHAPE)
+        np.testing.assert_array_equal(first, second)
+
+    def test_agreement(self):
+        baseline = np.array([[0.9, 0.1], [0.2, 0.8]], dtype=np.float32)
+        outputs = np.array([[0.7, 0.3], [0.6, 0.4]], dtype=np.float32)
+        result = agreement(outputs, baseline)
+        self.assertEqual(result["top1_agreement"], 0.5)
+        self.assertAlmostEqual(result["max_abs_diff"], 0.4, places=5)
+
+
+class MainTest(unittest.TestCase):
+    def run_main(self, *argv):
+        output = tempfile.mkdtemp()
+        with contextlib.redirect_stderr(io.StringIO()) as stderr:
+            status = main(["--model-dir", MODEL_DIR, "--output-dir", output, *argv])
+        return status, stderr.getvalue()
+
+    def test_hint_names_only_written_variants(self):
+        status, stderr = self.run_main("--variants", "xla", "--skip-report")
+        self.assertEqual(status, 0)
+        self.assertIn("--backend xla", stderr)
+        self.assertNotIn("model_int8.tflite", stderr)
+        self.assertEqual(server_hint({"savedmodel": {"path": MODEL_DIR}}), "")
+        self.assertIn("model_dynamic.tflite", server_hint({
+            "tflite_dynamic": {"path": "out/model_dynamic.tflite"}, "xla": {"path": MODEL_DIR}}))
+
+    def test_failed_conversion_is_reported(self):
+        # 보정 이미지가 없어 int8 변환이 실패하면 힌트 없이 실패 상태로 끝난다
+        status, stderr = self.run_main("--variants", "int8", "--skip-report")
+        self.assertEqual(status, 1)
+        self.assertIn("변환 실패", stderr)
+        self.assertNotIn("서버 실행 예", stderr)
+
+    def test_unreadable_eval_images_exit_clearly(self):
+        directory = tempfile.mkdtemp()
+        with open(os.path.join(directory, "broken.jpg"), "wb") as f:
+            f.write(b"not an image")
+        with self.assertRaises(SystemExit) as caught:
+            self.run_main("--variants", "xla", "--eval-dir", directory)
+        self.assertIn("평가 이미지를 하나도 읽지 못했습니다", str(caught.exception))
+
+
+@unittest.skipUnless(HAS_TF and os.path.isdir(MODEL_DIR), "tensorflow 와 SavedModel 이 필요합니다.")
+class ConvertTest(unittest.TestCase):
+    def test_dynamic_tflite_agrees_with_savedmodel(self):
+        inputs = load_inputs([], count=4, seed=0)
+        path = os.path.join(tempfile.mkdtemp(), "model.tflite")
+        with open(path, "wb") as f:
+            f.write(convert_tflite(MODEL_DIR, "dynamic"))
+        tflite = TFLiteBackend(path, [1, 4])
+        tflite.load()
+        baseline = SavedModelBackend(MODEL_DIR)
+        baseline.load()
+        result = agreement(tflite.infer_batch(inputs), baseline.infer_batch(inputs))
+        self.assertGreaterEqual(result["top1_agreement"], 0.75)
+
+    def test_int8_requires_calibration(self):
+        with self.assertRaises(ValueError):
+            convert_tflite(MODEL_DIR, "int8", np.empty((0,) + MODEL_INPUT_SHAPE, np.float32))
+
+
+if __name__ == '__main__':
+    unittest.main()
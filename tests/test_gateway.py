@@ -0,0 +1,111 @@
+import socket
+import time
+import unittest
+from unittest import mock
+
+import support
+import gateway as gateway_module
+from gateway import Gateway, BackendUnavailable, build_parser
+from protocol import FRAME_CLASSIFY, FRAME_ERROR, FRAME_RESULT, pack_frame
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until(predicate, timeout: float = 10.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return predicate()
+
+
+class GatewayTest(unittest.TestCase):
+    """stub 서버 복제본 앞의 게이트웨이 라우팅/장애 처리"""
+
+    def start_gateway(self, addresses, *extra):
+        spec = ",".join(f"{host}:{port}" for host, port in addresses)
+        args = build_parser().parse_args(["--host", "127.0.0.1", "--port", str(free_port()), "--backends", spec,
+                                          "--health-interval", "0.1", "--fall", "1", "--stats-interval", "0",
+                                          *extra])
+        gateway = Gateway(args)
+        gateway.start()
+        self.addCleanup(gateway.stop)
+        return gateway
+
+    def test_forwards_to_healthy_backend(self):
+        _, address = support.start_server(self)
+        gateway = self.start_gateway([address])
+        self.assertTrue(wait_until(lambda: gateway.backends[0].healthy))
+
+        client = support.load_client("protocol").FrameConnection(("127.0.0.1", gateway.args.port))
+        with client:
+            frame_type, text = client.request(support.jpeg_bytes())
+        self.assertEqual(frame_type, FRAME_RESULT)
+        self.assertIn("flower", text)
+
+    def test_fails_over_when_backend_stops(self):
+        first, address1 = support.start_server(self)
+        _, address2 = support.start_server(self)
+        gateway = self.start_gateway([address1, address2], "--retries", "2")
+        self.assertTrue(wait_until(lambda: all(b.healthy for b in gateway.backends)))
+
+        first.stop()
+        for _ in range(4):
+            frame_type, body = gateway.forward(support.jpeg_bytes(), 0)
+            self.assertEqual(frame_type, FRAME_RESULT, body)
+        self.assertTrue(wait_until(lambda: not gateway.backends[0].healthy))
+        self.assertTrue(gateway.backends[1].healthy)
+
+    def test_connect_failure_marks_backend_down(self):
+        gateway = self.start_gateway([("127.0.0.1", free_port())], "--health-interval", "60")
+        backend = gateway.backends[0]
+        backend.healthy = True
+        with self.assertRaises(BackendUnavailable):
+            gateway.forward(support.jpeg_bytes(), 0)
+        self.assertFalse(backend.healthy)
+
+    def test_rejected_request_keeps_backend_up(self):
+        _, address = support.start_server(self, max_payload_bytes=1024)
+        gateway = self.start_gateway([address], "--health-interval", "60")
+        backend = gateway.backends[0]
+        self.assertTrue(wait_until(lambda: backend.healthy))
+
+        # 백엔드가 읽지 못하는 큰 요청은 그 요청만 오류로 응답하고 백엔드는 그대로 둔다
+        frame_type, body = gateway.forward(b"x" * 4096, 0)
+        self.assertEqual(frame_type, FRAME_ERROR)
+        self.assertTrue(backend.healthy)
+
+        frame_type, body = gateway.forward(support.jpeg_bytes(size=(8, 8)), 0)
+        self.assertEqual(frame_type, FRAME_RESULT, body)
+        self.assertTrue(backend.healthy)
+
+    def test_timed_out_request_leaves_no_pending_entry(self):
+        _, address = support.start_server(self, stub_latency_ms=1000)
+        gateway = self.start_gateway([address], "--health-interval", "60", "--request-timeout", "0.2")
+        backend = gateway.backends[0]
+        self.assertTrue(wait_until(lambda: backend.healthy))
+
+        frame_type, body = gateway.forward(support.jpeg_bytes(), 0)
+        self.assertEqual(frame_type, FRAME_ERROR)
+        self.assertIn("시간 초과", body.decode("utf-8"))
+        self.assertEqual([c.in_flight for c in backend._connections], [0])
+        # 늦게 도착한 응답은 버리고 연결은 계속 쓴다
+        time.sleep(1.2)
+        self.assertTrue(backend._connections[0].usable)
+
+    def test_client_close_does_not_wait_past_drain_timeout(self):
+        _, address = support.start_server(self, stub_latency_ms=3000)
+        gateway = self.start_gateway([address], "--health-interval", "60")
+        self.assertTrue(wait_until(lambda: gateway.backends[0].healthy))
+
+        with mock.patch.object(gateway_module, "RESPONSE_DRAIN_TIMEOUT", 0.3):
+            with socket.create_connection(("127.0.0.1", gateway.args.port), timeout=5) as sock:
+                sock.sendall(pack_frame(FRAME_CLASSIFY, 1, support.jpeg_bytes()))
+                self.assertTrue(wait_until(lambda: len(gateway.clients) == 1))
+            # 백엔드 응답(3초)을 기다리지 않고 시간 제한 후 연결 처리 스레드가 끝난다
+            self.assertTrue(wait_until(lambda: len(gateway.clients) == 0, timeout=2.0))
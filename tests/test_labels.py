@@ -0,0 +1,34 @@
+import json
+import os
+import tempfile
+import unittest
+
+import support
+from labels import LabelRegistry, load_labels
+
+
+class LabelRegistryTest(unittest.TestCase):
+    def test_lookup_and_prebuilt_text(self):
+        labels = LabelRegistry(["rose"], ["장미"])
+        self.assertEqual(labels[0], ("rose", "장미"))
+        self.assertEqual(labels.text(0), "이 꽃은 장미(rose)인 것 같아요!")
+        self.assertEqual(labels.encoded_text(0), labels.text(0).encode("utf-8"))
+
+    def test_mismatched_lengths(self):
+        with self.assertRaises(ValueError):
+            LabelRegistry(["a", "b"], ["가"])
+        with self.assertRaises(ValueError):
+            LabelRegistry(["a"], ["가"]).validate(2)
+        LabelRegistry(["a"], ["가"]).validate(None)
+
+    def test_csv_and_json_round_trip(self):
+        directory = tempfile.mkdtemp()
+        labels = load_labels(support.write_labels(directory, 3))
+        self.assertEqual(len(labels), 3)
+        self.assertEqual(labels[2], ("flower2", "꽃2"))
+
+        path = os.path.join(directory, "labels.json")
+        labels.save_json(path, "hash")
+        with open(path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["source_hash"], "hash")
+        self.assertEqual(load_labels(path)[1], labels[1])
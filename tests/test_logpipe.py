@@ -0,0 +1,88 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+import support
+from logpipe import LogPipeline
+from metrics import MetricsRegistry
+
+
+class LogPipelineTest(unittest.TestCase):
+    def make_pipeline(self, **overrides):
+        pipeline = LogPipeline(support.stub_config(tempfile.mkdtemp(), **overrides), MetricsRegistry())
+        self.addCleanup(pipeline.close)
+        return pipeline
+
+    def wait_for(self, pipeline, count: int, timeout: float = 5.0) -> list:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            entries, _ = pipeline.since(0)
+            if len(entries) >= count:
+                return entries
+            time.sleep(0.01)
+        return pipeline.since(0)[0]
+
+    def test_entries_reach_ring_buffer(self):
+        pipeline = self.make_pipeline(log_sample_threshold=0)
+        pipeline.submit("첫 번째")
+        pipeline.submit("두 번째", "ERROR")
+        entries = self.wait_for(pipeline, 2)
+        self.assertEqual([level for _, level, _ in entries], ["INFO", "ERROR"])
+        self.assertTrue(entries[1][2].endswith("[ERROR] 두 번째"))
+
+    def test_sampling_counts_are_exact_across_threads(self):
+        pipeline = self.make_pipeline(log_sampling="INFO=10")
+        # 부하 구간으로 고정 (RATE_WINDOW 가 지나기 전에는 다시 계산하지 않는다)
+        pipeline.loaded = True
+        pipeline._window_start = time.monotonic()
+        accepted = []
+
+        def run():
+            accepted.append(sum(pipeline._accept("INFO") for _ in range(2000)))
+
+        threads = [threading.Thread(target=run) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sum(accepted), 8 * 2000 // 10)
+        self.assertEqual(next(pipeline._submitted), 8 * 2000)
+        self.assertTrue(pipeline._accept("ERROR"))
+
+    def test_writer_turns_sampling_on_and_off(self):
+        pipeline = self.make_pipeline(log_sample_threshold=100)
+        pipeline._window_start = time.monotonic() - 1.0
+        for _ in range(500):
+            pipeline._accept("INFO")
+        pipeline._update_load()
+        self.assertTrue(pipeline.loaded)
+        pipeline._window_start = time.monotonic() - 1.0
+        pipeline._update_load()
+        self.assertFalse(pipeline.loaded)
+
+    def test_close_and_restart(self):
+        path = os.path.join(tempfile.mkdtemp(), "server.log")
+        pipeline = self.make_pipeline(log_sample_threshold=0, log_file=path)
+        pipeline.submit("첫 번째")
+        pipeline.close()
+        self.assertFalse(pipeline._thread.is_alive())
+        self.assertIsNone(pipeline.file)
+        pipeline.submit("닫힌 동안")
+        pipeline.start()
+        pipeline.submit("다시 시작")
+        self.assertEqual(len(self.wait_for(pipeline, 3)), 3)
+        pipeline.close()
+        with open(path, encoding="utf-8") as f:
+            self.assertEqual(len(f.read().splitlines()), 3)
+
+
+class ServerLogTest(unittest.TestCase):
+    def test_stop_closes_pipeline_and_restart_reopens_it(self):
+        server, _ = support.start_server(self)
+        server.stop()
+        self.assertFalse(server.logs._thread.is_alive())
+        self.assertTrue(server.logs.since(0)[0][-1][2].endswith("서버가 중지되었습니다."))
+        self.assertTrue(server.start())
+        self.assertTrue(server.logs._thread.is_alive())
@@ -0,0 +1,75 @@
+import threading
+import unittest
+
+import support
+from metrics import Counter, Histogram, MetricsRegistry
+from test_engine import classify_legacy
+
+client_protocol = support.load_client("protocol")
+
+
+class CounterTest(unittest.TestCase):
+    def test_concurrent_increments(self):
+        counter = Counter()
+
+        def run():
+            for _ in range(10000):
+                counter.inc()
+
+        threads = [threading.Thread(target=run) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        counter.dec(5)
+        self.assertEqual(counter.value(), 80000 - 5)
+
+
+class HistogramTest(unittest.TestCase):
+    def test_buckets_and_quantiles(self):
+        histogram = Histogram([1, 10, 100])
+        for value in (0.5, 5, 5, 50, 500):
+            histogram.observe(value)
+        snap = histogram.snapshot()
+        self.assertEqual(snap["counts"], [1, 2, 1, 1])
+        self.assertEqual(snap["count"], 5)
+        self.assertAlmostEqual(snap["sum"], 560.5)
+        self.assertAlmostEqual(Histogram.quantile(snap, 0.5), 1 + 9 * 1.5 / 2)
+        self.assertEqual(Histogram.quantile(snap, 1.0), 100)
+        self.assertEqual(Histogram.quantile(Histogram([1]).snapshot(), 0.5), 0.0)
+
+
+class RegistryTest(unittest.TestCase):
+    def test_prometheus_text(self):
+        registry = MetricsRegistry()
+        registry.counter("demo_total", "설명", kind="a").inc(3)
+        registry.register_callback("demo_gauge", "설명", lambda: 7)
+        registry.histogram("demo_ms", "설명", [1, 2]).observe(1.5)
+        text = registry.render_prometheus()
+        self.assertIn('# TYPE demo_total counter', text)
+        self.assertIn('demo_total{kind="a"} 3', text)
+        self.assertIn('demo_gauge 7', text)
+        self.assertIn('demo_ms_bucket{le="2"} 1', text)
+        self.assertIn('demo_ms_bucket{le="+Inf"} 1', text)
+        self.assertEqual(registry.snapshot()["demo_total{kind=a}"], 3)
+
+    def test_server_records_request_path(self):
+        server, address = support.start_server(self)
+        classify_legacy(address, support.jpeg_bytes())
+        snapshot = server.metrics.registry.snapshot()
+        self.assertEqual(snapshot["flower_requests_total"], 1)
+        self.assertGreater(snapshot["flower_received_bytes_total"], 0)
+        for stage in ("receive", "decode", "inference"):
+            self.assertEqual(snapshot[f"flower_stage_latency_ms{{stage={stage}}}"]["count"], 1, stage)
+
+    def test_rejected_requests_are_not_counted_in_either_mode(self):
+        # flower_requests_total 은 두 연결 처리 방식 모두 수락 제어를 통과한 요청만 센다
+        for mode in ("thread", "asyncio"):
+            with self.subTest(mode=mode):
+                server, address = support.start_server(self, mode=mode, rate_limit=0.001, rate_burst=1)
+                with client_protocol.FrameConnection(address) as client:
+                    frame_types = [client.request(support.jpeg_bytes())[0] for _ in range(3)]
+                self.assertEqual(frame_types, [client_protocol.FRAME_RESULT] + [client_protocol.FRAME_BUSY] * 2)
+                snapshot = server.metrics.registry.snapshot()
+                self.assertEqual(snapshot["flower_requests_total"], 1)
+                self.assertEqual(snapshot["flower_rejected_total{reason=rate_limited}"], 2)
@@ -0,0 +1,58 @@
+import io
+import unittest
+
+import numpy as np
+from PIL import Image
+
+import support  # noqa: F401
+from preprocess import MODEL_INPUT_SHAPE, RAW_INPUT_BYTES, decode_image, normalize_into, raw_to_array
+
+
+def encode(image: Image.Image, fmt: str, **options) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, fmt, **options)
+    return buffer.getvalue()
+
+
+class DecodeImageTest(unittest.TestCase):
+    def test_large_jpeg_is_resized(self):
+        timings = {}
+        arr = decode_image(memoryview(encode(Image.new("RGB", (1600, 1200), (10, 200, 30)), "JPEG")), timings)
+        self.assertEqual(arr.shape, MODEL_INPUT_SHAPE)
+        self.assertEqual(arr.dtype, np.uint8)
+        self.assertTrue(np.allclose(arr[150, 150], (10, 200, 30), atol=3))
+        self.assertEqual(set(timings), {"decode", "preprocess"})
+
+    def test_grayscale_and_palette_become_rgb(self):
+        gray = decode_image(encode(Image.new("L", (50, 40), 128), "PNG"))
+        self.assertEqual(gray.shape, MODEL_INPUT_SHAPE)
+        self.assertTrue((gray == 128).all())
+
+        palette = Image.new("P", (20, 20), 0)
+        palette.putpalette([255, 0, 0] + [0, 0, 0] * 255)
+        self.assertTrue((decode_image(encode(palette, "PNG"))[..., 0] == 255).all())
+
+    def test_raw_rgb_is_copied(self):
+        data = bytearray(np.arange(RAW_INPUT_BYTES, dtype=np.uint64).astype(np.uint8).tobytes())
+        arr = decode_image(memoryview(data), raw=True)
+        data[:] = bytes(len(data))    # 수신 버퍼를 재사용해도 결과는 그대로
+        self.assertEqual(arr.shape, MODEL_INPUT_SHAPE)
+        self.assertEqual(int(arr[0, 0, 1]), 1)
+        with self.assertRaises(ValueError):
+            raw_to_array(b"\x00" * 10)
+
+    def test_invalid_data(self):
+        with self.assertRaises(Exception):
+            decode_image(b"not an image")
+
+
+class NormalizeTest(unittest.TestCase):
+    def test_normalizes_into_preallocated_buffer(self):
+        out = np.full((4,) + MODEL_INPUT_SHAPE, -1.0, dtype=np.float32)
+        images = [np.full(MODEL_INPUT_SHAPE, 255, dtype=np.uint8), np.zeros(MODEL_INPUT_SHAPE, dtype=np.uint8)]
+        batch = normalize_into(out, images)
+        self.assertEqual(batch.shape[0], 2)
+        self.assertTrue(np.shares_memory(batch, out))
+        self.assertTrue(np.allclose(batch[0], 1.0))
+        self.assertTrue((batch[1] == 0.0).all())
+        self.assertTrue((out[2] == -1.0).all())
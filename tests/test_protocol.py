@@ -0,0 +1,66 @@
+import json
+import unittest
+
+import support
+import protocol
+from protocol import (
+    FLAG_JSON, FRAME_CLASSIFY, FRAME_ERROR, FRAME_HEADER_SIZE, FRAME_RESULT, FRAME_STATUS, HEADER_SIZE,
+    ProtocolError, is_frame_header, pack_frame, parse_frame_header,
+)
+
+client_protocol = support.load_client("protocol")
+
+
+class FrameFormatTest(unittest.TestCase):
+    def test_round_trip(self):
+        frame = pack_frame(FRAME_RESULT, 0xFFFFFFFF, b"payload", FLAG_JSON)
+        self.assertEqual(len(frame), FRAME_HEADER_SIZE + 7)
+        self.assertEqual(parse_frame_header(frame[:FRAME_HEADER_SIZE]), (FRAME_RESULT, FLAG_JSON, 0xFFFFFFFF, 7))
+        self.assertEqual(frame[FRAME_HEADER_SIZE:], b"payload")
+
+    def test_client_and_server_agree(self):
+        # 클라이언트는 서버 모듈을 import 하지 않고 같은 형식을 따로 정의한다
+        for name in ("FRAME_MAGIC", "PROTOCOL_VERSION", "FRAME_HEADER_SIZE", "FRAME_CLASSIFY", "FRAME_HEALTH",
+                     "FRAME_ARCHIVE", "FRAME_RESULT", "FRAME_ERROR", "FRAME_BUSY", "FRAME_STATUS",
+                     "FRAME_ARCHIVE_END", "FLAG_JSON", "FLAG_RAW_RGB"):
+            self.assertEqual(getattr(client_protocol, name), getattr(protocol, name), name)
+        header = client_protocol.FRAME_HEADER.pack(client_protocol.FRAME_MAGIC, client_protocol.PROTOCOL_VERSION,
+                                                   FRAME_CLASSIFY, 0, 0, 42, 10)
+        self.assertEqual(parse_frame_header(header), (FRAME_CLASSIFY, 0, 42, 10))
+
+    def test_frame_and_legacy_headers_do_not_overlap(self):
+        self.assertTrue(is_frame_header(pack_frame(FRAME_CLASSIFY, 1)[:HEADER_SIZE]))
+        self.assertFalse(is_frame_header((1234).to_bytes(HEADER_SIZE, "big")))
+
+    def test_bad_header(self):
+        frame = pack_frame(FRAME_CLASSIFY, 1)
+        with self.assertRaises(ProtocolError):
+            parse_frame_header(b"XX" + frame[2:])
+        with self.assertRaises(ProtocolError):
+            parse_frame_header(frame[:2] + bytes([protocol.PROTOCOL_VERSION + 1]) + frame[3:])
+
+
+class FrameConnectionTest(unittest.TestCase):
+    """지속 연결에서 여러 요청을 파이프라이닝으로 주고받기"""
+
+    def test_pipelined_requests_are_matched_by_id(self):
+        _, address = support.start_server(self)
+        items = [support.jpeg_bytes((i * 30, 200 - i * 30, 50)) for i in range(6)] + [b"not an image"]
+        with client_protocol.FrameConnection(address) as client:
+            results = client.classify_many(items, window=4)
+            self.assertEqual(sorted(results), list(range(len(items))))
+            self.assertEqual([results[i][0] for i in range(6)], [FRAME_RESULT] * 6)
+            self.assertEqual(results[6][0], FRAME_ERROR)
+            # 같은 연결에서 이어서 다른 종류의 요청도 처리된다
+            self.assertTrue(client.health()["ready"])
+            frame_type, text = client.request(support.jpeg_bytes(), flags=FLAG_JSON)
+            self.assertEqual(frame_type, FRAME_RESULT)
+            self.assertIn("top_k", json.loads(text))
+
+    def test_unknown_frame_type_keeps_connection(self):
+        _, address = support.start_server(self)
+        with client_protocol.FrameConnection(address) as client:
+            frame_type, _ = client.request(b"", frame_type=0x7F)
+            self.assertEqual(frame_type, FRAME_ERROR)
+            frame_type, _ = client.request(b"", frame_type=client_protocol.FRAME_HEALTH)
+            self.assertEqual(frame_type, FRAME_STATUS)
@@ -0,0 +1,62 @@
+import json
+import socket
+import tempfile
+import unittest
+import urllib.error
+import urllib.request
+
+import support
+from engine import FlowerServer
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get(port: int, path: str) -> tuple:
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=5) as response:
+            return response.status, response.read().decode("utf-8")
+    except urllib.error.HTTPError as e:
+        return e.code, e.read().decode("utf-8")
+
+
+class ReadinessTest(unittest.TestCase):
+    """모델 로드 전부터 상태 확인에 응답하고, 시작이 끝나야 ready 가 된다"""
+
+    def test_phases_and_status_endpoints(self):
+        port = free_port()
+        server = FlowerServer(support.stub_config(tempfile.mkdtemp(), health_port=port,
+                                                  warmup_batch_sizes="1,2"))
+        self.addCleanup(server.stop)
+        server.start_status_server()
+        self.addCleanup(server.stop_status_server)
+
+        status, body = get(port, "/readyz")
+        self.assertEqual(status, 503)
+        self.assertEqual(json.loads(body)["status"], "idle")
+
+        self.assertTrue(server.load_model_and_labels())
+        self.assertEqual(server.phase, "loaded")
+        self.assertIn("warmup", server.startup_timings)
+        self.assertFalse(server.ready)
+
+        self.assertTrue(server.start())
+        status, body = get(port, "/readyz")
+        self.assertEqual(status, 200)
+        body = json.loads(body)
+        self.assertTrue(body["ready"])
+        self.assertIn("listen", body["startup_s"])
+        self.assertEqual(get(port, "/healthz")[0], 200)
+        self.assertEqual(get(port, "/nothing")[0], 404)
+
+        server.stop()
+        self.assertFalse(server.ready)
+
+    def test_failed_load_is_reported(self):
+        server = FlowerServer(support.stub_config(tempfile.mkdtemp(), label_path="/nonexistent/labels.csv"))
+        self.assertFalse(server.load_model_and_labels())
+        self.assertEqual(server.health_status()["status"], "failed")
+        self.assertFalse(server.health_status()["ready"])
@@ -0,0 +1,34 @@
+import json
+import unittest
+
+import numpy as np
+
+import support  # noqa: F401
+from labels import LabelRegistry
+from results import predictions_from_batch, to_json, top_k
+
+
+class TopKTest(unittest.TestCase):
+    def test_matches_full_sort(self):
+        outputs = np.random.default_rng(3).random((5, 40)).astype(np.float32)
+        indices, scores = top_k(outputs, 4)
+        expected = np.argsort(-outputs, axis=1)[:, :4]
+        np.testing.assert_array_equal(indices, expected)
+        np.testing.assert_array_equal(scores, np.take_along_axis(outputs, expected, axis=1))
+
+    def test_k_is_clamped_to_classes(self):
+        indices, _ = top_k(np.array([[0.2, 0.5, 0.3]]), 10)
+        self.assertEqual(indices.tolist(), [[1, 2, 0]])
+
+
+class JsonResponseTest(unittest.TestCase):
+    def test_structure(self):
+        labels = LabelRegistry(["rose", "tulip", "daisy"], ["장미", "튤립", "데이지"])
+        prediction = predictions_from_batch(np.array([[0.1, 0.7, 0.2]], dtype=np.float32), 2,
+                                            [{"inference": 1.23456}])[0]
+        body = json.loads(to_json(prediction, labels))
+        self.assertEqual([item["en_class"] for item in body["top_k"]], ["tulip", "daisy"])
+        self.assertEqual(body["top_k"][0]["ko_class"], "튤립")
+        self.assertAlmostEqual(body["top_k"][0]["probability"], 0.7, places=5)
+        self.assertEqual(body["timings_ms"], {"inference": 1.235})
+        self.assertFalse(body["cached"])
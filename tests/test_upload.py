@@ -0,0 +1,104 @@
+import io
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+import support
+from preprocess import MODEL_INPUT_SIZE, RAW_INPUT_BYTES, decode_image
+
+client_protocol = support.load_client("protocol")
+upload = support.load_client("upload")
+
+
+def photo(size=(1200, 900)) -> Image.Image:
+    """JPEG 축소 디코드 차이가 드러나도록 그라디언트에 잡음을 섞은 이미지"""
+    base = Image.linear_gradient("L").resize(size).convert("RGB")
+    noise = Image.effect_noise(size, 30).convert("RGB")
+    return Image.blend(base, noise, 0.4)
+
+
+def save(image: Image.Image, name: str, fmt: str, **options) -> str:
+    path = os.path.join(tempfile.mkdtemp(), name)
+    image.save(path, fmt, **options)
+    return path
+
+
+class UploadTest(unittest.TestCase):
+    def test_model_input_size_matches_server(self):
+        self.assertEqual(upload.MODEL_INPUT_SIZE, MODEL_INPUT_SIZE)
+        self.assertEqual(upload.parse_size("320X240"), (320, 240))
+
+    def test_raw_matches_server_preprocessing(self):
+        # 클라이언트가 만든 raw 입력은 서버가 원본으로 만든 모델 입력과 같아야 한다
+        path = save(photo(), "photo.jpg", "JPEG", quality=90)
+        data, flags = upload.prepare_upload(path, "raw")
+        self.assertEqual(flags, upload.FLAG_RAW_RGB)
+        self.assertEqual(len(data), RAW_INPUT_BYTES)
+        with open(path, "rb") as f:
+            expected = decode_image(f.read())
+        np.testing.assert_array_equal(np.frombuffer(data, dtype=np.uint8).reshape(expected.shape), expected)
+
+    def test_raw_handles_transparent_palette(self):
+        image = Image.new("P", (40, 30))
+        image.info["transparency"] = 0
+        path = save(image, "icon.png", "PNG", transparency=0)
+        data, _ = upload.prepare_upload(path, "raw")
+        self.assertEqual(len(data), RAW_INPUT_BYTES)
+
+    def test_jpeg_mode_downscales_large_images(self):
+        path = save(photo(), "photo.jpg", "JPEG", quality=95)
+        data, flags = upload.prepare_upload(path, "jpeg", (160, 120), 80)
+        self.assertEqual(flags, 0)
+        self.assertLess(len(data), os.path.getsize(path))
+        with Image.open(io.BytesIO(data)) as image:
+            self.assertEqual((image.format, image.size), ("JPEG", (160, 120)))
+
+    def test_jpeg_mode_keeps_small_jpeg_as_is(self):
+        path = save(photo((100, 80)), "small.jpg", "JPEG")
+        data, _ = upload.prepare_upload(path, "jpeg")
+        with open(path, "rb") as f:
+            self.assertEqual(data, f.read())
+
+    def test_jpeg_mode_reencodes_small_png(self):
+        path = save(photo((100, 80)), "small.png", "PNG")
+        data, _ = upload.prepare_upload(path, "jpeg")
+        with Image.open(io.BytesIO(data)) as image:
+            self.assertEqual(image.format, "JPEG")
+
+    @unittest.skipUnless(os.path.isdir("/proc/self/fd"), "열린 파일 수를 /proc 에서 확인")
+    def test_load_resized_closes_file(self):
+        # 크기 변환이 없는 경우에도 반환한 이미지가 파일을 열어 두지 않아야 한다
+        path = save(photo(MODEL_INPUT_SIZE), "exact.jpg", "JPEG")
+        before = len(os.listdir("/proc/self/fd"))
+        image = upload.load_resized(path, MODEL_INPUT_SIZE)
+        self.assertEqual(len(os.listdir("/proc/self/fd")), before)
+        self.assertEqual(image.size, MODEL_INPUT_SIZE)
+        self.assertEqual(len(image.tobytes()), RAW_INPUT_BYTES)
+
+    def test_original_mode_sends_file_bytes(self):
+        path = save(photo((64, 48)), "photo.png", "PNG")
+        data, flags = upload.prepare_upload(path, "original")
+        with open(path, "rb") as f:
+            self.assertEqual((data, flags), (f.read(), 0))
+
+
+class RawUploadServerTest(unittest.TestCase):
+    def test_raw_upload_gives_same_result_as_original(self):
+        _, address = support.start_server(self)
+        client = client_protocol.FrameConnection(address)
+        self.addCleanup(client.close)
+        path = save(photo(), "photo.jpg", "JPEG")
+        results = []
+        for mode in ("original", "raw"):
+            data, flags = upload.prepare_upload(path, mode)
+            frame_type, text = client.request(data, flags=flags)
+            self.assertEqual(frame_type, client_protocol.FRAME_RESULT, text)
+            results.append(text)
+        self.assertEqual(results[0], results[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
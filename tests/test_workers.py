@@ -0,0 +1,84 @@
+import tempfile
+import threading
+import time
+import unittest
+
+import support
+from admission import Overloaded
+from workers import ProcessWorkerPool
+
+
+class ProcessWorkerPoolTest(unittest.TestCase):
+    """stub 백엔드 워커 프로세스 한 개로 슬롯/라우팅/종료 처리 확인"""
+
+    def make_pool(self, **overrides):
+        options = dict(workers=1, worker_slots=1, worker_slot_timeout=0.3)
+        options.update(overrides)
+        pool = ProcessWorkerPool(support.stub_config(tempfile.mkdtemp(), **options), num_classes=5)
+        pool.start(timeout=60)
+        self.addCleanup(pool.stop)
+        return pool
+
+    def test_classify(self):
+        pool = self.make_pool()
+        prediction = pool.submit(support.jpeg_bytes()).result(timeout=30)
+        self.assertTrue(prediction)
+        self.assertEqual(pool._free_slots.qsize(), 1)
+
+    def test_oversized_payload_does_not_take_slot(self):
+        pool = self.make_pool()
+        pool.slot_bytes = 16   # 모든 요청이 임시 공유 메모리를 쓰도록
+        self.assertEqual(pool._free_slots.get_nowait(), 0)   # 슬롯을 모두 점유해 둔다
+        prediction = pool.submit(support.jpeg_bytes()).result(timeout=30)
+        self.assertTrue(prediction)
+        self.assertEqual(pool._free_slots.qsize(), 0)
+
+    def test_undecodable_oversized_payload_fails_and_worker_keeps_serving(self):
+        pool = self.make_pool()
+        pool.slot_bytes = 16
+        with self.assertRaises(Exception) as caught:
+            pool.submit(b"not an image" * 4).result(timeout=30)
+        self.assertIn("이미지 처리 실패", str(caught.exception))
+        self.assertTrue(pool.submit(support.jpeg_bytes()).result(timeout=30))
+
+    def test_slot_wait_times_out_with_overloaded(self):
+        pool = self.make_pool()
+        pool._free_slots.get_nowait()
+        started = time.monotonic()
+        with self.assertRaises(Overloaded) as caught:
+            pool.submit(support.jpeg_bytes())
+        self.assertEqual(caught.exception.reason, "queue_full")
+        self.assertLess(time.monotonic() - started, 5.0)
+
+    def test_waiting_submit_fails_fast_on_stop(self):
+        pool = self.make_pool(worker_slot_timeout=30.0)
+        pool._free_slots.get_nowait()
+        errors = []
+
+        def submit():
+            try:
+                pool.submit(support.jpeg_bytes())
+            except Exception as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=submit)
+        thread.start()
+        time.sleep(0.2)
+        pool.stop()
+        thread.join(timeout=5)
+        self.assertFalse(thread.is_alive())
+        self.assertIsInstance(errors[0], RuntimeError)
+        with self.assertRaises(RuntimeError):
+            pool.submit(support.jpeg_bytes())
+
+    def test_worker_not_routed_until_ready(self):
+        pool = self.make_pool(workers=2, worker_slots=2)
+        loading = pool._workers[0]
+        loading.ready = False   # 재시작 직후처럼 모델을 불러오는 중인 워커
+        routed = []
+        self.addCleanup(setattr, loading, "task_queue", loading.task_queue)
+        loading.task_queue = type("Recorder", (), {"put": lambda self, task: routed.append(task)})()
+        for _ in range(3):
+            pool.submit(support.jpeg_bytes()).result(timeout=30)
+        self.assertEqual(routed, [])
+        self.assertEqual(pool.completed, 3)